@@ -0,0 +1,29 @@
+"""
+Admin guard for the /api/admin routers in this repo (dashboard_stats,
+candidate_search) and the /metrics endpoint (instrumentation).
+
+Every one of those routers depends on require_admin, which fails closed.
+Wire it to the application's own admin check when mounting them:
+
+    app.dependency_overrides[admin_auth.require_admin] = get_current_admin_user
+    app.include_router(dashboard_stats.router)
+
+Without an override, a static bearer token is accepted instead, for
+internal tooling and Prometheus scrapes:
+
+    ADMIN_API_TOKEN   Authorization: Bearer <token> grants access (unset: every request is refused)
+"""
+import os
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException, status
+
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    token = os.getenv("ADMIN_API_TOKEN")
+    if not token:
+        raise HTTPException(status.HTTP_403_FORBIDDEN, "Admin authentication is not configured")
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(status.HTTP_401_UNAUTHORIZED, "Admin token required",
+                            headers={"WWW-Authenticate": "Bearer"})
@@ -0,0 +1,442 @@
+"""
+Write-behind buffering for live interview progress.
+
+Each candidate turn used to commit its QuestionAnswer row and the parent
+registration's current_question_index synchronously. AnswerWriteBehind
+instead coalesces those updates per registration in memory (later values
+for the same answer/field replace earlier ones) and writes them in one
+transaction per flush, every `flush_interval` seconds, when `max_pending`
+registrations are waiting, or immediately when an interview completes.
+
+Every update is first appended to a local journal (JSON lines, fsync'd)
+before record_*() returns, so a crash loses nothing. Records arriving
+together share one fsync (group commit), which runs on a worker thread so
+the event loop never waits on the disk.
+
+Each process journals into its own directory under journal_dir
+(<pid>-<random>/segment-*.jsonl) and holds an exclusive lock on it, so
+uvicorn workers sharing journal_dir never touch each other's segments
+(the lock is taken before the directory becomes visible to other processes).
+Segments are rotated at each flush and deleted once the flush has
+committed. On start() the directories whose lock is free (their process is
+gone) are replayed, flushed and removed. An optional
+on_flush(changed_fields) callback runs after each commit (e.g.
+SessionTokenCache.on_write_behind_flush).
+
+    buffer = AnswerWriteBehind()
+    await buffer.start()
+    step = DEFAULT_FLOW.advance(index, answer_text)
+    await buffer.record_turn(registration_id, step, answer_text)
+    ...
+    await buffer.stop()
+"""
+import os
+import sys
+import glob
+import json
+import time
+import uuid
+import shutil
+import asyncio
+from datetime import datetime
+from sqlalchemy import select, update, insert, bindparam, tuple_
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from db_engine import async_session
+from question_flow import DEFAULT_FLOW
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_JOURNAL_DIR = os.getenv(
+    "ANSWER_JOURNAL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".answer_journal")
+)
+
+
+LOCK_FILE = "owner.lock"
+
+
+def _encode(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _try_lock(path):
+    """Open and exclusively lock `path`; returns the open file, or None if another process holds it"""
+    f = open(path, "a+")
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+class _Pending:
+    """Coalesced updates for one registration"""
+
+    __slots__ = ("answers", "fields")
+
+    def __init__(self):
+        self.answers = {}   # question_order -> {"question_text", "answer_text", "is_answered"}
+        self.fields = {}    # registration column -> value
+
+    def apply(self, record):
+        if record.get("question_order") is not None:
+            answer = self.answers.setdefault(record["question_order"], {})
+            for key in ("question_text", "answer_text", "is_answered"):
+                if record.get(key) is not None:
+                    answer[key] = record[key]
+        self.fields.update(record.get("fields") or {})
+
+    def merge_older(self, older):
+        """Fold in updates that are older than ours (after a failed flush)"""
+        for order, answer in older.answers.items():
+            self.answers[order] = {**answer, **self.answers.get(order, {})}
+        self.fields = {**older.fields, **self.fields}
+
+
+class AnswerWriteBehind:
+    def __init__(self, session_factory=async_session, flush_interval=1.0, max_pending=500,
+                 journal_dir=DEFAULT_JOURNAL_DIR, fsync=True, on_flush=None):
+        self.session_factory = session_factory
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.journal_dir = journal_dir
+        self.fsync = fsync
+        self._pending = {}
+        self._flush_lock = asyncio.Lock()
+        self._flush_requested = asyncio.Event()
+        self._task = None
+        self._journal = None
+        self._segment = 0
+        self._directory = None
+        self._owner_lock = None
+        self._written = 0       # records written to the journal
+        self._synced = 0        # records known to be on disk
+        self._sync_task = None
+        self.stats = {
+            "records": 0, "flushes": 0, "flush_failures": 0, "rows_written": 0,
+            "last_flush_seconds": 0.0, "max_flush_seconds": 0.0, "total_flush_seconds": 0.0,
+        }
+
+    # -- journal -----------------------------------------------------------
+
+    def _segments(self, directory=None):
+        return sorted(glob.glob(os.path.join(directory or self._directory, "segment-*.jsonl")))
+
+    def _open_segment(self):
+        self._segment += 1
+        path = os.path.join(self._directory, f"segment-{self._segment:012d}.jsonl")
+        self._journal = open(path, "a", encoding="utf-8")
+
+    def _journal_write(self, record):
+        self._journal.write(json.dumps(record, default=_encode) + "\n")
+        self._written += 1
+        if not self.fsync:
+            self._journal.flush()
+
+    async def _sync(self):
+        """Wait until every record written so far is on disk; concurrent callers share one fsync"""
+        target = self._written
+        while self.fsync and self._synced < target:
+            if self._sync_task is None:
+                self._sync_task = asyncio.ensure_future(self._fsync())
+            await asyncio.shield(self._sync_task)
+
+    async def _fsync(self):
+        try:
+            covered = self._written
+            self._journal.flush()
+            await asyncio.to_thread(os.fsync, self._journal.fileno())
+            self._synced = max(self._synced, covered)
+        finally:
+            self._sync_task = None
+
+    async def _settle(self):
+        """Wait until everything written is on disk and no fsync is running"""
+        while self._sync_task is not None or (self.fsync and self._synced < self._written):
+            if self._sync_task is None:
+                self._sync_task = asyncio.ensure_future(self._fsync())
+            await asyncio.shield(self._sync_task)
+
+    def _rotate(self):
+        """Close the current segment and return the segments a flush will cover"""
+        if self._journal is None:
+            return []
+        self._journal.close()
+        covered = self._segments()
+        self._open_segment()
+        return covered
+
+    def _replay(self, directory):
+        for path in self._segments(directory):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn final write from a crash
+                    self._pending.setdefault(record["registration_id"], _Pending()).apply(record)
+
+    def _adopt_orphans(self):
+        """Lock and replay the journals of processes that are gone; returns [(directory, lock, segments)]
+
+        Segments directly in journal_dir (older versions) are adopted the same way.
+        """
+        adopted = []
+        directories = [self.journal_dir] + sorted(
+            os.path.dirname(path) for path in glob.glob(os.path.join(self.journal_dir, "*", LOCK_FILE))
+        )
+        for directory in directories:
+            lock = _try_lock(os.path.join(directory, LOCK_FILE))
+            if lock is None:
+                continue  # its process is still running
+            self._replay(directory)
+            adopted.append((directory, lock, self._segments(directory)))
+        return adopted
+
+    def _release_orphans(self, adopted):
+        """Delete adopted journals once their records have been flushed"""
+        for directory, lock, segments in adopted:
+            for path in segments:
+                os.remove(path)
+            lock.close()
+            if directory != self.journal_dir:
+                shutil.rmtree(directory, ignore_errors=True)
+
+    def _claim_directory(self):
+        """Create this process's journal directory with its lock already held; returns (directory, lock)
+
+        The directory is built under a dot name, which the orphan scan's glob
+        skips, and only renamed into place once owner.lock is locked, so no
+        other process can adopt it in between.
+        """
+        name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        staging = os.path.join(self.journal_dir, f".{name}")
+        os.makedirs(staging)
+        lock = _try_lock(os.path.join(staging, LOCK_FILE))
+        if lock is None:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise RuntimeError(f"Could not lock the new journal directory {staging}")
+        directory = os.path.join(self.journal_dir, name)
+        try:
+            os.rename(staging, directory)
+        except OSError:
+            lock.close()
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return directory, lock
+
+    # -- lifecycle ---------------------------------------------------------
+
+    async def start(self):
+        """Replay journals left by stopped or crashed processes, flush them and start the timer"""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        adopted = self._adopt_orphans()
+        try:
+            self._directory, self._owner_lock = self._claim_directory()
+            self._open_segment()
+            if self._pending:
+                await self.flush()
+            self._release_orphans(adopted)
+        finally:
+            for _, lock, _ in adopted:
+                lock.close()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._journal is not None:
+            await self._settle()
+            self._journal.close()
+            self._journal = None
+            self._owner_lock.close()
+            self._owner_lock = None
+            # Everything is flushed, so normally only the fresh, empty segment is left;
+            # otherwise the directory stays for the next start() to adopt
+            if all(os.path.getsize(path) == 0 for path in self._segments()):
+                shutil.rmtree(self._directory, ignore_errors=True)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Write-behind flush failed, will retry: {e}")
+
+    # -- recording ---------------------------------------------------------
+
+    async def _record(self, record):
+        if self._journal is None:
+            raise RuntimeError("AnswerWriteBehind.start() must be awaited before recording")
+        self._journal_write(record)
+        self._pending.setdefault(record["registration_id"], _Pending()).apply(record)
+        self.stats["records"] += 1
+        if len(self._pending) >= self.max_pending:
+            self._flush_requested.set()
+        await self._sync()
+
+    async def record_answer(self, registration_id, question_order, answer_text, question_text=None,
+                            is_answered=True, current_question_index=None, fields=None):
+        """Buffer one answer and (optionally) the registration's progress fields"""
+        fields = dict(fields or {})
+        if current_question_index is not None:
+            fields["current_question_index"] = current_question_index
+        await self._record({
+            "registration_id": registration_id,
+            "question_order": question_order,
+            "question_text": question_text,
+            "answer_text": answer_text,
+            "is_answered": is_answered,
+            "fields": fields,
+        })
+
+    async def record_turn(self, registration_id, step, answer_text, flow=DEFAULT_FLOW):
+        """Buffer a question_flow step; completes (and flushes) the interview on the last step"""
+        fields = dict(step.updates)
+        fields["current_question_index"] = step.next_index
+        await self.record_answer(registration_id, step.question_index + 1, answer_text,
+                                 question_text=flow.question(step.question_index), fields=fields)
+        if step.completed:
+            await self.complete(registration_id)
+
+    async def complete(self, registration_id, **fields):
+        """Mark an interview completed and flush it right away"""
+        fields.setdefault("is_completed", True)
+        fields.setdefault("completed_at", datetime.now())
+        await self._record({"registration_id": registration_id, "fields": fields})
+        await self.flush()
+
+    # -- flushing ----------------------------------------------------------
+
+    async def flush(self):
+        """Write all buffered updates in one transaction"""
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            # The segments are closed and later deleted: they must be on disk, and
+            # not under a running fsync. No await from here until they are rotated.
+            await self._settle()
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, {}
+            covered = self._rotate()
+            start = time.perf_counter()
+            try:
+                rows = await self._write(batch)
+            except Exception:
+                self.stats["flush_failures"] += 1
+                for registration_id, older in batch.items():
+                    self._pending.setdefault(registration_id, _Pending()).merge_older(older)
+                raise
+            elapsed = time.perf_counter() - start
+            for path in covered:
+                os.remove(path)
+            self.stats["flushes"] += 1
+            self.stats["rows_written"] += rows
+            self.stats["last_flush_seconds"] = elapsed
+            self.stats["max_flush_seconds"] = max(self.stats["max_flush_seconds"], elapsed)
+            self.stats["total_flush_seconds"] += elapsed
+            if self.on_flush is not None:
+                try:
+                    self.on_flush({rid: pending.fields for rid, pending in batch.items()})
+                except Exception as e:
+                    print(f"Write-behind on_flush hook failed: {e}")
+            return rows
+
+    async def _write(self, batch):
+        qa = QuestionAnswer.__table__
+        reg = InterviewRegistration.__table__
+        answers = [
+            {"registration_id": registration_id, "question_order": order, **answer}
+            for registration_id, pending in batch.items()
+            for order, answer in pending.answers.items()
+        ]
+        rows = 0
+        async with self.session_factory() as session:
+            async with session.begin():
+                if answers:
+                    keys = [(a["registration_id"], a["question_order"]) for a in answers]
+                    existing = set((await session.execute(
+                        select(qa.c.registration_id, qa.c.question_order)
+                        .where(tuple_(qa.c.registration_id, qa.c.question_order).in_(keys))
+                    )).all())
+                    to_update = [a for a in answers if (a["registration_id"], a["question_order"]) in existing]
+                    to_insert = [a for a in answers if (a["registration_id"], a["question_order"]) not in existing]
+                    # Group by column set so each group is a single executemany
+                    for columns, group in _group_by_columns(to_update, ("registration_id", "question_order")):
+                        await session.execute(
+                            update(qa)
+                            .where(qa.c.registration_id == bindparam("b_registration_id"),
+                                   qa.c.question_order == bindparam("b_question_order"))
+                            .values({c: bindparam(f"v_{c}") for c in columns}),
+                            [{"b_registration_id": a["registration_id"], "b_question_order": a["question_order"],
+                              **{f"v_{c}": a[c] for c in columns}} for a in group],
+                        )
+                    for columns, group in _group_by_columns(to_insert, ()):
+                        await session.execute(insert(qa), [{c: a[c] for c in columns} for a in group])
+                    rows += len(answers)
+
+                updates = [{"registration_id": rid, **p.fields} for rid, p in batch.items() if p.fields]
+                for columns, group in _group_by_columns(updates, ("registration_id",)):
+                    await session.execute(
+                        update(reg).where(reg.c.id == bindparam("b_id"))
+                        .values({c: bindparam(f"v_{c}") for c in columns}),
+                        [{"b_id": u["registration_id"], **{f"v_{c}": _decode(c, u[c]) for c in columns}}
+                         for u in group],
+                    )
+                rows += len(updates)
+        return rows
+
+    def metrics(self):
+        flushes = self.stats["flushes"]
+        return {
+            **self.stats,
+            "queue_depth_registrations": len(self._pending),
+            "queue_depth_answers": sum(len(p.answers) for p in self._pending.values()),
+            "avg_flush_seconds": self.stats["total_flush_seconds"] / flushes if flushes else 0.0,
+        }
+
+
+def _decode(column, value):
+    # Timestamps come back from the journal as ISO strings
+    if column.endswith("_at") and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def _group_by_columns(rows, key_columns):
+    """Yield (value columns, rows) groups that share the same set of value columns"""
+    groups = {}
+    for row in rows:
+        columns = tuple(sorted(c for c in row if c not in key_columns))
+        groups.setdefault(columns, []).append(row)
+    return [(columns, group) for columns, group in groups.items() if columns]
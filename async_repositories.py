@@ -0,0 +1,165 @@
+"""
+Async data access for the FastAPI request path.
+
+Repositories for users, interview registrations and question answers on
+SQLAlchemy's AsyncSession over asyncpg (see db_engine.async_session), so
+uvicorn workers never block on database I/O.
+
+    async with async_session() as session:
+        registrations = RegistrationRepository(session)
+        registration = await registrations.get_by_token(token)
+
+Repositories never commit on their own; the caller owns the transaction
+(async with session.begin(): ...).
+"""
+import os
+import sys
+from sqlalchemy import select, update, insert, func
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from password_hashing import verify_login
+from registration_partitions import HOT_MONTHS, prune_recent, aregistrations_partitioned
+from schema_cache import user_statement
+from session_cache import invalidate_on_commit
+
+
+class UserRepository:
+    """users has mixed-case or lowercase columns depending on how it was created,
+    so it is accessed through schema_cache's pre-quoted statements"""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def _statement(self, name):
+        return await self.session.run_sync(lambda s: user_statement(s.connection(), name))
+
+    async def get_by_email(self, email):
+        stmt = await self._statement("by_email")
+        row = (await self.session.execute(stmt, {"emailid": email})).mappings().first()
+        return dict(row) if row else None
+
+    async def update_password(self, user_id, password_hash):
+        stmt = await self._statement("update_password")
+        await self.session.execute(stmt, {"userid": user_id, "password": password_hash})
+
+    async def set_login(self, user_id, is_login):
+        stmt = await self._statement("set_login")
+        await self.session.execute(stmt, {"userid": user_id, "islogin": is_login})
+
+    async def authenticate(self, email, password):
+        """Return the user dict when the password matches, upgrading legacy hashes"""
+        user = await self.get_by_email(email)
+        if user is None:
+            return None
+
+        async def save_hash(new_hash):
+            await self.update_password(user["userid"], new_hash)
+
+        if not await verify_login(password, user["password"], save_hash):
+            return None
+        return user
+
+
+class RegistrationRepository:
+    def __init__(self, session):
+        self.session = session
+
+    async def get(self, registration_id):
+        return await self.session.get(InterviewRegistration, registration_id)
+
+    async def get_by_token(self, session_token):
+        """On partitioned tables look in the recent partitions first; live sessions are almost always there"""
+        stmt = select(InterviewRegistration).where(InterviewRegistration.session_token == session_token)
+        if await aregistrations_partitioned(self.session):
+            registration = (await self.session.execute(prune_recent(stmt, HOT_MONTHS))).scalars().first()
+            if registration is not None:
+                return registration
+        return (await self.session.execute(stmt)).scalars().first()
+
+    async def get_by_registration_id(self, registration_key):
+        result = await self.session.execute(
+            select(InterviewRegistration).where(InterviewRegistration.registration_id == registration_key)
+        )
+        return result.scalars().first()
+
+    async def list(self, status=None, limit=50, after_id=0, recent_months=None):
+        """Keyset-paginated listing, oldest id first.
+
+        recent_months limits it to the last N months; by default the recent
+        partitions on a partitioned table, 0 for all history.
+        """
+        stmt = prune_recent(select(InterviewRegistration).where(InterviewRegistration.id > after_id),
+                            recent_months, partitioned=await aregistrations_partitioned(self.session))
+        if status is not None:
+            stmt = stmt.where(InterviewRegistration.status == status)
+        result = await self.session.execute(stmt.order_by(InterviewRegistration.id).limit(limit))
+        return result.scalars().all()
+
+    async def count(self, status=None):
+        stmt = select(func.count()).select_from(InterviewRegistration)
+        if status is not None:
+            stmt = stmt.where(InterviewRegistration.status == status)
+        return (await self.session.execute(stmt)).scalar_one()
+
+    async def create(self, **fields):
+        registration = InterviewRegistration(**fields)
+        self.session.add(registration)
+        await self.session.flush()
+        return registration
+
+    async def update_fields(self, registration_id, **fields):
+        """Bulk UPDATE, so no ORM events fire; cached session snapshots are evicted once the caller commits"""
+        await self.session.execute(
+            update(InterviewRegistration).where(InterviewRegistration.id == registration_id).values(**fields)
+        )
+        invalidate_on_commit(self.session.sync_session, [registration_id], fields)
+
+
+class QuestionAnswerRepository:
+    def __init__(self, session):
+        self.session = session
+
+    async def list_for_registration(self, registration_id):
+        result = await self.session.execute(
+            select(QuestionAnswer)
+            .where(QuestionAnswer.registration_id == registration_id)
+            .order_by(QuestionAnswer.question_order)
+        )
+        return result.scalars().all()
+
+    async def list_for_registrations(self, registration_ids):
+        """Answers of many registrations in one IN query, grouped by registration id"""
+        grouped = {registration_id: [] for registration_id in registration_ids}
+        if not grouped:
+            return grouped
+        result = await self.session.execute(
+            select(QuestionAnswer)
+            .where(QuestionAnswer.registration_id.in_(list(grouped)))
+            .order_by(QuestionAnswer.registration_id, QuestionAnswer.question_order)
+        )
+        for answer in result.scalars():
+            grouped[answer.registration_id].append(answer)
+        return grouped
+
+    async def save_answer(self, registration_id, question_order, answer_text, question_text=None,
+                          is_answered=True):
+        """Update the answer for (registration, order), inserting it if it does not exist yet"""
+        values = {"answer_text": answer_text, "is_answered": is_answered}
+        if question_text is not None:
+            values["question_text"] = question_text
+        result = await self.session.execute(
+            update(QuestionAnswer)
+            .where(QuestionAnswer.registration_id == registration_id,
+                   QuestionAnswer.question_order == question_order)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            await self.session.execute(insert(QuestionAnswer).values(
+                registration_id=registration_id, question_order=question_order, **values
+            ))
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Vectorized resume/answer similarity scoring for the whole candidate pool.
+
+Computes exactly what resume_analysis.heuristic_comparison computes for
+one candidate, but for a page of candidates at once with sparse matrices
+over one shared vocabulary, so scores and recommendations do not depend
+on which path produced them:
+
+    C[i, j]   how often candidate i's answered answers use term j
+    R[i, j]   1 when term j appears in candidate i's resume
+
+    score[i] = 100 * nnz(C[i] * R[i]) / nnz(C[i])     (share of distinct answer terms
+                                                        that also appear in the resume)
+
+matching_points are the shared terms used most often, picked for every
+candidate by one lexsort over the nonzeros of C * R, and an answered
+answer is a discrepancy when it shares no term with the resume, checked
+for all answers at once with a binary answer x term matrix. The only
+per-candidate Python work left is tokenizing each distinct text once and
+assembling the result dicts. The score
+only looks at each candidate's own rows, so the pool is processed in
+id-keyset pages and the result is the same as scoring it in one pass.
+
+Results are written back to resume_comparison in bulk, together with the
+comparison input hashes in registration_derivations (recorded as produced
+by heuristic_comparison, which this reproduces). The same rules as
+resume_derivation_cache apply: registrations whose inputs have not changed
+are skipped, and comparisons that predate the cache are adopted.
+
+Usage:
+    python batch_similarity.py                 # rescore registrations whose inputs changed
+    python batch_similarity.py --force         # rescore every registration
+    python batch_similarity.py --dry-run       # score without writing
+"""
+import sys
+import os
+import time
+import argparse
+import numpy as np
+import scipy.sparse as sp
+from sqlalchemy import update, bindparam
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from resume_analysis import tokenize, build_comparison, heuristic_comparison
+
+NOT_ENOUGH_DATA = "Not enough resume or interview data to compare"
+
+
+def _term_matrix(texts):
+    """Sparse term-count matrix, one row per text, and the terms its columns stand for.
+
+    Each distinct text is tokenized once. Term ids come from np.unique, so
+    they are the alphabetical ranks of the terms: the column order is the
+    tie-breaker heuristic_comparison uses for matching_points.
+    """
+    distinct = {}
+    rows = np.fromiter((distinct.setdefault(text or "", len(distinct)) for text in texts),
+                       dtype=np.int64, count=len(texts))
+    tokens = [tokenize(text) for text in distinct]
+    indptr = np.zeros(len(tokens) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in tokens], out=indptr[1:])
+    terms, indices = np.unique(np.array([t for ts in tokens for t in ts], dtype=str), return_inverse=True)
+    matrix = sp.csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), indices.ravel(), indptr),
+        shape=(len(tokens), len(terms)),
+    )
+    matrix.sum_duplicates()
+    return matrix[rows], terms
+
+
+def score_pool(resumes, answers, max_points=5):
+    """Score every candidate in one pass.
+
+    resumes: list of resume texts; answers: list (same length) of answer-dict
+    lists. Returns a list of resume_comparison dicts, equal (apart from
+    analyzed_at) to heuristic_comparison(resumes[i], answers[i]).
+    """
+    n = len(resumes)
+    answered = [[a for a in candidate if a.get("is_answered", True)] for candidate in answers]
+    flat_answers = [a for candidate in answered for a in candidate]
+    owners = np.repeat(np.arange(n), [len(candidate) for candidate in answered])
+    counts, terms = _term_matrix(list(resumes) + [a.get("answer_text") for a in flat_answers])
+    if not len(terms):
+        return [build_comparison(0, [], [NOT_ENOUGH_DATA], 0.1) for _ in resumes]
+
+    resume_binary = (counts[:n] > 0).astype(np.float32).tocsr()
+    answer_counts = counts[n:]
+    # Per-candidate answer term counts = sum of that candidate's answer rows
+    owner_matrix = sp.csr_matrix(
+        (np.ones(len(owners), dtype=np.float32), (owners, np.arange(len(owners)))),
+        shape=(n, len(owners)),
+    )
+    candidate_counts = (owner_matrix @ answer_counts).tocsr()
+    candidate_counts.eliminate_zeros()
+    shared_counts = candidate_counts.multiply(resume_binary).tocsr()
+    shared_counts.eliminate_zeros()
+    shared_counts.sort_indices()
+    distinct = np.diff(candidate_counts.indptr)
+    shared = np.diff(shared_counts.indptr)
+    comparable = (np.diff(resume_binary.indptr) > 0) & (distinct > 0)
+    scores = np.where(comparable, 100.0 * shared / np.maximum(distinct, 1), 0.0).tolist()
+    confidences = np.minimum(0.95, 0.3 + 0.05 * distinct).tolist()
+
+    # matching_points: each candidate's shared terms by count (descending), then
+    # alphabetically (= by term id), keeping the first max_points of every row
+    rows = np.repeat(np.arange(n), shared)
+    order = np.lexsort((shared_counts.indices, -shared_counts.data, rows))
+    picked = order[np.arange(len(order)) - shared_counts.indptr[rows[order]] < max_points]
+    bounds = np.searchsorted(rows[picked], np.arange(n + 1)).tolist()
+    points = [f"'{term}' mentioned in resume and interview"
+              for term in terms[shared_counts.indices[picked]].tolist()]
+
+    # An answer is a discrepancy when it shares no term with its candidate's resume
+    answer_binary = (answer_counts > 0).astype(np.float32).tocsr()
+    overlap = np.asarray(answer_binary.multiply(resume_binary[owners]).sum(axis=1)).ravel() \
+        if len(owners) else np.zeros(0)
+    has_text = np.array([bool(a.get("answer_text")) for a in flat_answers], dtype=bool)
+    discrepancies = [[] for _ in answered]
+    for i in np.flatnonzero((overlap == 0) & has_text):
+        discrepancies[owners[i]].append(
+            f"Answer to '{flat_answers[i].get('question_text')}' is not reflected in the resume"
+        )
+
+    return [
+        build_comparison(scores[i], points[bounds[i]:bounds[i + 1]], discrepancies[i], confidences[i])
+        if comparable[i] else build_comparison(0, [], [NOT_ENOUGH_DATA], 0.1)
+        for i in range(n)
+    ]
+
+
+def write_comparisons(conn, registration_ids, comparisons, input_hashes=None, batch_size=1000):
+    """Bulk UPDATE resume_comparison for the given registration ids.
+
+    input_hashes (comparison_hash per registration, same order) are recorded
+    in registration_derivations in the same transaction.
+    """
+    from app.models.interview_registration import InterviewRegistration
+    from resume_derivation_cache import deriver_id, record_derivations
+
+    reg = InterviewRegistration.__table__
+    stmt = update(reg).where(reg.c.id == bindparam("reg_id")).values(resume_comparison=bindparam("comparison"))
+    params = [{"reg_id": reg_id, "comparison": c} for reg_id, c in zip(registration_ids, comparisons)]
+    for start in range(0, len(params), batch_size):
+        conn.execute(stmt, params[start:start + batch_size])
+    if input_hashes is not None:
+        deriver = deriver_id(heuristic_comparison)
+        record_derivations(conn, [{"registration_id": reg_id, "comparison_hash": h, "comparison_deriver": deriver}
+                                  for reg_id, h in zip(registration_ids, input_hashes)])
+
+
+def rescore_pool(engine, page_size=2000, dry_run=False, force=False):
+    """Score the pool page by page (id keyset) and write each page back; returns (scanned, rescored)"""
+    from export_registrations import iter_registration_pages
+    from resume_derivation_cache import (
+        ADOPT, COMPUTE, comparison_hash, deriver_id, field_action, record_derivations, stored_derivations,
+    )
+
+    deriver = deriver_id(heuristic_comparison)
+
+    scanned = rescored = 0
+    load = score = write = 0.0
+    mark = time.perf_counter()
+    with engine.connect() as read_conn:
+        for page in iter_registration_pages(read_conn, page_size):
+            scanned += len(page)
+            hashes = [comparison_hash(reg.get("resume_extracted_text") or "", reg["answers"]) for reg in page]
+            previous = stored_derivations(read_conn, [reg["id"] for reg in page])
+            actions = [
+                field_action(reg.get("resume_comparison"), getattr(previous.get(reg["id"]), "comparison_hash", None),
+                             getattr(previous.get(reg["id"]), "comparison_deriver", None), h, deriver, force)
+                for reg, h in zip(page, hashes)
+            ]
+            stale = [(reg, h) for reg, h, action in zip(page, hashes, actions) if action == COMPUTE]
+            adopted = [{"registration_id": reg["id"], "comparison_hash": h, "comparison_deriver": None}
+                       for reg, h, action in zip(page, hashes, actions) if action == ADOPT]
+            if adopted and not dry_run:
+                with engine.begin() as conn:
+                    record_derivations(conn, adopted)
+            now = time.perf_counter()
+            load, mark = load + now - mark, now
+            if not stale:
+                continue
+
+            comparisons = score_pool([reg.get("resume_extracted_text") or "" for reg, _ in stale],
+                                     [reg["answers"] for reg, _ in stale])
+            now = time.perf_counter()
+            score, mark = score + now - mark, now
+
+            if not dry_run:
+                with engine.begin() as conn:
+                    write_comparisons(conn, [reg["id"] for reg, _ in stale], comparisons, [h for _, h in stale])
+            rescored += len(stale)
+            now = time.perf_counter()
+            write, mark = write + now - mark, now
+            print(f"  ... scanned {scanned}, rescored {rescored}")
+
+    print(f"Scanned {scanned} candidates, rescored {rescored}: load {load:.2f}s, "
+          f"score {score:.2f}s, write {write:.2f}s"
+          f"{' (dry run, nothing written)' if dry_run else ''}")
+    return scanned, rescored
+
+
+def main(argv=None):
+    from db_engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Rescore candidates' resume/answer similarity")
+    parser.add_argument("--page-size", type=int, default=2000)
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--force", action="store_true", help="ignore stored input hashes and rescore everyone")
+    args = parser.parse_args(argv)
+    rescore_pool(get_engine(), args.page_size, args.dry_run, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Load test: sync (psycopg2 sessions on threads) vs async (asyncpg AsyncSession).
+
+Both paths run the same request against a local Postgres, built from the
+same statements: resolve a session token to its registration the way
+RegistrationRepository.get_by_token does (recent partitions first on a
+partitioned table) and load that registration's answers.
+Each path keeps --concurrency requests in flight for --requests requests
+and reports requests/sec and p50/p95/p99 latency. Run the seed scripts
+first (e.g. python seed_sample_registrations.py --count 10000).
+
+Usage:
+    python bench_async_db.py --requests 5000 --concurrency 32 --output bench_async_db.json
+"""
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import select
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from bench_stats import percentile
+from db_engine import sync_session, async_session, pool_metrics, dispose_async
+from registration_partitions import HOT_MONTHS, prune_recent, registrations_partitioned
+
+
+def summarize(name, latencies, wall):
+    latencies = sorted(latencies)
+    return {
+        "path": name,
+        "requests": len(latencies),
+        "requests_per_sec": round(len(latencies) / wall, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def sample_tokens(limit):
+    with sync_session() as session:
+        return session.execute(
+            select(InterviewRegistration.session_token)
+            .where(InterviewRegistration.session_token.isnot(None))
+            .limit(limit)
+        ).scalars().all()
+
+
+def token_statements(session, token):
+    """Statements tried in order to resolve a token, as in RegistrationRepository.get_by_token"""
+    stmt = select(InterviewRegistration).where(InterviewRegistration.session_token == token)
+    if registrations_partitioned(session.connection()):
+        return [prune_recent(stmt, HOT_MONTHS), stmt]
+    return [stmt]
+
+
+def answers_statement(registration_id):
+    return (
+        select(QuestionAnswer).where(QuestionAnswer.registration_id == registration_id)
+        .order_by(QuestionAnswer.question_order)
+    )
+
+
+def sync_request(token):
+    start = time.perf_counter()
+    with sync_session() as session:
+        for stmt in token_statements(session, token):
+            registration = session.execute(stmt).scalars().first()
+            if registration is not None:
+                session.execute(answers_statement(registration.id)).scalars().all()
+                break
+    return time.perf_counter() - start
+
+
+def run_sync(tokens, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(sync_request, tokens))
+    return summarize("sync", latencies, time.perf_counter() - start)
+
+
+async def async_request(token):
+    start = time.perf_counter()
+    async with async_session() as session:
+        for stmt in await session.run_sync(token_statements, token):
+            registration = (await session.execute(stmt)).scalars().first()
+            if registration is not None:
+                (await session.execute(answers_statement(registration.id))).scalars().all()
+                break
+    return time.perf_counter() - start
+
+
+async def run_async(tokens, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(token):
+        async with semaphore:
+            return await async_request(token)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(bounded(token) for token in tokens))
+    return summarize("async", latencies, time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync vs async database load test")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--output", default="bench_async_db.json")
+    args = parser.parse_args(argv)
+
+    known = sample_tokens(1000)
+    if not known:
+        print("No registrations with a session_token; seed the database first.")
+        sys.exit(1)
+    rng = random.Random(1)
+    tokens = [rng.choice(known) for _ in range(args.requests)]
+    warmup = tokens[:args.warmup]
+
+    run_sync(warmup, args.concurrency)
+    sync_result = run_sync(tokens, args.concurrency)
+
+    async def async_runs():
+        try:
+            await run_async(warmup, args.concurrency)
+            result = await run_async(tokens, args.concurrency)
+            return result, pool_metrics()
+        finally:
+            # asyncpg connections have to be closed on the loop that opened them
+            await dispose_async()
+
+    async_result, pools = asyncio.run(async_runs())
+
+    print(f"{'path':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for r in (sync_result, async_result):
+        print(f"{r['path']:<6} {r['requests_per_sec']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "ran_at": datetime.now().isoformat(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "results": [sync_result, async_result],
+            "pools": pools,
+        }, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin dashboard queries with and without the dashboard indexes.
+
+Seeds N synthetic registrations (see seed_sample_registrations.py), runs
+EXPLAIN (ANALYZE, FORMAT JSON) for each dashboard query without the
+indexes and again with them, and writes the timings as JSON. Passing a
+previous result with --baseline fails the run when any indexed query got
+slower than the allowed ratio.
+
+Usage:
+    python bench_dashboard_queries.py --rows 200000 --output bench_dashboard.json
+    python bench_dashboard_queries.py --no-seed --baseline bench_dashboard.json
+"""
+import sys
+import os
+import json
+import argparse
+import statistics
+from datetime import datetime
+from sqlalchemy import text
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from db_engine import get_engine
+import registration_indexes
+
+DASHBOARD_QUERIES = {
+    "by_status": (
+        "SELECT id, name, email, status, submitted_at FROM interview_registrations "
+        "WHERE status = 'accepted' ORDER BY submitted_at DESC LIMIT 50"
+    ),
+    "by_position_school": (
+        "SELECT id, name, email, status, submitted_at FROM interview_registrations "
+        "WHERE position_type = 'UPK Teacher' AND school_type = 'UPK Program' "
+        "ORDER BY submitted_at DESC LIMIT 50"
+    ),
+    "eligible_completed": (
+        "SELECT id, name, email, position_type, submitted_at FROM interview_registrations "
+        "WHERE is_completed AND (upk_eligible OR teacher_eligible OR substitute_eligible) "
+        "AND position_type = 'Teacher' ORDER BY submitted_at DESC LIMIT 50"
+    ),
+    "upk_completed": (
+        "SELECT id, name, email, submitted_at FROM interview_registrations "
+        "WHERE is_completed AND upk_eligible ORDER BY submitted_at DESC LIMIT 50"
+    ),
+    "in_progress": (
+        "SELECT id, name, started_at FROM interview_registrations "
+        "WHERE NOT is_completed AND started_at IS NOT NULL ORDER BY started_at LIMIT 50"
+    ),
+    "session_token_lookup": (
+        "SELECT id, status, current_question_index FROM interview_registrations "
+        "WHERE session_token = 'syn_token_12345'"
+    ),
+    "answers_for_registration": (
+        "SELECT question_order, answer_text FROM question_answers "
+        "WHERE registration_id = (SELECT max(id) FROM interview_registrations) ORDER BY question_order"
+    ),
+}
+
+
+def explain(conn, sql, repeat):
+    """Median execution/planning time (ms) and plan node type over `repeat` runs"""
+    executions, plannings, node = [], [], None
+    for _ in range(repeat):
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]
+        executions.append(plan["Execution Time"])
+        plannings.append(plan["Planning Time"])
+        node = plan["Plan"]["Node Type"]
+    return {
+        "execution_ms": round(statistics.median(executions), 3),
+        "planning_ms": round(statistics.median(plannings), 3),
+        "top_node": node,
+    }
+
+
+def run_queries(engine, repeat):
+    with engine.connect() as conn:
+        return {name: explain(conn, sql, repeat) for name, sql in DASHBOARD_QUERIES.items()}
+
+
+def compare_to_baseline(result, baseline, max_ratio):
+    """Return a list of regression messages for indexed timings"""
+    regressions = []
+    for name, timing in result["after"].items():
+        previous = baseline.get("after", {}).get(name)
+        if not previous or not previous["execution_ms"]:
+            continue
+        ratio = timing["execution_ms"] / previous["execution_ms"]
+        if ratio > max_ratio:
+            regressions.append(f"{name}: {previous['execution_ms']}ms -> {timing['execution_ms']}ms ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN ANALYZE the dashboard queries before/after indexing")
+    parser.add_argument("--rows", type=int, default=100000, help="synthetic registrations to seed")
+    parser.add_argument("--no-seed", action="store_true", help="benchmark the existing data")
+    parser.add_argument("--repeat", type=int, default=5, help="EXPLAIN ANALYZE runs per query")
+    parser.add_argument("--output", default="bench_dashboard.json")
+    parser.add_argument("--baseline", help="previous result to compare against")
+    parser.add_argument("--max-ratio", type=float, default=1.5, help="allowed slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    engine = get_engine()
+    if not args.no_seed:
+        from seed_sample_registrations import clear_data, bulk_seed, generate_synthetic_registrations
+
+        print(f"Seeding {args.rows} registrations...")
+        clear_data()
+        bulk_seed(generate_synthetic_registrations(args.rows), batch_size=5000)
+
+    print("Without dashboard indexes...")
+    registration_indexes.drop_indexes(engine)
+    before = run_queries(engine, args.repeat)
+
+    print("With dashboard indexes...")
+    registration_indexes.create_indexes(engine)
+    after = run_queries(engine, args.repeat)
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT count(*) FROM interview_registrations")).scalar()
+
+    result = {"rows": rows, "ran_at": datetime.now().isoformat(), "before": before, "after": after}
+    print(f"\n{'query':<28} {'before ms':>10} {'after ms':>10} {'speedup':>8}  plan")
+    for name in DASHBOARD_QUERIES:
+        b, a = before[name]["execution_ms"], after[name]["execution_ms"]
+        print(f"{name:<28} {b:>10.3f} {a:>10.3f} {b / max(a, 1e-3):>7.1f}x  {after[name]['top_node']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(result, baseline, args.max_ratio)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"- {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
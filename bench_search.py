@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark candidate full-text search against the ILIKE scans it replaces.
+
+Seeds N synthetic registrations built from the seed_sample_registrations
+templates, installs candidate_search (column, triggers, GIN index), then
+EXPLAIN ANALYZEs each query both as an ILIKE scan over the searched columns
+and answers and as a ranked tsvector search, and writes the timings as JSON.
+
+Usage:
+    python bench_search.py --rows 100000 --output bench_search.json
+    python bench_search.py --no-seed --repeat 10
+"""
+import sys
+import os
+import json
+import argparse
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from db_engine import get_engine, maintenance_connection
+from bench_dashboard_queries import explain
+import candidate_search
+
+# (websearch query, ILIKE pattern for the baseline)
+SEARCHES = {
+    "single_term": ("curriculum", "%curriculum%"),
+    "phrase": ('"early childhood"', "%early childhood%"),
+    "answer_text": ("charter", "%charter%"),
+    "hr_question": ("vacation", "%vacation%"),
+    "rare_term": ("bilingual", "%bilingual%"),
+}
+
+
+def ilike_sql(pattern, limit):
+    columns = " OR ".join(f"r.{c} ILIKE :pattern" for c in candidate_search.SEARCHED_COLUMNS)
+    sql = f"""
+        SELECT r.id, r.registration_id, r.name FROM interview_registrations r
+        WHERE {columns}
+           OR EXISTS (SELECT 1 FROM question_answers qa
+                      WHERE qa.registration_id = r.id AND qa.answer_text ILIKE :pattern)
+        ORDER BY r.id LIMIT {limit}
+    """
+    return sql.replace(":pattern", "'" + pattern.replace("'", "''") + "'")
+
+
+def search_sql(query, limit):
+    stmt = candidate_search.search_query(query, limit=limit)
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ILIKE vs tsvector candidate search")
+    parser.add_argument("--rows", type=int, default=100000, help="synthetic registrations to seed")
+    parser.add_argument("--no-seed", action="store_true", help="benchmark the existing data")
+    parser.add_argument("--repeat", type=int, default=5, help="EXPLAIN ANALYZE runs per query")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--output", default="bench_search.json")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if not args.no_seed:
+        from seed_sample_registrations import clear_data, bulk_seed, generate_synthetic_registrations
+
+        print(f"Seeding {args.rows} registrations...")
+        clear_data()
+        bulk_seed(generate_synthetic_registrations(args.rows), batch_size=5000)
+
+    print("Installing search index...")
+    # the backfill UPDATE would run into statement_timeout on a pooled connection
+    with maintenance_connection(engine) as conn, conn.begin():
+        candidate_search.install(conn)
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE interview_registrations"))
+        rows = conn.execute(text("SELECT count(*) FROM interview_registrations")).scalar()
+
+    results = {}
+    with engine.connect() as conn:
+        for name, (query, pattern) in SEARCHES.items():
+            results[name] = {
+                "query": query,
+                "ilike": explain(conn, ilike_sql(pattern, args.limit), args.repeat),
+                "tsvector": explain(conn, search_sql(query, args.limit), args.repeat),
+            }
+
+    print(f"\n{'search':<14} {'ilike ms':>10} {'tsvector ms':>12} {'speedup':>8}  plan")
+    for name, r in results.items():
+        a, b = r["ilike"]["execution_ms"], r["tsvector"]["execution_ms"]
+        print(f"{name:<14} {a:>10.3f} {b:>12.3f} {a / max(b, 1e-3):>7.1f}x  {r['tsvector']['top_node']}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"rows": rows, "ran_at": datetime.now().isoformat(), "searches": results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch (sparse matrix) scoring against per-candidate scoring.
+
+Both sides compute the same comparison: the per-candidate baseline is
+heuristic_comparison in a loop, which score_pool vectorizes, and the
+scores and recommendations of the two are checked against each other
+(any difference is reported as a mismatch). Runs entirely in memory on
+synthetic candidates built from the sample resume and answer phrases,
+some of them with skipped questions, so no database is needed.
+Per-candidate scoring above --per-candidate-max candidates is timed on a
+sample and extrapolated (marked in the output).
+
+Usage:
+    python bench_similarity.py --sizes 1000 10000 100000 --output bench_similarity.json
+"""
+import sys
+import os
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from resume_analysis import heuristic_comparison
+from batch_similarity import score_pool
+
+RESUME_PHRASES = [
+    "Experienced elementary school teacher with 5+ years in early childhood education.",
+    "Strong background in curriculum development and classroom management.",
+    "Recent college graduate with Bachelor's in Education.",
+    "Completed student teaching at middle school level with focus on mathematics and science.",
+    "Bilingual educator with 8+ years experience in UPK and Pre-K programs.",
+    "Specializes in ESL instruction and early childhood development.",
+    "High school mathematics teacher with 3 years experience.",
+    "Strong background in algebra and geometry instruction for grades 9-12.",
+    "Tutor at Kumon Learning Center helping students with reading and math.",
+    "Assistant Teacher at Little Stars Daycare supporting toddlers and infants.",
+]
+ANSWERS = [
+    ("Are you interested in moving forward with School Professionals?",
+     "Yes, I'm very interested in substitute teaching opportunities."),
+    ("How did you hear about us?", "I found your posting on Indeed and was impressed by your work with charter schools."),
+    ("Are you able to commute & work in NYC?", "Yes, I live in Brooklyn and can easily commute to all five boroughs."),
+    ("Experience with students under age 5?",
+     "Yes, I have 8 years of experience specifically with Pre-K and UPK students ages 3-5."),
+    ("Are you comfortable with diaper changes?",
+     "Yes, absolutely. I've handled all aspects of early childhood care including diaper changes."),
+    ("Experience with students under age 5?", "No, my experience is primarily with high school students aged 14-18."),
+]
+
+
+def synthetic_pool(size, seed=7):
+    rng = random.Random(seed)
+    resumes, answers = [], []
+    for _ in range(size):
+        resumes.append(" ".join(rng.sample(RESUME_PHRASES, rng.randint(2, 5))))
+        answers.append([
+            {"question_text": q, "answer_text": a, "is_answered": rng.random() > 0.1, "question_order": order}
+            for order, (q, a) in enumerate(rng.sample(ANSWERS, rng.randint(1, 4)), 1)
+        ])
+    return resumes, answers
+
+
+def time_per_candidate(resumes, answers, limit):
+    sample = min(len(resumes), limit)
+    start = time.perf_counter()
+    results = [heuristic_comparison(resume, candidate_answers)
+               for resume, candidate_answers in zip(resumes[:sample], answers[:sample])]
+    elapsed = time.perf_counter() - start
+    return elapsed * len(resumes) / max(sample, 1), sample < len(resumes), results
+
+
+def time_batch(resumes, answers):
+    start = time.perf_counter()
+    results = score_pool(resumes, answers)
+    return time.perf_counter() - start, results
+
+
+def mismatches(expected, actual):
+    fields = ("similarity_score", "recommendation", "matching_points", "discrepancies", "confidence")
+    return sum(1 for e, a in zip(expected, actual) if any(e[f] != a[f] for f in fields))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch vs per-candidate similarity scoring benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--per-candidate-max", type=int, default=20000,
+                        help="time at most this many per-candidate scorings and extrapolate")
+    parser.add_argument("--output", default="bench_similarity.json")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'candidates':>10} {'per-cand s':>11} {'batch s':>9} {'speedup':>8} {'mismatches':>10}")
+    for size in args.sizes:
+        resumes, answers = synthetic_pool(size)
+        per_candidate, extrapolated, expected = time_per_candidate(resumes, answers, args.per_candidate_max)
+        batch, actual = time_batch(resumes, answers)
+        different = mismatches(expected, actual)
+        results.append({
+            "candidates": size,
+            "per_candidate_seconds": round(per_candidate, 4),
+            "per_candidate_extrapolated": extrapolated,
+            "batch_seconds": round(batch, 4),
+            "speedup": round(per_candidate / max(batch, 1e-9), 2),
+            "mismatches": different,
+        })
+        print(f"{size:>10} {per_candidate:>10.2f}{'*' if extrapolated else ' '} {batch:>9.2f} "
+              f"{per_candidate / max(batch, 1e-9):>7.1f}x {different:>10}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"ran_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Results written to {args.output} (* = extrapolated)")
+
+
+if __name__ == "__main__":
+    main()
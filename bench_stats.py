@@ -0,0 +1,11 @@
+"""
+Small statistics helpers shared by the benchmark scripts (bench_async_db, bench_suite).
+"""
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list; 0.0 when empty"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
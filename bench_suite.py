@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark suite.
+
+Builds a scaled dataset with the existing seeding code and times each part
+of the system that matters for throughput:
+
+    users        bulk user import with password hashing (bulk_import_users)
+    seed         bulk registration + answer seeding (seed_sample_registrations)
+    login        user lookup + password verification, per login
+    turns        per-answer interview updates, committed synchronously per turn
+    write_behind the same turns through AnswerWriteBehind (question_flow steps)
+    listing      dashboard listing queries, first page and deep keyset page
+    export       streaming NDJSON export of every registration with answers
+
+Runs against DATABASE_URL (local Postgres by default) or, with --sqlite, a
+throwaway SQLite file so it works without a database server. Every stage
+reports "seconds" plus throughput/latency figures; results are written as
+JSON together with the git commit, so runs can be compared across commits.
+
+THE SUITE DELETES ALL USERS, REGISTRATIONS AND ANSWERS in the target
+database before seeding. Do not point it at real data.
+
+On PostgreSQL the bootstrap installs the dashboard stats and candidate
+search triggers, which every seed, turn and export write pays for; the
+triggers enabled during the run are listed under environment.triggers, and
+--no-triggers disables them so runs can be compared without that cost. They
+are re-enabled when the run ends (even on failure), and the stats rollup and
+search vectors are rebuilt to cover the writes made without them.
+
+Usage:
+    python bench_suite.py --scale small --sqlite
+    python bench_suite.py --scale medium --output bench_suite.json
+    python bench_suite.py --scale medium --baseline bench_suite.json --max-ratio 1.3
+"""
+import sys
+import os
+import io
+import json
+import time
+import random
+import asyncio
+import platform
+import argparse
+import tempfile
+import subprocess
+import statistics
+from datetime import datetime
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+SCALES = {
+    # registrations, answers per registration, users, logins, interviews per turn stage
+    "small": {"registrations": 1000, "answers": 3, "users": 200, "logins": 100, "interviews": 20},
+    "medium": {"registrations": 20000, "answers": 5, "users": 2000, "logins": 500, "interviews": 100},
+    "large": {"registrations": 200000, "answers": 8, "users": 20000, "logins": 2000, "interviews": 500},
+}
+
+
+def latency_summary(latencies):
+    from bench_stats import percentile
+
+    latencies = sorted(latencies)
+    return {
+        "count": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def git_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=CURRENT_DIR, capture_output=True, text=True,
+                                  check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(status) if status is not None else None}
+
+
+# -- stages ------------------------------------------------------------------
+
+TRIGGER_TABLES = ("interview_registrations", "question_answers")
+
+
+def prepare_schema(engine, sqlite, triggers=True):
+    from sqlalchemy import text, delete
+    from app.db.postgres.database import Base
+    from app.models.interview_registration import InterviewRegistration
+    from app.models.question_answer import QuestionAnswer
+    from bootstrap_schema import USERS_TABLE_SQL, bootstrap
+
+    if sqlite:
+        with engine.begin() as conn:
+            conn.execute(text(USERS_TABLE_SQL))
+        Base.metadata.create_all(engine, tables=[InterviewRegistration.__table__, QuestionAnswer.__table__])
+    else:
+        bootstrap(engine)
+        # USER leaves the internal foreign key triggers alone; re-enable first
+        # in case an earlier --no-triggers run left them disabled
+        with engine.begin() as conn:
+            for table in TRIGGER_TABLES:
+                conn.execute(text(f"ALTER TABLE {table} ENABLE TRIGGER USER"))
+                if not triggers:
+                    conn.execute(text(f"ALTER TABLE {table} DISABLE TRIGGER USER"))
+    with engine.begin() as conn:
+        conn.execute(delete(QuestionAnswer.__table__))
+        conn.execute(delete(InterviewRegistration.__table__))
+        conn.execute(text("DELETE FROM users"))
+
+
+def active_triggers(engine):
+    """Names of the enabled user triggers on the benchmarked tables (PostgreSQL only)"""
+    if engine.url.get_backend_name() != "postgresql":
+        return []
+    from sqlalchemy import text
+
+    with engine.connect() as conn:
+        return conn.execute(text("""
+            SELECT t.tgname FROM pg_trigger t
+            WHERE NOT t.tgisinternal AND t.tgenabled <> 'D'
+              AND t.tgrelid = ANY(CAST(:tables AS regclass[]))
+            ORDER BY t.tgname
+        """), {"tables": list(TRIGGER_TABLES)}).scalars().all()
+
+
+def restore_triggers(engine):
+    """Undo --no-triggers: re-enable the triggers and recompute what they maintain.
+
+    Writes made while they were off never reached registration_stats or
+    search_vector, so both are rebuilt from the tables (PostgreSQL only).
+    """
+    from sqlalchemy import text
+    import dashboard_stats
+    import candidate_search
+    from db_engine import maintenance_connection
+
+    with maintenance_connection(engine) as conn, conn.begin():
+        for table in TRIGGER_TABLES:
+            conn.execute(text(f"ALTER TABLE {table} ENABLE TRIGGER USER"))
+        dashboard_stats.rebuild(conn)
+        candidate_search.reindex(conn)
+
+
+def synthetic_users(count):
+    return [{
+        "userid": n,
+        "name": f"Bench User {n}",
+        "password": None,
+        "plain_password": f"password{n}",
+        "emailid": f"user{n}@example.com",
+        "isadmin": n <= 2,
+        "islogin": False,
+    } for n in range(1, count + 1)]
+
+
+def stage_users(engine, count, hash_workers=None):
+    from bulk_import_users import import_users
+
+    rows = synthetic_users(count)
+    start = time.perf_counter()
+    with engine.begin() as conn:
+        import_users(conn, rows, batch_size=1000, log_every=0, hash_workers=hash_workers)
+    seconds = time.perf_counter() - start
+    return {"seconds": round(seconds, 3), "users": count, "users_per_sec": round(count / seconds, 1)}
+
+
+def stage_seed(count, answers, batch_size, use_copy):
+    from seed_sample_registrations import bulk_seed, generate_synthetic_registrations
+
+    start = time.perf_counter()
+    registrations, answer_rows = bulk_seed(generate_synthetic_registrations(count, answers),
+                                           batch_size=batch_size, use_copy=use_copy)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "registrations": registrations,
+        "answers": answer_rows,
+        "rows_per_sec": round((registrations + answer_rows) / seconds, 1),
+    }
+
+
+def stage_login(engine, users, logins, rng):
+    from password_hashing import verify_and_update
+    from schema_cache import user_statement
+
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for _ in range(logins):
+        n = rng.randint(1, users)
+        t0 = time.perf_counter()
+        with engine.connect() as conn:
+            user = conn.execute(user_statement(conn, "by_email"), {"emailid": f"user{n}@example.com"}).mappings().first()
+        ok, _ = verify_and_update(f"password{n}", user["password"]) if user else (False, None)
+        latencies.append(time.perf_counter() - t0)
+        failures += int(not ok)
+    seconds = time.perf_counter() - start
+    return {"seconds": round(seconds, 3), "logins_per_sec": round(logins / seconds, 1),
+            "failures": failures, **latency_summary(latencies)}
+
+
+def _interview_ids(engine, count, offset):
+    from sqlalchemy import select
+    from app.models.interview_registration import InterviewRegistration
+
+    reg = InterviewRegistration.__table__
+    with engine.connect() as conn:
+        return conn.execute(select(reg.c.id).order_by(reg.c.id).offset(offset).limit(count)).scalars().all()
+
+
+def _interview_steps(flow):
+    """The FlowStep sequence of a candidate who answers yes to everything"""
+    steps, index = [], 0
+    while len(steps) < 100:
+        step = flow.advance(index, "Yes, definitely")
+        steps.append(step)
+        if step.completed:
+            break
+        index = step.next_index
+    return steps
+
+
+def stage_turns(engine, registration_ids):
+    """The synchronous path: every answer commits its own transaction"""
+    from sqlalchemy import update, insert
+    from app.models.interview_registration import InterviewRegistration
+    from app.models.question_answer import QuestionAnswer
+    from question_flow import DEFAULT_FLOW
+
+    reg, qa = InterviewRegistration.__table__, QuestionAnswer.__table__
+    steps = _interview_steps(DEFAULT_FLOW)
+    latencies = []
+    start = time.perf_counter()
+    for registration_id in registration_ids:
+        for step in steps:
+            t0 = time.perf_counter()
+            with engine.begin() as conn:
+                order = step.question_index + 1
+                values = {"answer_text": "Yes, definitely", "is_answered": True}
+                result = conn.execute(update(qa).where(qa.c.registration_id == registration_id,
+                                                      qa.c.question_order == order).values(**values))
+                if result.rowcount == 0:
+                    conn.execute(insert(qa).values(registration_id=registration_id, question_order=order,
+                                                   question_text=DEFAULT_FLOW.question(step.question_index),
+                                                   **values))
+                fields = dict(step.updates, current_question_index=step.next_index)
+                if step.completed:
+                    fields.update(is_completed=True, completed_at=datetime.now())
+                conn.execute(update(reg).where(reg.c.id == registration_id).values(**fields))
+            latencies.append(time.perf_counter() - t0)
+    seconds = time.perf_counter() - start
+    return {"seconds": round(seconds, 3), "turns_per_sec": round(len(latencies) / seconds, 1),
+            **latency_summary(latencies)}
+
+
+def stage_write_behind(registration_ids, fsync):
+    from answer_write_behind import AnswerWriteBehind
+    from question_flow import DEFAULT_FLOW
+
+    steps = _interview_steps(DEFAULT_FLOW)
+
+    async def run():
+        with tempfile.TemporaryDirectory() as journal_dir:
+            buffer = AnswerWriteBehind(journal_dir=journal_dir, fsync=fsync)
+            await buffer.start()
+            latencies = []
+            start = time.perf_counter()
+            for registration_id in registration_ids:
+                for step in steps:
+                    t0 = time.perf_counter()
+                    await buffer.record_turn(registration_id, step, "Yes, definitely")
+                    latencies.append(time.perf_counter() - t0)
+            await buffer.stop()
+            return time.perf_counter() - start, latencies, buffer.metrics()
+
+    seconds, latencies, metrics = asyncio.run(run())
+    return {
+        "seconds": round(seconds, 3),
+        "turns_per_sec": round(len(latencies) / seconds, 1),
+        "flushes": metrics["flushes"],
+        "avg_flush_ms": round(metrics["avg_flush_seconds"] * 1000, 3),
+        **latency_summary(latencies),
+    }
+
+
+def stage_listing(engine, repeat):
+    from sqlalchemy import select, func
+    from app.models.interview_registration import InterviewRegistration
+
+    reg = InterviewRegistration.__table__
+    columns = (reg.c.id, reg.c.name, reg.c.email, reg.c.status, reg.c.position_type, reg.c.submitted_at)
+    with engine.connect() as conn:
+        middle_id = (conn.execute(select(func.max(reg.c.id))).scalar() or 0) // 2
+    queries = {
+        "by_status": select(*columns).where(reg.c.status == "accepted")
+        .order_by(reg.c.submitted_at.desc()).limit(50),
+        "completed_by_position": select(*columns).where(reg.c.is_completed.is_(True), reg.c.position_type == "Teacher")
+        .order_by(reg.c.submitted_at.desc()).limit(50),
+        "deep_keyset_page": select(*columns).where(reg.c.id > middle_id).order_by(reg.c.id).limit(50),
+    }
+    results, total = {}, 0.0
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            latencies = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                conn.execute(stmt).all()
+                latencies.append(time.perf_counter() - t0)
+            total += sum(latencies)
+            results[name] = latency_summary(latencies)
+    return {"seconds": round(total, 3), "queries": results}
+
+
+def stage_export(page_size):
+    from export_registrations import export
+
+    out = io.StringIO()
+    start = time.perf_counter()
+    registrations, answers = export(out, "ndjson", page_size)
+    seconds = time.perf_counter() - start
+    return {
+        "seconds": round(seconds, 3),
+        "registrations": registrations,
+        "answers": answers,
+        "registrations_per_sec": round(registrations / seconds, 1),
+        "megabytes": round(len(out.getvalue().encode("utf-8")) / 1e6, 2),
+    }
+
+
+def compare_to_baseline(stages, baseline, max_ratio):
+    regressions = []
+    for name, result in stages.items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous or not previous.get("seconds") or "seconds" not in result:
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        if ratio > max_ratio:
+            regressions.append(f"{name}: {previous['seconds']}s -> {result['seconds']}s ({ratio:.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--registrations", type=int, help="override the scale's registration count")
+    parser.add_argument("--users", type=int, help="override the scale's user count")
+    parser.add_argument("--sqlite", nargs="?", const="", default=None, metavar="PATH",
+                        help="run against a SQLite file instead of DATABASE_URL (default: a temp file)")
+    parser.add_argument("--stages", nargs="+",
+                        default=["users", "seed", "login", "turns", "write_behind", "listing", "export"])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--copy", action="store_true", help="load answers with COPY (PostgreSQL)")
+    parser.add_argument("--hash-rounds", type=int, help="PASSWORD_HASH_ROUNDS for the run")
+    parser.add_argument("--hash-workers", type=int, default=None)
+    parser.add_argument("--no-fsync", action="store_true", help="don't fsync the write-behind journal")
+    parser.add_argument("--no-triggers", action="store_true",
+                        help="disable the stats/search triggers on the benchmarked tables (PostgreSQL)")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per listing query")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_suite.json")
+    parser.add_argument("--baseline", help="previous result to compare against")
+    parser.add_argument("--max-ratio", type=float, default=1.5, help="allowed slowdown vs the baseline")
+    args = parser.parse_args(argv)
+
+    params = dict(SCALES[args.scale])
+    if args.registrations:
+        params["registrations"] = args.registrations
+    if args.users:
+        params["users"] = args.users
+
+    if "login" in args.stages and "users" not in args.stages:
+        parser.error("the login stage needs the users stage")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    # Must be set before anything creates the shared engine
+    sqlite_path = None
+    if args.sqlite is not None:
+        sqlite_path = args.sqlite or os.path.join(tempfile.mkdtemp(prefix="bench_suite_"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{sqlite_path}"
+        if args.copy:
+            parser.error("--copy needs PostgreSQL")
+    if args.hash_rounds:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.hash_rounds)
+
+    from db_engine import get_engine
+
+    engine = get_engine()
+    rng = random.Random(args.seed)
+    print(f"Preparing {engine.url.get_backend_name()} database...")
+    stages = {}
+    try:
+        prepare_schema(engine, sqlite_path is not None, triggers=not args.no_triggers)
+
+        def run(name, fn, *fn_args):
+            if name not in args.stages:
+                return
+            print(f"\n== {name}")
+            stages[name] = fn(*fn_args)
+            print(f"   {stages[name]['seconds']:.3f}s")
+
+        run("users", stage_users, engine, params["users"], args.hash_workers)
+        run("seed", stage_seed, params["registrations"], params["answers"], args.batch_size, args.copy)
+        run("login", stage_login, engine, params["users"], params["logins"], rng)
+        interviews = params["interviews"]
+        run("turns", stage_turns, engine, _interview_ids(engine, interviews, 0))
+        if "write_behind" in args.stages:
+            try:
+                # the async driver for DATABASE_URL (see db_engine.ASYNC_DRIVERS)
+                if sqlite_path is not None:
+                    import aiosqlite  # noqa: F401
+                else:
+                    import asyncpg  # noqa: F401
+            except ImportError as e:
+                stages["write_behind"] = {"skipped": f"{e.name} is not installed"}
+            else:
+                run("write_behind", stage_write_behind, _interview_ids(engine, interviews, interviews), not args.no_fsync)
+        run("listing", stage_listing, engine, args.repeat)
+        run("export", stage_export, 1000)
+        # listed before restore_triggers re-enables anything
+        triggers = active_triggers(engine)
+    finally:
+        if args.no_triggers and engine.url.get_backend_name() == "postgresql":
+            print("\nRe-enabling triggers and rebuilding the stats rollup and search vectors...")
+            restore_triggers(engine)
+
+    if engine.url.get_backend_name() == "postgresql":
+        from sqlalchemy import text
+
+        with engine.connect() as conn:
+            server = conn.execute(text("SHOW server_version")).scalar()
+    else:
+        import sqlite3
+        server = sqlite3.sqlite_version
+
+    result = {
+        "ran_at": datetime.now().isoformat(),
+        "git": git_info(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": engine.url.get_backend_name(),
+            "server_version": server,
+            "triggers": triggers,
+        },
+        "scale": args.scale,
+        "params": params,
+        "stages": stages,
+    }
+
+    print(f"\n{'stage':<14} {'seconds':>10}")
+    for name, stage in stages.items():
+        print(f"{name:<14} {stage['seconds']:>10.3f}" if "seconds" in stage else f"{name:<14} {stage['skipped']:>10}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if baseline is not None:
+        baseline_triggers = baseline.get("environment", {}).get("triggers")
+        if baseline_triggers is not None and baseline_triggers != result["environment"]["triggers"]:
+            print(f"Note: the baseline ran with triggers {baseline_triggers}, "
+                  f"this run with {result['environment']['triggers']}")
+        regressions = compare_to_baseline(stages, baseline, args.max_ratio)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"- {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Idempotent, parallel-safe schema bootstrap.
+
+Replaces the DROP/CREATE scripts for container startup. The schema is a
+list of named steps (users table, ORM tables, resume comparison indexes,
+dashboard indexes, dashboard stats rollup, candidate search); schema_bootstrap records the
+checksum of each applied step. At startup:
+
+  1. One query reads schema_bootstrap. If every step's checksum (and the
+     expected alembic head, when known) matches, we are done.
+  2. Otherwise a Postgres advisory lock is taken, so when several
+     containers start at once only one applies DDL and the others wait,
+     re-read schema_bootstrap and find nothing left to do.
+  3. The alembic revision is checked against the head of the migration
+     scripts, then only the missing or changed steps are applied.
+
+Every step is written with IF NOT EXISTS / CREATE OR REPLACE, so re-running
+one against an existing database is safe.
+
+Usage:
+    python bootstrap_schema.py                    # apply missing steps
+    python bootstrap_schema.py --status           # show what would run
+    python bootstrap_schema.py --alembic-upgrade  # run "alembic upgrade head" if behind
+    python bootstrap_schema.py --force            # re-apply every step
+"""
+import sys
+import os
+import hashlib
+import argparse
+from typing import Callable, NamedTuple
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+LOCK_KEY = int(os.getenv("SCHEMA_BOOTSTRAP_LOCK_KEY", 8301745))
+ALEMBIC_STEP = "alembic_revision"
+
+USERS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS users (
+    UserId INT PRIMARY KEY,
+    Name VARCHAR(255),
+    Password VARCHAR(255),
+    EmailId VARCHAR(255),
+    IsAdmin BOOLEAN,
+    CreatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    IsLogin BOOLEAN
+)
+"""
+
+BOOTSTRAP_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_bootstrap (
+    step VARCHAR(100) PRIMARY KEY,
+    checksum VARCHAR(64) NOT NULL,
+    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+RECORD_SQL = text("""
+INSERT INTO schema_bootstrap (step, checksum, applied_at) VALUES (:step, :checksum, CURRENT_TIMESTAMP)
+ON CONFLICT (step) DO UPDATE SET checksum = excluded.checksum, applied_at = excluded.applied_at
+""")
+
+
+class BootstrapStep(NamedTuple):
+    name: str
+    checksum: str
+    apply: Callable
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    transactional: bool = True
+
+
+def _checksum(*parts):
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def _statements_step(name, statements, transactional=True):
+    def apply(conn):
+        for sql in statements:
+            conn.execute(text(sql))
+    return BootstrapStep(name, _checksum(*statements), apply, transactional)
+
+
+def _create_dashboard_indexes(conn):
+    from registration_indexes import create_statements, invalid_indexes
+    from registration_partitions import partitioned_tables
+
+    for sql in create_statements(partitioned=partitioned_tables(conn), invalid=invalid_indexes(conn)):
+        conn.execute(text(sql))
+
+
+def bootstrap_steps():
+    """The schema, in dependency order"""
+    from app.db.postgres.database import Base
+    import app.models.interview_registration  # noqa: F401  (register the models on Base.metadata)
+    import app.models.question_answer  # noqa: F401
+    import app.models.user  # noqa: F401
+    import resume_derivation_cache
+    import registration_indexes
+    import resume_comparison_filters
+    import dashboard_stats
+    import candidate_search
+
+    dialect = postgresql.dialect()
+    orm_ddl = [str(CreateTable(t).compile(dialect=dialect)) for t in Base.metadata.sorted_tables]
+    orm_ddl += [str(CreateIndex(i).compile(dialect=dialect))
+                for t in Base.metadata.sorted_tables for i in sorted(t.indexes, key=lambda i: i.name or "")]
+
+    return [
+        _statements_step("users_table", [USERS_TABLE_SQL]),
+        BootstrapStep("orm_tables", _checksum(*orm_ddl),
+                      lambda conn: Base.metadata.create_all(bind=conn, checkfirst=True)),
+        _statements_step("resume_derivations", resume_derivation_cache.MIGRATION_STATEMENTS),
+        _statements_step("resume_comparison_jsonb", resume_comparison_filters.MIGRATION_STATEMENTS),
+        BootstrapStep("dashboard_indexes", _checksum(*registration_indexes.create_statements()),
+                      _create_dashboard_indexes, transactional=False),
+        BootstrapStep("dashboard_stats", _checksum(*dashboard_stats.INSTALL_STATEMENTS), dashboard_stats.install),
+        BootstrapStep("candidate_search", _checksum(*candidate_search.INSTALL_STATEMENTS), candidate_search.install),
+    ]
+
+
+def expected_alembic_head():
+    """Head revision of the migration scripts, or None when they are not available"""
+    if os.getenv("ALEMBIC_HEAD"):
+        return os.getenv("ALEMBIC_HEAD")
+    try:
+        from alembic.config import Config
+        from alembic.script import ScriptDirectory
+
+        config = Config(os.path.join(CURRENT_DIR, "alembic.ini"))
+        config.set_main_option("script_location", os.path.join(CURRENT_DIR, "alembic"))
+        return ScriptDirectory.from_config(config).get_current_head()
+    except Exception:
+        return None
+
+
+def current_alembic_revision(conn):
+    if conn.execute(text("SELECT to_regclass('alembic_version')")).scalar() is None:
+        return None
+    return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def applied_steps(conn):
+    """{step: checksum}; empty when the database has never been bootstrapped"""
+    try:
+        return dict(conn.execute(text("SELECT step, checksum FROM schema_bootstrap")).all())
+    except DBAPIError as e:
+        if getattr(e.orig, "pgcode", None) == "42P01":  # undefined_table
+            return {}
+        raise
+
+
+def pending_steps(applied, steps, alembic_head):
+    pending = [step for step in steps if applied.get(step.name) != step.checksum]
+    alembic_pending = alembic_head is not None and applied.get(ALEMBIC_STEP) != alembic_head
+    return pending, alembic_pending
+
+
+def _check_alembic(engine, conn, alembic_head, alembic_upgrade):
+    revision = current_alembic_revision(conn)
+    if revision == alembic_head:
+        return
+    if not alembic_upgrade:
+        raise RuntimeError(
+            f"Database is at alembic revision {revision}, expected {alembic_head}; "
+            "run 'alembic upgrade head' or pass --alembic-upgrade"
+        )
+    from alembic import command
+    from alembic.config import Config
+
+    print(f"Upgrading alembic revision {revision} -> {alembic_head}")
+    config = Config(os.path.join(CURRENT_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", engine.url.render_as_string(hide_password=False))
+    command.upgrade(config, "head")
+
+
+def bootstrap(engine=None, force=False, alembic_upgrade=False, dry_run=False):
+    """Apply the missing schema steps; returns the names of the steps applied"""
+    if engine is None:
+        from db_engine import get_engine
+        engine = get_engine()
+
+    steps = bootstrap_steps()
+    alembic_head = expected_alembic_head()
+
+    # Common case: one query and nothing to do
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        applied = {} if force else applied_steps(conn)
+    pending, alembic_pending = pending_steps(applied, steps, alembic_head)
+    if not pending and not alembic_pending:
+        return []
+    if dry_run:
+        return ([ALEMBIC_STEP] if alembic_pending else []) + [step.name for step in pending]
+
+    from db_engine import maintenance_connection
+
+    # No statement_timeout: waiting for the lock and building indexes can both take a while
+    with maintenance_connection(engine, autocommit=True) as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": LOCK_KEY})
+        try:
+            lock_conn.execute(text(BOOTSTRAP_TABLE_SQL))
+            # Another process may have finished while we waited for the lock
+            applied = {} if force else applied_steps(lock_conn)
+            pending, alembic_pending = pending_steps(applied, steps, alembic_head)
+            done = []
+
+            if alembic_pending:
+                _check_alembic(engine, lock_conn, alembic_head, alembic_upgrade)
+                lock_conn.execute(RECORD_SQL, {"step": ALEMBIC_STEP, "checksum": alembic_head})
+                done.append(ALEMBIC_STEP)
+
+            for step in pending:
+                print(f"Applying {step.name}...")
+                if step.transactional:
+                    with maintenance_connection(engine) as conn, conn.begin():
+                        step.apply(conn)
+                        conn.execute(RECORD_SQL, {"step": step.name, "checksum": step.checksum})
+                else:
+                    step.apply(lock_conn)
+                    lock_conn.execute(RECORD_SQL, {"step": step.name, "checksum": step.checksum})
+                done.append(step.name)
+            return done
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply missing schema DDL")
+    parser.add_argument("--status", action="store_true", help="only list the steps that would run")
+    parser.add_argument("--force", action="store_true", help="re-apply every step")
+    parser.add_argument("--alembic-upgrade", action="store_true",
+                        help="run 'alembic upgrade head' when the database is behind")
+    args = parser.parse_args(argv)
+
+    try:
+        done = bootstrap(force=args.force, alembic_upgrade=args.alembic_upgrade, dry_run=args.status)
+    except Exception as e:
+        print(f"Error bootstrapping schema: {e}")
+        sys.exit(1)
+
+    if not done:
+        print("Schema is up to date.")
+    elif args.status:
+        print("Pending steps:")
+        for name in done:
+            print(f"- {name}")
+    else:
+        print(f"Applied: {', '.join(done)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Bulk import of users from a CSV or JSONL file.
+
+The file is streamed and loaded in batches, either as a multi-row
+executemany or with psycopg2's COPY FROM STDIN. Each row needs
+userid, name, emailid and either password (plain text) or password_hash;
+isadmin / islogin are optional and default to False. Plain-text passwords
+are hashed per batch on a process pool (see password_hashing.py).
+
+Usage:
+    python bulk_import_users.py users.csv --batch-size 5000 --method copy
+"""
+import sys
+import os
+import io
+import csv
+import json
+import time
+import argparse
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import text, insert, table, column
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from password_hashing import hash_many
+from schema_cache import column_name
+
+USER_COLUMNS = ("UserId", "Name", "Password", "EmailId", "IsAdmin", "IsLogin")
+TRUE_VALUES = {"1", "true", "t", "yes", "y"}
+
+
+def resolve_user_columns(conn):
+    """Map logical column names to the identifiers actually used by the users table"""
+    return {name: column_name(conn, "users", name) for name in USER_COLUMNS}
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    if value is None:
+        return False
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def iter_user_rows(path):
+    """Stream user rows from a .csv or .jsonl file as insert parameter dicts"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".ndjson")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for record in records:
+            record = {k.strip().lower(): v for k, v in record.items()}
+            yield {
+                "userid": int(record["userid"]),
+                "name": record["name"],
+                "password": record.get("password_hash"),
+                "plain_password": None if record.get("password_hash") else record["password"],
+                "emailid": record["emailid"],
+                "isadmin": _to_bool(record.get("isadmin")),
+                "islogin": _to_bool(record.get("islogin")),
+            }
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def hash_plain_passwords(rows, executor=None):
+    """Fill in "password" for rows that only carry a plain_password"""
+    pending = [row for row in rows if row.get("plain_password") is not None]
+    if pending:
+        hashes = hash_many([row["plain_password"] for row in pending], executor)
+        for row, hashed in zip(pending, hashes):
+            row["password"] = hashed
+            row["plain_password"] = None
+    return rows
+
+
+def insert_users(conn, rows, columns):
+    """Insert a batch of user dicts with a single multi-row executemany"""
+    users = table("users", *(column(columns[name]) for name in USER_COLUMNS))
+    conn.execute(insert(users), [
+        {columns[name]: row[name.lower()] for name in USER_COLUMNS}
+        for row in rows
+    ])
+
+
+def copy_users(conn, rows, columns):
+    """Load a batch of user dicts with COPY FROM STDIN (psycopg2 only)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([row[name.lower()] for name in USER_COLUMNS])
+    buf.seek(0)
+    column_list = ", ".join(f'"{columns[name]}"' for name in USER_COLUMNS)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY users ({column_list}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+
+
+def import_users(conn, rows, batch_size=5000, method="executemany", log_every=1, hash_workers=None):
+    """Load an iterable of user dicts into the users table in batches.
+
+    Rows may carry "plain_password" instead of a hashed "password"; those
+    are hashed on a process pool before each batch is written. The caller
+    owns the transaction; returns the number of rows loaded.
+    """
+    load = copy_users if method == "copy" else insert_users
+    columns = resolve_user_columns(conn)
+    total = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=hash_workers) as pool:
+        for i, batch in enumerate(_batched(rows, batch_size), 1):
+            hash_plain_passwords(batch, pool)
+            load(conn, batch, columns)
+            total += len(batch)
+            if log_every and i % log_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"  ... {total} users ({total / max(elapsed, 1e-9):,.0f} rows/sec)")
+    elapsed = time.perf_counter() - start
+    print(f"Imported {total} users in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} rows/sec)")
+    return total
+
+
+def main(argv=None):
+    from db_engine import sync_session
+
+    parser = argparse.ArgumentParser(description="Bulk import users from a CSV or JSONL file")
+    parser.add_argument("path", help="users file (.csv, .jsonl or .ndjson)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--method", choices=("executemany", "copy"), default="executemany")
+    parser.add_argument("--truncate", action="store_true", help="delete existing users first")
+    args = parser.parse_args(argv)
+
+    db = sync_session()
+    try:
+        conn = db.connection()
+        if args.truncate:
+            conn.execute(text("DELETE FROM users"))
+        import_users(conn, iter_user_rows(args.path), batch_size=args.batch_size, method=args.method)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error importing users: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
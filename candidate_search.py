@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Ranked full-text search over candidates.
+
+interview_registrations.search_vector is a weighted tsvector of
+
+    A  resume_summary
+    B  work_experience_summary
+    C  resume_extracted_text and the candidate's answers (question_answers.answer_text)
+    D  question_by_user_to_hr
+
+with a GIN index. It is kept current by triggers: a BEFORE trigger on
+interview_registrations recomputes it when one of the text columns
+changes, and statement-level triggers on question_answers recompute it
+once per statement for the registrations whose answers changed, so a
+write-behind flush of many answers costs one UPDATE, not one per answer.
+
+Queries use websearch_to_tsquery syntax ("curriculum development",
+teacher -substitute, daycare OR preschool) and are ranked with ts_rank_cd.
+
+Usage:
+    python candidate_search.py --install            # column, triggers, index and backfill
+    python candidate_search.py "early childhood"    # search from the command line
+
+API (behind admin_auth.require_admin):
+    app.include_router(candidate_search.router)     # GET /api/admin/candidates/search?q=...
+"""
+import sys
+import os
+import argparse
+from typing import Optional
+from sqlalchemy import select, func, literal_column, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from registration_partitions import prune_recent, registrations_partitioned, aregistrations_partitioned
+
+TEXT_CONFIG = "english"
+TABLE = "interview_registrations"
+SEARCHED_COLUMNS = ("resume_summary", "work_experience_summary", "resume_extracted_text", "question_by_user_to_hr")
+
+INSTALL_STATEMENTS = [
+    f"ALTER TABLE {TABLE} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+    f"""
+    CREATE OR REPLACE FUNCTION registration_search_vector(
+        summary text, work_experience text, resume text, hr_question text, registration integer
+    ) RETURNS tsvector AS $$
+        SELECT setweight(to_tsvector('{TEXT_CONFIG}', coalesce(summary, '')), 'A')
+            || setweight(to_tsvector('{TEXT_CONFIG}', coalesce(work_experience, '')), 'B')
+            || setweight(to_tsvector('{TEXT_CONFIG}', coalesce(resume, '')), 'C')
+            || setweight(to_tsvector('{TEXT_CONFIG}', coalesce(
+                   (SELECT string_agg(answer_text, ' ' ORDER BY question_order)
+                    FROM question_answers WHERE registration_id = registration), '')), 'C')
+            || setweight(to_tsvector('{TEXT_CONFIG}', coalesce(hr_question, '')), 'D')
+    $$ LANGUAGE sql STABLE
+    """,
+    """
+    CREATE OR REPLACE FUNCTION registration_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := registration_search_vector(
+            NEW.resume_summary, NEW.work_experience_summary, NEW.resume_extracted_text,
+            NEW.question_by_user_to_hr, NEW.id);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION answers_search_trigger() RETURNS trigger AS $$
+    BEGIN
+        -- changed_answers is the transition table of whichever event fired
+        UPDATE {TABLE} r SET search_vector = registration_search_vector(
+            r.resume_summary, r.work_experience_summary, r.resume_extracted_text,
+            r.question_by_user_to_hr, r.id)
+        WHERE r.id IN (SELECT DISTINCT registration_id FROM changed_answers);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"DROP TRIGGER IF EXISTS trg_registration_search ON {TABLE}",
+    f"""
+    CREATE TRIGGER trg_registration_search
+    BEFORE INSERT OR UPDATE OF {", ".join(SEARCHED_COLUMNS)} ON {TABLE}
+    FOR EACH ROW EXECUTE FUNCTION registration_search_trigger()
+    """,
+    # Transition tables allow only one event per trigger
+    "DROP TRIGGER IF EXISTS trg_answers_search_insert ON question_answers",
+    """
+    CREATE TRIGGER trg_answers_search_insert
+    AFTER INSERT ON question_answers REFERENCING NEW TABLE AS changed_answers
+    FOR EACH STATEMENT EXECUTE FUNCTION answers_search_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_answers_search_update ON question_answers",
+    """
+    CREATE TRIGGER trg_answers_search_update
+    AFTER UPDATE ON question_answers REFERENCING NEW TABLE AS changed_answers
+    FOR EACH STATEMENT EXECUTE FUNCTION answers_search_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_answers_search_delete ON question_answers",
+    """
+    CREATE TRIGGER trg_answers_search_delete
+    AFTER DELETE ON question_answers REFERENCING OLD TABLE AS changed_answers
+    FOR EACH STATEMENT EXECUTE FUNCTION answers_search_trigger()
+    """,
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_search_vector ON {TABLE} USING gin (search_vector)",
+]
+
+UNINSTALL_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS trg_answers_search_insert ON question_answers",
+    "DROP TRIGGER IF EXISTS trg_answers_search_update ON question_answers",
+    "DROP TRIGGER IF EXISTS trg_answers_search_delete ON question_answers",
+    f"DROP TRIGGER IF EXISTS trg_registration_search ON {TABLE}",
+    "DROP FUNCTION IF EXISTS answers_search_trigger()",
+    "DROP FUNCTION IF EXISTS registration_search_trigger()",
+    "DROP FUNCTION IF EXISTS registration_search_vector(text, text, text, text, integer)",
+    f"DROP INDEX IF EXISTS ix_{TABLE}_search_vector",
+    f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+REINDEX_SQL = f"""
+UPDATE {TABLE} r SET search_vector = registration_search_vector(
+    r.resume_summary, r.work_experience_summary, r.resume_extracted_text, r.question_by_user_to_hr, r.id)
+WHERE r.id > :after_id AND r.id <= :upto_id
+"""
+
+
+def install(conn, batch_size=10000):
+    for sql in INSTALL_STATEMENTS:
+        conn.execute(text(sql))
+    reindex(conn, batch_size)
+
+
+def reindex(conn, batch_size=10000):
+    """Recompute search_vector for every registration, in id ranges; returns rows updated"""
+    last_id = conn.execute(text(f"SELECT coalesce(max(id), 0) FROM {TABLE}")).scalar()
+    updated = 0
+    for after_id in range(0, last_id, batch_size):
+        updated += conn.execute(text(REINDEX_SQL), {"after_id": after_id, "upto_id": after_id + batch_size}).rowcount
+    return updated
+
+
+SEARCH_VECTOR = literal_column(f"{TABLE}.search_vector", TSVECTOR)
+
+
+def _tsquery(query):
+    return func.websearch_to_tsquery(literal_column(f"'{TEXT_CONFIG}'::regconfig"), query)
+
+
+def search_query(query, limit=20, offset=0, recent_months=None, partitioned=False):
+    """Matching registrations, best rank first, with a highlighted resume_summary snippet.
+
+    Fetches limit + 1 rows so callers can tell whether another page exists.
+    recent_months limits it to the last N months; by default the recent
+    partitions when `partitioned`, 0 for all history (see registration_partitions).
+    """
+    reg = InterviewRegistration.__table__
+    tsq = _tsquery(query)
+    rank = func.ts_rank_cd(SEARCH_VECTOR, tsq, 32).label("rank")
+    page = prune_recent(
+        select(reg.c.id, reg.c.registration_id, reg.c.name, reg.c.email, reg.c.status,
+               reg.c.position_type, reg.c.submitted_at, reg.c.resume_summary, rank)
+        .where(SEARCH_VECTOR.op("@@")(tsq)),
+        recent_months,
+        partitioned=partitioned,
+    ).order_by(rank.desc(), reg.c.id).limit(limit + 1).offset(offset).subquery()
+
+    # ts_headline is expensive, so it only runs on the page, not on every match
+    snippet = func.ts_headline(
+        literal_column(f"'{TEXT_CONFIG}'::regconfig"), func.coalesce(page.c.resume_summary, ""), tsq,
+        "MaxFragments=2, MaxWords=20, MinWords=5",
+    ).label("snippet")
+    columns = [c for c in page.c if c.name != "resume_summary"]
+    return select(*columns, snippet).order_by(page.c.rank.desc(), page.c.id)
+
+
+def _shape(rows, limit, offset):
+    results = [dict(row) for row in rows]
+    for row in results:
+        row["rank"] = float(row["rank"])
+    return {
+        "results": results[:limit],
+        "offset": offset,
+        "limit": limit,
+        "has_more": len(results) > limit,
+    }
+
+
+def search_candidates(conn, query, limit=20, offset=0, recent_months=None):
+    stmt = search_query(query, limit, offset, recent_months, registrations_partitioned(conn))
+    return _shape(conn.execute(stmt).mappings(), limit, offset)
+
+
+async def asearch_candidates(session, query, limit=20, offset=0, recent_months=None):
+    stmt = search_query(query, limit, offset, recent_months, await aregistrations_partitioned(session))
+    result = await session.execute(stmt)
+    return _shape(result.mappings(), limit, offset)
+
+
+def _build_router():
+    from fastapi import APIRouter, Depends, Query
+    from admin_auth import require_admin
+
+    router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+    @router.get("/candidates/search")
+    async def candidates_search(
+        q: str = Query(..., min_length=1),
+        limit: int = Query(20, ge=1, le=100),
+        offset: int = Query(0, ge=0),
+        recent_months: Optional[int] = Query(None, ge=0, description="last N months; 0 = all history"),
+    ):
+        from db_engine import async_session
+
+        async with async_session() as session:
+            return await asearch_candidates(session, q, limit, offset, recent_months)
+
+    return router
+
+
+def __getattr__(name):
+    # candidate_search.router is built on first access, so the DDL (bootstrap_schema) needs no FastAPI
+    if name == "router":
+        globals()["router"] = _build_router()
+        return globals()["router"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None):
+    from db_engine import get_engine, maintenance_connection
+
+    parser = argparse.ArgumentParser(description="Full-text candidate search")
+    parser.add_argument("query", nargs="?")
+    parser.add_argument("--install", action="store_true", help="create the column, triggers and index and backfill")
+    parser.add_argument("--reindex", action="store_true", help="recompute every search_vector")
+    parser.add_argument("--uninstall", action="store_true")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--offset", type=int, default=0)
+    parser.add_argument("--recent-months", type=int, default=None,
+                        help="only registrations from the last N months; 0 = all history "
+                             "(default: the recent partitions when partitioned, else all history)")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.install or args.reindex or args.uninstall:
+        with maintenance_connection(engine) as conn, conn.begin():
+            if args.install:
+                install(conn)
+            elif args.reindex:
+                print(f"Reindexed {reindex(conn)} registrations")
+            else:
+                for sql in UNINSTALL_STATEMENTS:
+                    conn.execute(text(sql))
+        print("Done!")
+        return
+    if not args.query:
+        parser.error("a search query is required")
+
+    with engine.connect() as conn:
+        page = search_candidates(conn, args.query, args.limit, args.offset, args.recent_months)
+    for row in page["results"]:
+        print(f"{row['rank']:.3f}  {row['registration_id']:<12} {row['name']:<24} {row['status'] or '':<10} {row['snippet']}")
+    if page["has_more"]:
+        print(f"... more results (--offset {args.offset + args.limit})")
+
+
+if __name__ == "__main__":
+    main()
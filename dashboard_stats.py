@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Pre-aggregated dashboard statistics for interview_registrations.
+
+registration_stats holds one row per (dimension, value), e.g.
+('status', 'accepted') or ('upk_eligible', 'true'), with the number of
+registrations, how many were started and completed, and the summed
+interview duration, so the dashboard reads a few dozen rows instead of
+running GROUP BY over the whole registrations table.
+
+Writers never update those rows directly: every registration row would
+then lock the shared ('all', '*') row until commit and serialise all
+registration writes. Triggers append signed delta rows to
+registration_stats_delta instead (no conflicts, no row locks):
+
+  - INSERT and DELETE use statement-level triggers over the transition
+    table, so a bulk insert of 5000 registrations appends one aggregated
+    delta per (dimension, value), not 9 rows per registration
+  - UPDATE of an aggregated column uses a row trigger (statement triggers
+    with transition tables cannot be limited to columns), so per-answer
+    progress updates (current_question_index) do not touch the rollup
+
+Reads add the pending deltas to registration_stats, so they are always
+current. The API and the CLI call maybe_compact() before reading: once
+COMPACT_THRESHOLD deltas are pending it folds them into registration_stats,
+unless another reader already is (pg_try_advisory_xact_lock), so the delta
+table and the cost of a read stay bounded without any scheduling.
+compact() / --compact does the same unconditionally.
+
+Usage:
+    python dashboard_stats.py --install     # create tables, functions, triggers and rebuild
+    python dashboard_stats.py --rebuild     # recompute from scratch
+    python dashboard_stats.py --compact     # fold all pending deltas into registration_stats now
+    python dashboard_stats.py               # print the current stats
+
+API (behind admin_auth.require_admin; FastAPI is only imported when router is used):
+    app.include_router(dashboard_stats.router)   # GET /api/admin/dashboard/stats
+"""
+import sys
+import os
+import argparse
+from sqlalchemy import text
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+DIMENSIONS = (
+    "status", "position_type", "school_type",
+    "upk_eligible", "teacher_eligible", "substitute_eligible", "shift_available", "diaper_comfortable",
+)
+AGGREGATED_COLUMNS = DIMENSIONS + ("started_at", "completed_at")
+STATS_COLUMNS = "dimension, value, total, started, completed, completed_seconds"
+COMPACT_LOCK_KEY = 8301747
+COMPACT_THRESHOLD = int(os.getenv("DASHBOARD_STATS_COMPACT_THRESHOLD", 1000))
+
+
+def _dimension_values(row):
+    """VALUES list of (dimension, value) pairs for a registration row alias"""
+    pairs = ["('all', '*')"] + [
+        f"('{d}', coalesce({row}.{d}::text, '(none)'))" for d in DIMENSIONS
+    ]
+    return ", ".join(pairs)
+
+
+def aggregate_sql(source, sign=1):
+    """SELECT of the (signed) stats of the registrations in `source`, one row per (dimension, value)"""
+    return f"""
+    SELECT d.dimension, d.value, {sign} * count(*),
+           {sign} * count(r.started_at), {sign} * count(r.completed_at),
+           {sign} * coalesce(sum(extract(epoch FROM r.completed_at - r.started_at)), 0)
+    FROM {source} r
+    CROSS JOIN LATERAL (VALUES {_dimension_values("r")}) AS d(dimension, value)
+    GROUP BY d.dimension, d.value
+    """
+
+
+def delta_sql(source, sign=1):
+    """Append the (signed) stats of the registrations in `source` to registration_stats_delta"""
+    return f"INSERT INTO registration_stats_delta ({STATS_COLUMNS}) {aggregate_sql(source, sign)}"
+
+
+INSTALL_STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS registration_stats (
+        dimension VARCHAR(50) NOT NULL,
+        value VARCHAR(255) NOT NULL,
+        total BIGINT NOT NULL DEFAULT 0,
+        started BIGINT NOT NULL DEFAULT 0,
+        completed BIGINT NOT NULL DEFAULT 0,
+        completed_seconds DOUBLE PRECISION NOT NULL DEFAULT 0,
+        PRIMARY KEY (dimension, value)
+    )
+    """,
+    # Append-only: no primary key, so concurrent writers never conflict
+    """
+    CREATE TABLE IF NOT EXISTS registration_stats_delta (
+        dimension VARCHAR(50) NOT NULL,
+        value VARCHAR(255) NOT NULL,
+        total BIGINT NOT NULL,
+        started BIGINT NOT NULL,
+        completed BIGINT NOT NULL,
+        completed_seconds DOUBLE PRECISION NOT NULL
+    )
+    """,
+    # anyelement rather than interview_registrations: on a partitioned table
+    # (registration_partitions) the trigger's rows have the partition's row type
+    "DROP FUNCTION IF EXISTS registration_stats_apply(interview_registrations, integer)",
+    f"""
+    CREATE OR REPLACE FUNCTION registration_stats_apply(r anyelement, sign integer)
+    RETURNS void AS $$
+    BEGIN
+        INSERT INTO registration_stats_delta ({STATS_COLUMNS})
+        SELECT d.dimension, d.value, sign,
+               sign * (r.started_at IS NOT NULL)::int,
+               sign * (r.completed_at IS NOT NULL)::int,
+               sign * coalesce(extract(epoch FROM r.completed_at - r.started_at), 0)
+        FROM (VALUES {_dimension_values("r")}) AS d(dimension, value);
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION registration_stats_trigger() RETURNS trigger AS $$
+    BEGIN
+        PERFORM registration_stats_apply(OLD, -1);
+        PERFORM registration_stats_apply(NEW, 1);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION registration_stats_insert_trigger() RETURNS trigger AS $$
+    BEGIN
+        {delta_sql("new_registrations", 1)};
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION registration_stats_delete_trigger() RETURNS trigger AS $$
+    BEGIN
+        {delta_sql("old_registrations", -1)};
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION registration_stats_truncate() RETURNS trigger AS $$
+    BEGIN
+        DELETE FROM registration_stats;
+        DELETE FROM registration_stats_delta;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS trg_registration_stats ON interview_registrations",
+    f"""
+    CREATE TRIGGER trg_registration_stats
+    AFTER UPDATE OF {", ".join(AGGREGATED_COLUMNS)} ON interview_registrations
+    FOR EACH ROW
+    WHEN ({" OR ".join(f"OLD.{c} IS DISTINCT FROM NEW.{c}" for c in AGGREGATED_COLUMNS)})
+    EXECUTE FUNCTION registration_stats_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_registration_stats_insert ON interview_registrations",
+    """
+    CREATE TRIGGER trg_registration_stats_insert
+    AFTER INSERT ON interview_registrations REFERENCING NEW TABLE AS new_registrations
+    FOR EACH STATEMENT EXECUTE FUNCTION registration_stats_insert_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_registration_stats_delete ON interview_registrations",
+    """
+    CREATE TRIGGER trg_registration_stats_delete
+    AFTER DELETE ON interview_registrations REFERENCING OLD TABLE AS old_registrations
+    FOR EACH STATEMENT EXECUTE FUNCTION registration_stats_delete_trigger()
+    """,
+    "DROP TRIGGER IF EXISTS trg_registration_stats_truncate ON interview_registrations",
+    """
+    CREATE TRIGGER trg_registration_stats_truncate
+    AFTER TRUNCATE ON interview_registrations
+    FOR EACH STATEMENT EXECUTE FUNCTION registration_stats_truncate()
+    """,
+]
+
+UNINSTALL_STATEMENTS = [
+    "DROP TRIGGER IF EXISTS trg_registration_stats ON interview_registrations",
+    "DROP TRIGGER IF EXISTS trg_registration_stats_insert ON interview_registrations",
+    "DROP TRIGGER IF EXISTS trg_registration_stats_delete ON interview_registrations",
+    "DROP TRIGGER IF EXISTS trg_registration_stats_truncate ON interview_registrations",
+    "DROP FUNCTION IF EXISTS registration_stats_trigger()",
+    "DROP FUNCTION IF EXISTS registration_stats_insert_trigger()",
+    "DROP FUNCTION IF EXISTS registration_stats_delete_trigger()",
+    "DROP FUNCTION IF EXISTS registration_stats_truncate()",
+    "DROP FUNCTION IF EXISTS registration_stats_apply(anyelement, integer)",
+    "DROP TABLE IF EXISTS registration_stats_delta",
+    "DROP TABLE IF EXISTS registration_stats",
+]
+
+REBUILD_SQL = f"INSERT INTO registration_stats ({STATS_COLUMNS}) {aggregate_sql('interview_registrations')}"
+
+COMPACT_SQL = f"""
+WITH moved AS (
+    DELETE FROM registration_stats_delta RETURNING {STATS_COLUMNS}
+)
+INSERT INTO registration_stats AS s ({STATS_COLUMNS})
+SELECT dimension, value, sum(total), sum(started), sum(completed), sum(completed_seconds)
+FROM moved GROUP BY dimension, value
+ON CONFLICT (dimension, value) DO UPDATE SET
+    total = s.total + excluded.total,
+    started = s.started + excluded.started,
+    completed = s.completed + excluded.completed,
+    completed_seconds = s.completed_seconds + excluded.completed_seconds
+"""
+
+
+def install(conn):
+    for sql in INSTALL_STATEMENTS:
+        conn.execute(text(sql))
+    rebuild(conn)
+
+
+def rebuild(conn):
+    """Recompute the rollup from scratch; blocks registration writes meanwhile"""
+    conn.execute(text("LOCK TABLE interview_registrations IN SHARE MODE"))
+    conn.execute(text("DELETE FROM registration_stats_delta"))
+    conn.execute(text("DELETE FROM registration_stats"))
+    conn.execute(text(REBUILD_SQL))
+
+
+def compact(conn):
+    """Fold the pending deltas into registration_stats; returns the (dimension, value) rows touched.
+
+    Concurrent writers keep appending meanwhile; only the deltas this
+    transaction sees are moved, and a second compact() waits for the first.
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": COMPACT_LOCK_KEY})
+    return conn.execute(text(COMPACT_SQL)).rowcount
+
+
+def maybe_compact(conn, threshold=None):
+    """compact() when at least `threshold` deltas are pending and no one else is compacting.
+
+    Never waits: returns None when skipped. Run it in its own transaction
+    before reading; counting stops at `threshold`, so the check is cheap.
+    """
+    threshold = COMPACT_THRESHOLD if threshold is None else threshold
+    pending = conn.execute(
+        text("SELECT count(*) FROM (SELECT 1 FROM registration_stats_delta LIMIT :n) d"), {"n": threshold}
+    ).scalar()
+    if pending < threshold:
+        return None
+    if not conn.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": COMPACT_LOCK_KEY}).scalar():
+        return None
+    return conn.execute(text(COMPACT_SQL)).rowcount
+
+
+def _row_stats(total, started, completed, completed_seconds):
+    return {
+        "count": total,
+        "started": started,
+        "completed": completed,
+        "completion_rate": round(completed / started, 4) if started else 0.0,
+        "avg_duration_seconds": round(completed_seconds / completed, 1) if completed else None,
+    }
+
+
+def _shape(rows):
+    stats = {}
+    for row in rows:
+        if row.total == 0:
+            continue  # values that no registration has any more
+        stats.setdefault(row.dimension, {})[row.value] = _row_stats(
+            row.total, row.started, row.completed, row.completed_seconds
+        )
+    overall = stats.pop("all", {}).get("*", _row_stats(0, 0, 0, 0))
+    return {"overall": overall, **stats}
+
+
+# registration_stats plus the deltas not compacted yet
+STATS_QUERY = text(f"""
+SELECT dimension, value, sum(total)::bigint AS total, sum(started)::bigint AS started,
+       sum(completed)::bigint AS completed, sum(completed_seconds) AS completed_seconds
+FROM (
+    SELECT {STATS_COLUMNS} FROM registration_stats
+    UNION ALL
+    SELECT {STATS_COLUMNS} FROM registration_stats_delta
+) s
+GROUP BY dimension, value
+""")
+
+
+def get_dashboard_stats(conn):
+    """Counts by status/position/school/eligibility and completion rates"""
+    return _shape(conn.execute(STATS_QUERY))
+
+
+async def aget_dashboard_stats(session):
+    return _shape(await session.execute(STATS_QUERY))
+
+
+def _build_router():
+    from fastapi import APIRouter, Depends
+    from admin_auth import require_admin
+
+    router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+    @router.get("/dashboard/stats")
+    async def dashboard_stats():
+        from db_engine import async_session
+
+        async with async_session() as session:
+            async with session.begin():
+                await session.run_sync(lambda s: maybe_compact(s.connection()))
+            return await aget_dashboard_stats(session)
+
+    return router
+
+
+def __getattr__(name):
+    # dashboard_stats.router is built on first access, so the DDL (bootstrap_schema) needs no FastAPI
+    if name == "router":
+        globals()["router"] = _build_router()
+        return globals()["router"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main(argv=None):
+    from db_engine import get_engine, maintenance_connection
+
+    parser = argparse.ArgumentParser(description="Dashboard statistics rollup")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--install", action="store_true", help="create the rollup table and trigger")
+    group.add_argument("--rebuild", action="store_true", help="recompute the rollup from scratch")
+    group.add_argument("--compact", action="store_true", help="fold pending deltas into the rollup")
+    group.add_argument("--uninstall", action="store_true")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.compact:
+        with engine.begin() as conn:
+            print(f"Compacted {compact(conn)} stats rows")
+        return
+    if args.install or args.rebuild or args.uninstall:
+        with maintenance_connection(engine) as conn, conn.begin():
+            if args.install:
+                install(conn)
+            elif args.rebuild:
+                rebuild(conn)
+            else:
+                for sql in UNINSTALL_STATEMENTS:
+                    conn.execute(text(sql))
+        print("Done!")
+        return
+
+    with engine.begin() as conn:
+        maybe_compact(conn)
+    with engine.connect() as conn:
+        stats = get_dashboard_stats(conn)
+    overall = stats.pop("overall")
+    print(f"Registrations: {overall['count']}  started: {overall['started']}  "
+          f"completed: {overall['completed']}  completion rate: {overall['completion_rate']:.1%}")
+    for dimension, values in stats.items():
+        print(f"\n{dimension}:")
+        for value, s in sorted(values.items()):
+            print(f"  {value:<24} {s['count']:>8}  completed {s['completed']:>8} ({s['completion_rate']:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Stream interview registrations with their question answers to NDJSON or CSV.
+
+Registrations are read in keyset-paginated pages (id > last_id ORDER BY id)
+over a server-side cursor, and each page's answers are fetched with one
+IN query, so memory stays bounded by the page size however large the
+table gets.
+
+Usage:
+    python export_registrations.py registrations.ndjson
+    python export_registrations.py registrations.csv --format csv --page-size 2000
+    python export_registrations.py - --after-id 150000      # stdout, resume after an id
+"""
+import sys
+import os
+import csv
+import json
+import time
+import argparse
+from sqlalchemy import select
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from db_engine import get_engine
+from instrumentation import span
+
+ANSWER_FIELDS = ("question_order", "question_text", "answer_text", "is_answered")
+
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def iter_registration_pages(conn, page_size=1000, after_id=0, where=None):
+    """Yield lists of registration dicts (with an "answers" list), one page at a time"""
+    reg = InterviewRegistration.__table__
+    qa = QuestionAnswer.__table__
+    answer_columns = [qa.c.registration_id] + [qa.c[name] for name in ANSWER_FIELDS]
+    last_id = after_id
+
+    while True:
+        stmt = select(reg).where(reg.c.id > last_id).order_by(reg.c.id).limit(page_size)
+        if where is not None:
+            stmt = stmt.where(where)
+        result = conn.execute(stmt.execution_options(yield_per=page_size))
+        page = [dict(row) for row in result.mappings()]
+        if not page:
+            return
+
+        by_id = {row["id"]: row for row in page}
+        for row in page:
+            row["answers"] = []
+        answers = conn.execute(
+            select(*answer_columns)
+            .where(qa.c.registration_id.in_(list(by_id)))
+            .order_by(qa.c.registration_id, qa.c.question_order)
+        ).mappings()
+        for answer in answers:
+            by_id[answer["registration_id"]]["answers"].append({name: answer[name] for name in ANSWER_FIELDS})
+
+        yield page
+        last_id = page[-1]["id"]
+        if len(page) < page_size:
+            return
+
+
+def iter_registrations(conn, page_size=1000, after_id=0, where=None):
+    """Yield registration dicts one at a time (see iter_registration_pages)"""
+    for page in iter_registration_pages(conn, page_size, after_id, where):
+        yield from page
+
+
+class NdjsonWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write_page(self, page):
+        with span("serialize.ndjson"):
+            self.out.writelines(json.dumps(row, default=_json_default) + "\n" for row in page)
+
+
+class CsvWriter:
+    """One row per registration; answers and resume_comparison are JSON-encoded cells"""
+
+    def __init__(self, out):
+        self.out = out
+        self.writer = None
+
+    def write_page(self, page):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.out, fieldnames=list(page[0]), extrasaction="ignore")
+            self.writer.writeheader()
+        with span("serialize.csv"):
+            for row in page:
+                self.writer.writerow({
+                    key: json.dumps(value, default=_json_default) if isinstance(value, (dict, list)) else value
+                    for key, value in row.items()
+                })
+
+
+def export(out, fmt="ndjson", page_size=1000, after_id=0):
+    """Write every registration to `out`; returns (registrations, answers) written"""
+    writer = CsvWriter(out) if fmt == "csv" else NdjsonWriter(out)
+    registrations = answers = 0
+    start = time.perf_counter()
+    with get_engine().connect() as conn:
+        for page in iter_registration_pages(conn, page_size, after_id):
+            writer.write_page(page)
+            out.flush()
+            registrations += len(page)
+            answers += sum(len(row["answers"]) for row in page)
+            elapsed = time.perf_counter() - start
+            print(f"  ... {registrations} registrations, last id {page[-1]['id']} "
+                  f"({registrations / max(elapsed, 1e-9):,.0f}/sec)", file=sys.stderr)
+    return registrations, answers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export interview registrations with their answers")
+    parser.add_argument("output", help="output file, or - for stdout")
+    parser.add_argument("--format", choices=("ndjson", "csv"), default=None,
+                        help="default: inferred from the file extension, else ndjson")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--after-id", type=int, default=0, help="resume after this registration id")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.output.endswith(".csv") else "ndjson")
+    start = time.perf_counter()
+    if args.output == "-":
+        registrations, answers = export(sys.stdout, fmt, args.page_size, args.after_id)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            registrations, answers = export(out, fmt, args.page_size, args.after_id)
+    print(f"Exported {registrations} registrations and {answers} answers "
+          f"in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Batch ingestion of resume files into interview_registrations.
+
+    directory --> [extract: process pool] --q--> [summarize] --q--> [write: bulk UPDATE]
+
+Files are matched to registrations by file name: REG001.pdf updates the
+registration whose registration_id is REG001. Text extraction runs in a
+process pool; the queues between stages are bounded, and no more than
+--max-in-flight files are being extracted at once, so a burst of uploads
+cannot exhaust memory. Summaries come from a pluggable summarizer
+(default: the offline heuristic in resume_analysis.py). The summary's input
+hash and summarizer are recorded in registration_derivations with the same
+UPDATE, so resume_derivation_cache --backfill keeps a custom summarizer's
+output.
+Everything runs locally.
+
+Supported formats: .txt, .md, .html/.htm, .docx, and .pdf when pypdf is installed.
+
+Usage:
+    python ingest_resumes.py ./resumes
+    python ingest_resumes.py ./resumes --workers 8 --batch-size 200 --summarizer mymodule:summarize
+"""
+import sys
+import os
+import re
+import time
+import queue
+import zipfile
+import argparse
+import importlib
+import threading
+from html import unescape
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select, update, bindparam
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from resume_analysis import heuristic_summary
+
+SUPPORTED_EXTENSIONS = (".txt", ".md", ".html", ".htm", ".docx", ".pdf")
+TAG_RE = re.compile(r"<[^>]+>")
+_DONE = object()
+
+
+def _strip_tags(markup):
+    return " ".join(unescape(TAG_RE.sub(" ", markup)).split())
+
+
+def extract_text(path):
+    """Extract plain text from one resume file (runs in a worker process)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".txt", ".md"):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return " ".join(f.read().split())
+    if ext in (".html", ".htm"):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            return _strip_tags(f.read())
+    if ext == ".docx":
+        with zipfile.ZipFile(path) as docx:
+            xml = docx.read("word/document.xml").decode("utf-8", errors="replace")
+        return _strip_tags(xml.replace("</w:p>", "\n"))
+    if ext == ".pdf":
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise RuntimeError("pypdf is not installed; cannot extract PDF text")
+        reader = PdfReader(path)
+        return " ".join(" ".join((page.extract_text() or "") for page in reader.pages).split())
+    raise ValueError(f"Unsupported resume format: {ext}")
+
+
+def _extract_job(path):
+    start = time.perf_counter()
+    try:
+        return path, extract_text(path), None, time.perf_counter() - start
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def iter_resume_files(directory):
+    for root, _, files in os.walk(directory):
+        for name in sorted(files):
+            if name.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def load_summarizer(spec):
+    """Resolve 'module:function' to a summarizer callable"""
+    if not spec:
+        return heuristic_summary
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "summarize")
+
+
+class StageTimer:
+    """Accumulated busy time and item counts per pipeline stage"""
+
+    def __init__(self):
+        self.seconds = {}
+        self.items = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, items=1):
+        with self._lock:
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+            self.items[stage] = self.items.get(stage, 0) + items
+
+    def report(self, wall):
+        print(f"{'stage':<12} {'items':>8} {'busy s':>9} {'items/s':>9}")
+        for stage in self.seconds:
+            busy = self.seconds[stage]
+            print(f"{stage:<12} {self.items[stage]:>8} {busy:>9.2f} {self.items[stage] / max(busy, 1e-9):>9.1f}")
+        print(f"{'wall':<12} {'':>8} {wall:>9.2f}")
+
+
+def write_batch(engine, batch, summarize=heuristic_summary):
+    """Bulk UPDATE the resume fields of one batch, matched by registration_id"""
+    from app.models.interview_registration import InterviewRegistration
+    from resume_derivation_cache import deriver_id, record_derivations, summary_hash
+
+    reg = InterviewRegistration.__table__
+    stmt = update(reg).where(reg.c.registration_id == bindparam("reg_key")).values(
+        resume_extracted_text=bindparam("text"), resume_summary=bindparam("summary"),
+    )
+    with engine.begin() as conn:
+        result = conn.execute(stmt, batch)
+        hashes = {item["reg_key"]: summary_hash(item["text"]) for item in batch}
+        ids = conn.execute(select(reg.c.id, reg.c.registration_id).where(reg.c.registration_id.in_(list(hashes))))
+        deriver = deriver_id(summarize)
+        record_derivations(conn, [{"registration_id": row.id, "summary_hash": hashes[row.registration_id],
+                                   "summary_deriver": deriver} for row in ids])
+    return result.rowcount
+
+
+def ingest(directory, engine, summarize=heuristic_summary, workers=None, batch_size=100,
+           queue_size=256, max_in_flight=None):
+    """Run the pipeline over a directory; returns (files, updated, failed)"""
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    timer = StageTimer()
+    extracted = queue.Queue(maxsize=queue_size)
+    summarized = queue.Queue(maxsize=queue_size)
+    failures = []
+    summarize_failures = []
+    counts = {"files": 0, "updated": 0}
+    errors = []
+
+    def summarize_stage():
+        while True:
+            item = extracted.get()
+            if item is _DONE:
+                summarized.put(_DONE)
+                return
+            path, text = item
+            start = time.perf_counter()
+            try:
+                summary = summarize(text)
+            except Exception as e:
+                summarize_failures.append((path, f"{type(e).__name__}: {e}"))
+                continue
+            timer.add("summarize", time.perf_counter() - start)
+            key = os.path.splitext(os.path.basename(path))[0]
+            summarized.put({"reg_key": key, "text": text, "summary": summary})
+
+    def write_stage():
+        batch = []
+        try:
+            while True:
+                item = summarized.get()
+                if item is not _DONE:
+                    batch.append(item)
+                if batch and (item is _DONE or len(batch) >= batch_size):
+                    start = time.perf_counter()
+                    counts["updated"] += write_batch(engine, batch, summarize)
+                    timer.add("write", time.perf_counter() - start, len(batch))
+                    batch = []
+                if item is _DONE:
+                    return
+        except Exception as e:
+            errors.append(e)
+            # Keep draining so upstream stages are never blocked on a full queue
+            while summarized.get() is not _DONE:
+                pass
+
+    threads = [threading.Thread(target=summarize_stage, name="summarize"),
+               threading.Thread(target=write_stage, name="write")]
+    for t in threads:
+        t.start()
+
+    wall_start = time.perf_counter()
+    slots = threading.BoundedSemaphore(max_in_flight)
+
+    def on_extracted(future):
+        try:
+            path, text, error, seconds = future.result()
+            timer.add("extract", seconds)
+            if error:
+                failures.append((path, error))
+            else:
+                extracted.put((path, text))
+        except Exception as e:
+            errors.append(e)
+        finally:
+            slots.release()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path in iter_resume_files(directory):
+                slots.acquire()
+                counts["files"] += 1
+                pool.submit(_extract_job, path).add_done_callback(on_extracted)
+    finally:
+        extracted.put(_DONE)
+        for t in threads:
+            t.join()
+
+    wall = time.perf_counter() - wall_start
+    timer.report(wall)
+    for path, error in failures:
+        print(f"Failed to extract {path}: {error}")
+    for path, error in summarize_failures:
+        print(f"Failed to summarize {path}: {error}")
+    if errors:
+        raise errors[0]
+    print(f"Ingested {counts['files']} files, updated {counts['updated']} registrations, "
+          f"{len(failures)} failed extraction, {len(summarize_failures)} failed summarization "
+          f"({counts['files'] / max(wall, 1e-9):,.1f} files/sec)")
+    return counts["files"], counts["updated"], len(failures) + len(summarize_failures)
+
+
+def main(argv=None):
+    from db_engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Extract and summarize a directory of resumes")
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, default=None, help="extraction processes (default: cpu count)")
+    parser.add_argument("--batch-size", type=int, default=100, help="registrations per bulk UPDATE")
+    parser.add_argument("--queue-size", type=int, default=256, help="bound of each inter-stage queue")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="files being extracted at once")
+    parser.add_argument("--summarizer", help="summarizer as module:function (default: local heuristic)")
+    args = parser.parse_args(argv)
+
+    ingest(args.directory, get_engine(), load_summarizer(args.summarizer), args.workers,
+           args.batch_size, args.queue_size, args.max_in_flight)
+
+
+if __name__ == "__main__":
+    main()
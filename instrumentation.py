@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+"""
+Opt-in request profiling and database instrumentation.
+
+Nothing is recorded unless INSTRUMENTATION=1 is set (or enable() is
+called). When it is on:
+
+  - instrument_engine() hooks SQLAlchemy's cursor events and records the
+    latency and row count of every statement, grouped by a normalized
+    statement fingerprint (db_engine does this for both engines)
+  - request_scope() / InstrumentationMiddleware track queries per request
+    in a contextvar; a request that runs the same statement fingerprint
+    N_PLUS_ONE_THRESHOLD times is reported as a likely N+1
+  - span("name") times arbitrary blocks (password hashing and export
+    serialization use it) and forwards them to sentry-sdk when a Sentry
+    client is configured
+  - render_prometheus() / router expose everything, plus the pool metrics,
+    in the Prometheus text format at GET /metrics (behind
+    admin_auth.require_admin; FastAPI is only imported when router is used,
+    so password_hashing and the scripts can import span() without it)
+
+For offline profiling, SamplingProfiler samples every thread's stack and
+writes collapsed stacks ("a;b;c 42") for flamegraph.pl or speedscope:
+
+    python instrumentation.py profile --output seed.folded seed_sample_registrations.py --count 10000
+
+    app.add_middleware(instrumentation.InstrumentationMiddleware)
+    app.include_router(instrumentation.router)
+"""
+import os
+import re
+import sys
+import time
+import runpy
+import argparse
+import threading
+import contextvars
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from sqlalchemy import event
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 10))
+MAX_FINGERPRINTS = 500
+MAX_ROUTES = 200
+UNMATCHED_ROUTE = "(unmatched)"
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+enabled = os.getenv("INSTRUMENTATION", "").strip().lower() in ("1", "true", "yes", "on")
+_current = contextvars.ContextVar("instrumentation_request", default=None)
+_lock = threading.Lock()
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+# -- metric containers -------------------------------------------------------
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            yield bound, running
+
+
+class StatementStats:
+    __slots__ = ("calls", "seconds", "max_seconds", "rows", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.errors = 0
+
+
+_statements = defaultdict(StatementStats)              # fingerprint -> stats
+_statement_latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))   # operation -> histogram
+_spans = defaultdict(lambda: Histogram(LATENCY_BUCKETS))               # span name -> histogram
+_requests = defaultdict(lambda: Histogram(LATENCY_BUCKETS))            # route -> histogram
+_request_queries = defaultdict(lambda: Histogram(QUERY_COUNT_BUCKETS))  # route -> histogram
+_n_plus_one = Counter()                                 # (route, fingerprint) -> requests flagged
+
+
+def reset():
+    with _lock:
+        for registry in (_statements, _statement_latency, _spans, _requests, _request_queries, _n_plus_one):
+            registry.clear()
+
+
+# -- statement fingerprints --------------------------------------------------
+
+_PLACEHOLDER = r"(?:%\(\w+\)s|%s|\$\d+|\?|:\w+)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+_VALUES_LIST = re.compile(r"(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_fingerprints = {}
+
+
+def fingerprint(statement):
+    """Statement text with whitespace, IN-lists and multi-row VALUES collapsed"""
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _PLACEHOLDER_LIST.sub("(...)", normalized)
+    normalized = _VALUES_LIST.sub(r"\1", normalized)
+    if len(_fingerprints) < 10000:
+        _fingerprints[statement] = normalized
+    return normalized
+
+
+def _operation(fp):
+    word = fp.split(" ", 1)[0].upper()
+    return word if word in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH") else "OTHER"
+
+
+# -- SQLAlchemy hooks --------------------------------------------------------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if enabled:
+        conn.info.setdefault("instrumentation_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("instrumentation_start")
+    if not starts:
+        return
+    record_statement(statement, time.perf_counter() - starts.pop(), max(cursor.rowcount, 0))
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    starts = conn.info.get("instrumentation_start") if conn is not None else None
+    if starts and exception_context.statement is not None:
+        record_statement(exception_context.statement, time.perf_counter() - starts.pop(), 0, error=True)
+
+
+def instrument_engine(engine):
+    """Attach the statement hooks to an Engine (or an AsyncEngine's sync_engine)"""
+    engine = getattr(engine, "sync_engine", engine)
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+    return engine
+
+
+def record_statement(statement, seconds, rows, error=False):
+    fp = fingerprint(statement)
+    with _lock:
+        key = fp if fp in _statements or len(_statements) < MAX_FINGERPRINTS else "(other)"
+        stats = _statements[key]
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        stats.rows += rows
+        stats.errors += int(error)
+        _statement_latency[_operation(fp)].observe(seconds)
+    request = _current.get()
+    if request is not None:
+        request.record_query(fp, seconds)
+
+
+# -- requests and spans ------------------------------------------------------
+
+class RequestContext:
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.by_fingerprint = Counter()
+        self.spans = defaultdict(float)
+        self.suspected_n_plus_one = []
+
+    def record_query(self, fp, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        self.by_fingerprint[fp] += 1
+        if self.by_fingerprint[fp] == N_PLUS_ONE_THRESHOLD:
+            self.suspected_n_plus_one.append(fp)
+
+
+@contextmanager
+def request_scope(name):
+    """Attribute the queries and spans inside the block to one request"""
+    if not enabled:
+        yield None
+        return
+    context = RequestContext(name)
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+        _finish_request(context)
+
+
+def _finish_request(context):
+    elapsed = time.perf_counter() - context.started
+    with _lock:
+        name = context.name if context.name in _requests or len(_requests) < MAX_ROUTES else "(other)"
+        _requests[name].observe(elapsed)
+        _request_queries[name].observe(context.queries)
+        for fp in context.suspected_n_plus_one:
+            _n_plus_one[(name, fp)] += 1
+    for fp in context.suspected_n_plus_one:
+        print(f"Possible N+1 in {context.name}: {context.by_fingerprint[fp]}x {fp[:200]}", file=sys.stderr)
+
+
+def current_request():
+    return _current.get()
+
+
+def _sentry_span(name):
+    if "sentry_sdk" not in sys.modules:
+        return None
+    import sentry_sdk
+
+    if not sentry_sdk.get_client().is_active():
+        return None
+    return sentry_sdk.start_span(op=name)
+
+
+@contextmanager
+def span(name):
+    """Time a block of work (e.g. span("password.verify"))"""
+    if not enabled:
+        yield
+        return
+    sentry_span = _sentry_span(name)
+    start = time.perf_counter()
+    try:
+        if sentry_span is None:
+            yield
+        else:
+            with sentry_span:
+                yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _spans[name].observe(elapsed)
+        request = _current.get()
+        if request is not None:
+            request.spans[name] += elapsed
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware: one request_scope per HTTP request, plus X-DB-* response headers"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled:
+            await self.app(scope, receive, send)
+            return
+        with request_scope(scope.get("path", "")) as context:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(context.queries).encode()))
+                    headers.append((b"x-db-time-ms", f"{context.db_seconds * 1000:.1f}".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_headers)
+            finally:
+                # Label by route template, not the raw path, to keep label cardinality
+                # bounded; 404s and other unrouted paths (scanners) share one label
+                path = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+                context.name = f"{scope.get('method', '')} {path}"
+
+
+# -- Prometheus exposition ---------------------------------------------------
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _histogram_lines(metric, label_name, histograms):
+    lines = [f"# TYPE {metric} histogram"]
+    for label, histogram in sorted(histograms.items()):
+        prefix = f'{label_name}="{_label(label)}"'
+        for bound, count in histogram.cumulative():
+            lines.append(f'{metric}_bucket{{{prefix},le="{bound}"}} {count}')
+        lines.append(f'{metric}_bucket{{{prefix},le="+Inf"}} {histogram.count}')
+        lines.append(f"{metric}_sum{{{prefix}}} {histogram.total:.6f}")
+        lines.append(f"{metric}_count{{{prefix}}} {histogram.count}")
+    return lines
+
+
+def render_prometheus():
+    with _lock:
+        lines = _histogram_lines("db_statement_duration_seconds", "operation", _statement_latency)
+        lines += ["# TYPE db_statement_calls_total counter", "# TYPE db_statement_seconds_total counter",
+                  "# TYPE db_statement_rows_total counter", "# TYPE db_statement_errors_total counter"]
+        for fp, stats in sorted(_statements.items(), key=lambda item: -item[1].seconds):
+            label = f'statement="{_label(fp[:300])}"'
+            lines.append(f"db_statement_calls_total{{{label}}} {stats.calls}")
+            lines.append(f"db_statement_seconds_total{{{label}}} {stats.seconds:.6f}")
+            lines.append(f"db_statement_rows_total{{{label}}} {stats.rows}")
+            lines.append(f"db_statement_errors_total{{{label}}} {stats.errors}")
+        lines += _histogram_lines("span_duration_seconds", "span", _spans)
+        lines += _histogram_lines("http_request_duration_seconds", "route", _requests)
+        lines += _histogram_lines("http_request_db_queries", "route", _request_queries)
+        lines.append("# TYPE db_n_plus_one_total counter")
+        for (route, fp), count in sorted(_n_plus_one.items()):
+            lines.append(f'db_n_plus_one_total{{route="{_label(route)}",statement="{_label(fp[:300])}"}} {count}')
+
+    from db_engine import pool_metrics
+
+    lines += ["# TYPE db_pool_checked_out gauge", "# TYPE db_pool_wait_seconds_total counter",
+              "# TYPE db_pool_timeouts_total counter"]
+    for pool in pool_metrics():
+        label = f'pool="{pool["pool"]}"'
+        lines.append(f"db_pool_checked_out{{{label}}} {pool['checked_out']}")
+        lines.append(f"db_pool_wait_seconds_total{{{label}}} {pool['wait_seconds_total']}")
+        lines.append(f"db_pool_timeouts_total{{{label}}} {pool['timeouts']}")
+    return "\n".join(lines) + "\n"
+
+
+def _build_router():
+    from fastapi import APIRouter, Depends
+    from fastapi.responses import PlainTextResponse
+    from admin_auth import require_admin
+
+    router = APIRouter(tags=["monitoring"], dependencies=[Depends(require_admin)])
+
+    @router.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+    return router
+
+
+def __getattr__(name):
+    # instrumentation.router is built on first access
+    if name == "router":
+        globals()["router"] = _build_router()
+        return globals()["router"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# -- sampling profiler -------------------------------------------------------
+
+IDLE_FUNCTIONS = {"wait", "select", "poll", "epoll", "accept", "sleep", "_wait_for_tstate_lock"}
+
+
+class SamplingProfiler:
+    """Samples the stacks of all other threads every `interval` seconds"""
+
+    def __init__(self, interval=0.005, include_idle=False):
+        self.interval = interval
+        self.include_idle = include_idle
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            if not self.include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def dump(self, path):
+        """Write collapsed stacks, one "frame;frame;frame count" line each"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Instrumentation tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    profile = sub.add_parser("profile", help="run a script under the sampling profiler")
+    profile.add_argument("--output", default="profile.folded")
+    profile.add_argument("--interval", type=float, default=0.005)
+    profile.add_argument("--include-idle", action="store_true")
+    profile.add_argument("--metrics", action="store_true", help="also enable instrumentation and print metrics")
+    profile.add_argument("script")
+    profile.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        # db_engine instruments its engines when they are created
+        os.environ["INSTRUMENTATION"] = "1"
+        enable()
+    sys.argv = [args.script] + args.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    profiler = SamplingProfiler(args.interval, args.include_idle)
+    start = time.perf_counter()
+    with profiler:
+        try:
+            runpy.run_path(args.script, run_name="__main__")
+        except SystemExit:
+            pass
+    elapsed = time.perf_counter() - start
+    profiler.dump(args.output)
+    print(f"{profiler.samples} samples over {elapsed:.1f}s, {len(profiler.stacks)} distinct stacks "
+          f"written to {args.output}", file=sys.stderr)
+    if args.metrics:
+        print(render_prometheus(), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Shared password hashing.
+
+Hashes are produced by passlib with a configurable scheme and cost:
+
+    PASSWORD_HASH_SCHEME   pbkdf2_sha256 (default) or bcrypt (needs the bcrypt package)
+    PASSWORD_HASH_ROUNDS   cost for the scheme (pbkdf2 iterations, or bcrypt log2 rounds)
+
+Hashes written by the old seed scripts (unsalted hex SHA-256) still verify,
+and verify_and_update() returns a replacement hash so they can be upgraded
+on the next successful login. The same goes for hashes in any other
+ACCEPTED_SCHEMES scheme and for hashes below the configured cost, so
+changing either setting migrates users as they log in.
+
+Benchmark:
+    python password_hashing.py --benchmark --rounds 10000 29000 100000
+"""
+import os
+import hmac
+import time
+import asyncio
+import hashlib
+import argparse
+import contextvars
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from passlib.context import CryptContext
+from instrumentation import span
+
+DEFAULT_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "pbkdf2_sha256")
+DEFAULT_ROUNDS = {"pbkdf2_sha256": 29000, "bcrypt": 12}
+ACCEPTED_SCHEMES = ("pbkdf2_sha256", "bcrypt")
+
+_contexts = {}
+_verify_executor = None
+
+
+def _default_rounds(scheme):
+    return int(os.getenv("PASSWORD_HASH_ROUNDS", DEFAULT_ROUNDS.get(scheme, 29000)))
+
+
+def get_context(scheme=None, rounds=None):
+    """Return a (cached) CryptContext that hashes with the given scheme and cost.
+
+    It still verifies every ACCEPTED_SCHEMES hash, but flags the other
+    schemes (deprecated="auto") and hashes under `rounds` as needing an update.
+    """
+    scheme = scheme or DEFAULT_SCHEME
+    rounds = rounds or _default_rounds(scheme)
+    key = (scheme, rounds)
+    if key not in _contexts:
+        schemes = [scheme] + [s for s in ACCEPTED_SCHEMES if s != scheme]
+        _contexts[key] = CryptContext(
+            schemes=schemes, deprecated="auto",
+            **{f"{scheme}__default_rounds": rounds, f"{scheme}__min_rounds": rounds},
+        )
+    return _contexts[key]
+
+
+def is_legacy_hash(hashed):
+    """True for the unsalted hex SHA-256 digests written by the old seed scripts"""
+    return hashed is not None and len(hashed) == 64 and all(c in "0123456789abcdef" for c in hashed)
+
+
+def hash_password(password, scheme=None, rounds=None):
+    with span("password.hash"):
+        return get_context(scheme, rounds).hash(password)
+
+
+def verify_password(password, hashed):
+    with span("password.verify"):
+        if is_legacy_hash(hashed):
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), hashed)
+        context = get_context()
+        # No password set, or a format none of the schemes recognise
+        if not hashed or context.identify(hashed) is None:
+            return False
+        return context.verify(password, hashed)
+
+
+def verify_and_update(password, hashed):
+    """Verify a password and return (ok, new_hash).
+
+    new_hash is set when the stored hash is a legacy SHA-256 digest, uses
+    another scheme than the configured one, or a lower cost.
+    """
+    if is_legacy_hash(hashed):
+        if not verify_password(password, hashed):
+            return False, None
+        return True, hash_password(password)
+    with span("password.verify"):
+        context = get_context()
+        if not hashed or context.identify(hashed) is None:
+            return False, None
+        return context.verify_and_update(password, hashed)
+
+
+def _hash_one(args):
+    # Runs in a worker process: a span here would be recorded in the
+    # worker's own registry and never reach /metrics, so hash_many() times
+    # the whole batch in the parent instead
+    password, scheme, rounds = args
+    return get_context(scheme, rounds).hash(password)
+
+
+def hash_many(passwords, executor=None, scheme=None, rounds=None, chunksize=16):
+    """Hash a batch of passwords on a process pool, preserving order.
+
+    Recorded as one password.hash_many span; no per-password spans.
+    """
+    scheme = scheme or DEFAULT_SCHEME
+    rounds = rounds or _default_rounds(scheme)
+    jobs = [(p, scheme, rounds) for p in passwords]
+    with span("password.hash_many"):
+        if executor is None:
+            with ProcessPoolExecutor() as pool:
+                return list(pool.map(_hash_one, jobs, chunksize=chunksize))
+        return list(executor.map(_hash_one, jobs, chunksize=chunksize))
+
+
+def _get_verify_executor():
+    global _verify_executor
+    if _verify_executor is None:
+        _verify_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("PASSWORD_HASH_THREADS", os.cpu_count() or 4)),
+            thread_name_prefix="password-hash",
+        )
+    return _verify_executor
+
+
+async def verify_and_update_async(password, hashed):
+    """verify_and_update() off the event loop; hashlib and bcrypt release the GIL"""
+    loop = asyncio.get_running_loop()
+    # Run in a copy of the caller's context so spans are attributed to its request
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_verify_executor(), context.run, verify_and_update, password, hashed)
+
+
+async def verify_login(password, hashed, save_hash=None):
+    """Verify a login and lazily upgrade the stored hash.
+
+    save_hash is an optional async callable that persists the replacement
+    hash; it is only awaited when the password matched and needs rehashing.
+    """
+    ok, new_hash = await verify_and_update_async(password, hashed)
+    if ok and new_hash and save_hash is not None:
+        await save_hash(new_hash)
+    return ok
+
+
+def benchmark(scheme, rounds_list, count=50, workers=None):
+    """Print single-thread and pooled hashes/sec for each cost setting"""
+    workers = workers or os.cpu_count() or 1
+    print(f"Scheme: {scheme}  workers: {workers}")
+    print(f"{'rounds':>10} {'ms/hash':>10} {'hashes/s':>10} {'pool h/s':>10}")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rounds in rounds_list:
+            context = get_context(scheme, rounds)
+            context.hash("warmup")
+            start = time.perf_counter()
+            for i in range(count):
+                context.hash(f"password{i}")
+            single = time.perf_counter() - start
+
+            passwords = [f"password{i}" for i in range(count * workers)]
+            hash_many(passwords[:1], pool, scheme, rounds)
+            start = time.perf_counter()
+            hash_many(passwords, pool, scheme, rounds)
+            pooled = time.perf_counter() - start
+
+            print(f"{rounds:>10} {single / count * 1000:>10.2f} {count / single:>10.1f} "
+                  f"{len(passwords) / pooled:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Password hashing utilities")
+    parser.add_argument("--benchmark", action="store_true", help="report hashes/sec per cost setting")
+    parser.add_argument("--scheme", default=DEFAULT_SCHEME)
+    parser.add_argument("--rounds", type=int, nargs="+",
+                        help="cost settings to benchmark (default: the configured cost)")
+    parser.add_argument("--count", type=int, default=50, help="hashes per measurement")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.scheme, args.rounds or [_default_rounds(args.scheme)], args.count, args.workers)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
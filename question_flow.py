@@ -0,0 +1,136 @@
+"""
+Compiled interview question flow.
+
+The interview branches on the candidate's answers (e.g. only candidates with
+experience under age 5 are asked about diaper changes) and those answers set
+the eligibility flags on InterviewRegistration. The flow is described once
+as data (FLOW_SPEC, or a JSON file with the same shape) and compiled at import
+into flat tuples indexed by question number, so resolving the next question
+and the flag updates for an answer is a couple of tuple lookups: no
+question definitions or previous answers are read from the database on an
+interview turn.
+
+current_question_index is the index of the next question to ask; it equals
+len(flow) once the interview is complete.
+
+    step = DEFAULT_FLOW.advance(registration.current_question_index, answer_text)
+    for field, value in step.updates:
+        setattr(registration, field, value)
+    registration.current_question_index = step.next_index
+    registration.is_completed = step.completed
+"""
+import re
+import json
+from typing import NamedTuple
+
+YES, NO, OTHER = 0, 1, 2
+END = "end"
+
+# Each question: id, text, kind ("yes_no" or "open"), and per-branch
+# "next" question ids and flag "set"s. Branches: yes / no / any (fallback).
+FLOW_SPEC = [
+    {"id": "interested", "text": "Are you interested in moving forward with School Professionals?",
+     "kind": "yes_no", "yes": {"next": "heard_about"}, "no": {"next": END}},
+    {"id": "heard_about", "text": "How did you hear about us?",
+     "kind": "open", "any": {"next": "commute"}},
+    {"id": "commute", "text": "Are you able to commute & work in NYC?",
+     "kind": "yes_no", "yes": {"next": "under_5"}, "no": {"next": END}},
+    {"id": "under_5", "text": "Experience with students under age 5?",
+     "kind": "yes_no",
+     "yes": {"next": "diapers", "set": {"upk_eligible": True}},
+     "no": {"next": "shifts", "set": {"upk_eligible": False, "diaper_comfortable": False}}},
+    {"id": "diapers", "text": "Are you comfortable with diaper changes?",
+     "kind": "yes_no",
+     "yes": {"next": "shifts", "set": {"diaper_comfortable": True}},
+     "no": {"next": "shifts", "set": {"diaper_comfortable": False}}},
+    {"id": "shifts", "text": "Are you available for full-day shifts (8am to 3pm)?",
+     "kind": "yes_no",
+     "yes": {"next": "certified", "set": {"shift_available": True}},
+     "no": {"next": "certified", "set": {"shift_available": False}}},
+    {"id": "certified", "text": "Do you hold a valid New York State teaching certification?",
+     "kind": "yes_no",
+     "yes": {"next": "college_credits", "set": {"teacher_eligible": True}},
+     "no": {"next": "college_credits", "set": {"teacher_eligible": False}}},
+    {"id": "college_credits", "text": "Have you completed at least 60 college credits?",
+     "kind": "yes_no",
+     "yes": {"next": END, "set": {"substitute_eligible": True}},
+     "no": {"next": END, "set": {"substitute_eligible": False}}},
+]
+
+YES_WORDS = frozenset("yes yeah yep yup sure absolutely definitely certainly correct affirmative ok okay".split())
+NO_WORDS = frozenset("no nope nah not never negative unfortunately".split())
+WORD_RE = re.compile(r"[a-z']+")
+
+
+def classify_answer(answer_text, lookahead=4):
+    """YES / NO / OTHER from the first few words of a spoken answer"""
+    for word in WORD_RE.findall((answer_text or "").lower())[:lookahead]:
+        if word in YES_WORDS:
+            return YES
+        if word in NO_WORDS or word.endswith("n't"):
+            return NO
+    return OTHER
+
+
+class FlowStep(NamedTuple):
+    question_index: int
+    next_index: int
+    updates: tuple          # ((field, value), ...)
+    completed: bool
+    next_question: str      # None when completed
+
+
+class CompiledFlow:
+    """Question flow compiled into index-addressed tuples"""
+
+    def __init__(self, spec):
+        ids = [q["id"] for q in spec]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate question ids in flow spec")
+        index = {qid: i for i, qid in enumerate(ids)}
+        index[END] = len(spec)
+
+        def branch(question, name):
+            b = question.get(name) or question.get("any")
+            if b is None:
+                raise ValueError(f"Question {question['id']!r} has no {name!r} or 'any' branch")
+            if b["next"] not in index:
+                raise ValueError(f"Question {question['id']!r} points to unknown question {b['next']!r}")
+            return index[b["next"]], tuple(b.get("set", {}).items())
+
+        self.ids = tuple(ids)
+        self.texts = tuple(q["text"] for q in spec) + (None,)
+        self.yes_no = tuple(q.get("kind") == "yes_no" for q in spec)
+        # transitions[i][YES|NO|OTHER] = (next_index, updates); an unclear
+        # answer to a yes/no question without an "any" branch re-asks it
+        self.transitions = tuple(
+            (branch(q, "yes"), branch(q, "no"), branch(q, "any") if "any" in q else (i, ()))
+            if q.get("kind") == "yes_no" else (branch(q, "any"),) * 3
+            for i, q in enumerate(spec)
+        )
+        self.index = index
+        self.end = len(spec)
+
+    def __len__(self):
+        return self.end
+
+    def question(self, index):
+        return self.texts[index]
+
+    def advance(self, index, answer_text):
+        """Resolve the next question and flag updates for an answer to question `index`"""
+        if not 0 <= index < self.end:
+            raise IndexError(f"Question index {index} is outside the flow (0..{self.end - 1})")
+        outcome = classify_answer(answer_text) if self.yes_no[index] else OTHER
+        next_index, updates = self.transitions[index][outcome]
+        completed = next_index == self.end
+        return FlowStep(index, next_index, updates, completed, self.texts[next_index])
+
+
+def load_flow(path):
+    """Compile a flow from a JSON file containing a FLOW_SPEC-shaped list"""
+    with open(path, encoding="utf-8") as f:
+        return CompiledFlow(json.load(f))
+
+
+DEFAULT_FLOW = CompiledFlow(FLOW_SPEC)
@@ -0,0 +1,150 @@
+"""
+Indexes for the admin dashboard queries on interview_registrations.
+
+The dashboard filters by status / position / school / eligibility flags and
+sorts by submitted_at, and candidate sessions look registrations up by
+session_token. Every statement is idempotent (IF [NOT] EXISTS) and built
+with CONCURRENTLY so it can run against a live database.
+
+A CREATE INDEX CONCURRENTLY that fails (deadlock, duplicate key, cancel)
+leaves an invalid index behind that IF NOT EXISTS would then skip forever,
+so pass invalid_indexes(conn) to create_statements() to drop and rebuild them.
+
+From an alembic revision:
+
+    import registration_indexes
+
+    def upgrade():
+        invalid = registration_indexes.invalid_indexes(op.get_bind())
+        with op.get_context().autocommit_block():
+            for sql in registration_indexes.create_statements(invalid=invalid):
+                op.execute(sql)
+
+    def downgrade():
+        with op.get_context().autocommit_block():
+            for sql in registration_indexes.drop_statements():
+                op.execute(sql)
+
+Or directly: python registration_indexes.py [--drop]
+"""
+import sys
+import os
+import argparse
+from sqlalchemy import text
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+# (name, unique, table, definition)
+DASHBOARD_INDEXES = [
+    # Status tabs, newest first
+    ("ix_interview_registrations_status_submitted_at", False, "interview_registrations",
+     "(status, submitted_at DESC)"),
+    # Position / school filters
+    ("ix_interview_registrations_position_school_submitted_at", False, "interview_registrations",
+     "(position_type, school_type, submitted_at DESC)"),
+    # Completed candidates eligible for at least one track
+    ("ix_interview_registrations_eligible_completed", False, "interview_registrations",
+     "(position_type, submitted_at DESC) "
+     "WHERE is_completed AND (upk_eligible OR teacher_eligible OR substitute_eligible)"),
+    # UPK pipeline
+    ("ix_interview_registrations_upk_completed", False, "interview_registrations",
+     "(submitted_at DESC) WHERE is_completed AND upk_eligible"),
+    # Interviews currently in progress
+    ("ix_interview_registrations_in_progress", False, "interview_registrations",
+     "(started_at) WHERE NOT is_completed AND started_at IS NOT NULL"),
+    # Session lookups; minimal records have no token yet
+    ("ux_interview_registrations_session_token", True, "interview_registrations",
+     "(session_token) WHERE session_token IS NOT NULL"),
+    # Answers of one registration in interview order
+    ("ix_question_answers_registration_order", False, "question_answers",
+     "(registration_id, question_order)"),
+]
+
+
+def invalid_indexes(conn):
+    """Names of the dashboard indexes left invalid (indisvalid = false) by a failed build"""
+    return set(conn.execute(text("""
+        SELECT c.relname FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relnamespace = current_schema()::regnamespace
+          AND c.relname = ANY(:names)
+    """), {"names": [name for name, _, _, _ in DASHBOARD_INDEXES]}).scalars())
+
+
+def create_statements(concurrently=True, partitioned=None, invalid=()):
+    """CREATE INDEX statements; `partitioned` maps partitioned tables to their partition key.
+
+    Indexes on partitioned tables cannot be built CONCURRENTLY, and unique
+    ones must include the partition key (see registration_partitions).
+    Indexes named in `invalid` are dropped first and rebuilt.
+    """
+    partitioned = partitioned or {}
+    statements = []
+    for name, unique, table, definition in DASHBOARD_INDEXES:
+        option = " CONCURRENTLY" if concurrently and table not in partitioned else ""
+        if name in invalid:
+            statements.append(f"DROP INDEX{option} IF EXISTS {name}")
+        if unique and table in partitioned:
+            definition = definition.replace(")", f", {partitioned[table]})", 1)
+        statements.append(f"CREATE {'UNIQUE ' if unique else ''}INDEX{option} IF NOT EXISTS {name} ON {table} {definition}")
+    return statements
+
+
+def drop_statements(concurrently=True, partitioned=None):
+    partitioned = partitioned or {}
+    return [
+        f"DROP INDEX{' CONCURRENTLY' if concurrently and table not in partitioned else ''} IF EXISTS {name}"
+        for name, _, table, _ in DASHBOARD_INDEXES
+    ]
+
+
+def _run(engine, statements):
+    from db_engine import maintenance_connection
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with maintenance_connection(engine, autocommit=True) as conn:
+        for sql in statements:
+            print(f"  {sql}")
+            conn.execute(text(sql))
+        conn.execute(text("ANALYZE interview_registrations"))
+        conn.execute(text("ANALYZE question_answers"))
+
+
+def create_indexes(engine):
+    from registration_partitions import partitioned_tables
+
+    with engine.connect() as conn:
+        partitioned = partitioned_tables(conn)
+        invalid = invalid_indexes(conn)
+    _run(engine, create_statements(partitioned=partitioned, invalid=invalid))
+
+
+def drop_indexes(engine):
+    from registration_partitions import partitioned_tables
+
+    with engine.connect() as conn:
+        partitioned = partitioned_tables(conn)
+    _run(engine, drop_statements(partitioned=partitioned))
+
+
+def main(argv=None):
+    from db_engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Create or drop the dashboard indexes")
+    parser.add_argument("--drop", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.drop:
+        print("Dropping dashboard indexes...")
+        drop_indexes(get_engine())
+    else:
+        print("Creating dashboard indexes...")
+        create_indexes(get_engine())
+    print("Done!")
+
+
+if __name__ == "__main__":
+    main()
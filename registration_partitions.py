@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+"""
+Monthly range partitioning and archival for interview_registrations and
+question_answers.
+
+interview_registrations is partitioned by submitted_at and question_answers
+by a new created_at column (backfilled from the registration's start time),
+one partition per month plus a DEFAULT partition that catches anything no
+monthly partition covers yet:
+
+    interview_registrations_p2025_01, ..._p2025_02, ..., interview_registrations_default
+
+Postgres requires the partition key in every primary key and unique index,
+so the primary keys become (id, submitted_at) / (id, created_at) and the
+unique session_token index becomes (session_token, submitted_at). Foreign
+keys referencing interview_registrations(id) cannot be kept and are dropped;
+archival cleans up registration_derivations itself.
+
+maintain() is meant to run daily (cron, or a startup hook):
+  - creates the partitions for the next few months; rows that already
+    landed in the DEFAULT partition are moved into the new partition
+    through the parent, so the stats and search triggers see the move
+  - archives partitions older than the retention period to
+    <archive_dir>/<partition>.ndjson.gz (or .parquet with pyarrow), then
+    detaches and drops them, subtracting them from registration_stats;
+    a registrations partition takes its registrations' answers with it
+
+Dashboard, listing and search queries go through prune_recent(), which
+limits them to whole recent months so the planner only touches those
+partitions. Once interview_registrations is partitioned (checked with
+registrations_partitioned()) that is the default: the last HOT_MONTHS
+months. Pass months=ALL_HISTORY (0) to opt out; unpartitioned tables cover
+all history unless a bound is given. Batch jobs (export, backfill,
+rescoring) do not prune.
+
+Usage:
+    python registration_partitions.py --convert     # one-time conversion (locks both tables)
+    python registration_partitions.py               # maintain: create ahead + archive old
+    python registration_partitions.py --list
+"""
+import sys
+import os
+import re
+import gzip
+import json
+import argparse
+from datetime import datetime
+from sqlalchemy import text
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from db_engine import maintenance_connection
+
+PARTITION_KEYS = {
+    "interview_registrations": "submitted_at",
+    "question_answers": "created_at",
+}
+HOT_MONTHS = int(os.getenv("REGISTRATION_HOT_MONTHS", 3))
+ALL_HISTORY = 0
+RETENTION_MONTHS = int(os.getenv("REGISTRATION_RETENTION_MONTHS", 24))
+MONTHS_AHEAD = 3
+DEFAULT_ARCHIVE_DIR = os.getenv("REGISTRATION_ARCHIVE_DIR", os.path.join(CURRENT_DIR, "archive"))
+LOCK_KEY = 8301746
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    years, month = divmod(value.month - 1 + months, 12)
+    return datetime(value.year + years, month + 1, 1)
+
+
+def partition_name(table, month):
+    return f"{table}_p{month:%Y_%m}"
+
+
+def recent_cutoff(months=None, now=None):
+    """Start of the oldest hot month; aligned to partition boundaries"""
+    months = HOT_MONTHS if months is None else months
+    return add_months(month_start(now or datetime.now()), -(months - 1))
+
+
+def prune_recent(stmt, months=None, column=None, partitioned=False):
+    """Limit a registrations query to the last `months` months.
+
+    months=None means HOT_MONTHS when `partitioned` (registrations_partitioned())
+    and all history otherwise; ALL_HISTORY (0) never prunes.
+    """
+    if months is None:
+        months = HOT_MONTHS if partitioned else ALL_HISTORY
+    if not months:
+        return stmt
+    if column is None:
+        column = InterviewRegistration.__table__.c.submitted_at
+    return stmt.where(column >= recent_cutoff(months))
+
+
+# -- catalog -----------------------------------------------------------------
+
+def partitioned_tables(conn):
+    """{table: partition key column} for the partitioned tables in the current schema"""
+    rows = conn.execute(text("""
+        SELECT c.relname, a.attname
+        FROM pg_partitioned_table p
+        JOIN pg_class c ON c.oid = p.partrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace AND n.nspname = current_schema()
+        JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    """))
+    return dict(rows.all())
+
+
+_partitioned = {}
+
+
+def registrations_partitioned(conn):
+    """Whether interview_registrations is partitioned; checked once per database and cached"""
+    key = conn.engine.url.render_as_string(hide_password=True)
+    if key not in _partitioned:
+        _partitioned[key] = (conn.dialect.name == "postgresql"
+                             and "interview_registrations" in partitioned_tables(conn))
+    return _partitioned[key]
+
+
+async def aregistrations_partitioned(session):
+    """registrations_partitioned() for an AsyncSession"""
+    return await session.run_sync(lambda s: registrations_partitioned(s.connection()))
+
+
+def monthly_partitions(conn, table):
+    """[(partition name, month start)] of a partitioned table, oldest first"""
+    names = conn.execute(text("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(:table)
+    """), {"table": table}).scalars()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            partitions.append((name, datetime(int(match["year"]), int(match["month"]), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _lock(conn):
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+
+
+# -- partition creation ------------------------------------------------------
+
+def ensure_partition(conn, table, month):
+    """Create (and attach) the partition for `month`; returns False if it already exists"""
+    name = partition_name(table, month)
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+    key = PARTITION_KEYS[table]
+    bounds = {"lo": month, "hi": add_months(month, 1)}
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    # Rows for this month may already sit in the DEFAULT partition and
+    # attaching fails while they are there. Park them in a temp table, attach,
+    # then re-insert. Both the DELETE and the INSERT go through the parent:
+    # statement triggers on a partitioned table (registration_stats) do not
+    # fire for DML aimed at a partition directly.
+    moving = f"{name}_moving"
+    conn.execute(text(f"CREATE TEMP TABLE {moving} (LIKE {table}) ON COMMIT DROP"))
+    conn.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM {table} WHERE {key} >= :lo AND {key} < :hi RETURNING *
+        )
+        INSERT INTO {moving} SELECT * FROM moved
+    """), bounds)
+    conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM (:lo) TO (:hi)"), bounds)
+    conn.execute(text(f"INSERT INTO {table} SELECT * FROM {moving}"))
+    conn.execute(text(f"DROP TABLE {moving}"))
+    return True
+
+
+def ensure_partitions(conn, months_ahead=MONTHS_AHEAD, start=None, now=None):
+    """Create the monthly partitions from `start` (default: this month) to `months_ahead` months out"""
+    _lock(conn)
+    current = month_start(now or datetime.now())
+    first = month_start(start) if start is not None else current
+    created = []
+    for table in partitioned_tables(conn):
+        if table not in PARTITION_KEYS:
+            continue
+        month = first
+        while month <= add_months(current, months_ahead):
+            if ensure_partition(conn, table, month):
+                created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return created
+
+
+# -- one-time conversion -----------------------------------------------------
+
+def _with_key(indexdef, key):
+    """Add the partition key to the column list of a CREATE UNIQUE INDEX definition"""
+    start = indexdef.index("(", indexdef.index(" USING "))
+    depth = 0
+    for i in range(start, len(indexdef)):
+        if indexdef[i] == "(":
+            depth += 1
+        elif indexdef[i] == ")":
+            depth -= 1
+            if depth == 0:
+                return f"{indexdef[:i]}, {key}{indexdef[i:]}"
+    return indexdef
+
+
+def _convert_table(conn, table, key, now):
+    staging = f"{table}_partitioned"
+    primary_key = conn.execute(text("""
+        SELECT array_agg(a.attname ORDER BY a.attnum) FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+        WHERE i.indrelid = to_regclass(:table) AND i.indisprimary
+    """), {"table": table}).scalar() or []
+    indexes = conn.execute(text("""
+        SELECT pg_get_indexdef(i.indexrelid), i.indisunique FROM pg_index i
+        WHERE i.indrelid = to_regclass(:table) AND NOT i.indisprimary
+    """), {"table": table}).all()
+    sequences = conn.execute(text("""
+        SELECT column_name, pg_get_serial_sequence(:table, column_name) FROM information_schema.columns
+        WHERE table_name = :table AND table_schema = current_schema() AND column_default LIKE 'nextval(%'
+    """), {"table": table}).all()
+
+    conn.execute(text(
+        f"CREATE TABLE {staging} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS "
+        f"INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({key})"
+    ))
+    pk_columns = [c for c in primary_key if c != key] + [key]
+    conn.execute(text(f"ALTER TABLE {staging} ADD PRIMARY KEY ({', '.join(pk_columns)})"))
+    conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {staging} DEFAULT"))
+
+    oldest = conn.execute(text(f"SELECT min({key}) FROM {table}")).scalar()
+    month = month_start(oldest or now)
+    while month <= add_months(month_start(now), MONTHS_AHEAD):
+        conn.execute(text(
+            f"CREATE TABLE {partition_name(table, month)} PARTITION OF {staging} FOR VALUES FROM (:lo) TO (:hi)"
+        ), {"lo": month, "hi": add_months(month, 1)})
+        month = add_months(month, 1)
+
+    conn.execute(text(f"INSERT INTO {staging} SELECT * FROM {table}"))
+    for column, sequence in sequences:
+        if sequence:
+            conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {staging}.{column}"))
+    # Also drops foreign keys pointing at the table and functions/triggers bound to its row type
+    conn.execute(text(f"DROP TABLE {table} CASCADE"))
+    conn.execute(text(f"ALTER TABLE {staging} RENAME TO {table}"))
+    for indexdef, unique in indexes:
+        conn.execute(text(_with_key(indexdef, key) if unique and key not in indexdef else indexdef))
+
+
+def convert(engine, now=None):
+    """Convert both tables to monthly partitions; returns the tables converted.
+
+    Runs in one transaction holding ACCESS EXCLUSIVE locks on both tables
+    while the rows are copied, so schedule it in a maintenance window.
+    Afterwards the bootstrap steps that attach triggers and indexes to these
+    tables are re-applied.
+    """
+    now = now or datetime.now()
+    with maintenance_connection(engine) as conn, conn.begin():
+        _lock(conn)
+        partitioned = partitioned_tables(conn)
+        todo = [table for table in PARTITION_KEYS if table not in partitioned]
+        if not todo:
+            return []
+
+        if "interview_registrations" in todo:
+            conn.execute(text(
+                "UPDATE interview_registrations SET submitted_at = coalesce(started_at, now()) "
+                "WHERE submitted_at IS NULL"
+            ))
+            conn.execute(text(
+                "ALTER TABLE interview_registrations ALTER COLUMN submitted_at SET DEFAULT now(), "
+                "ALTER COLUMN submitted_at SET NOT NULL"
+            ))
+        if "question_answers" in todo:
+            conn.execute(text("ALTER TABLE question_answers ADD COLUMN IF NOT EXISTS created_at TIMESTAMP"))
+            conn.execute(text("""
+                UPDATE question_answers qa
+                SET created_at = coalesce(r.started_at, r.submitted_at, now())
+                FROM interview_registrations r
+                WHERE r.id = qa.registration_id AND qa.created_at IS NULL
+            """))
+            conn.execute(text("UPDATE question_answers SET created_at = now() WHERE created_at IS NULL"))
+            conn.execute(text(
+                "ALTER TABLE question_answers ALTER COLUMN created_at SET DEFAULT now(), "
+                "ALTER COLUMN created_at SET NOT NULL"
+            ))
+
+        for table in todo:
+            print(f"Partitioning {table} by {PARTITION_KEYS[table]}...")
+            _convert_table(conn, table, PARTITION_KEYS[table], now)
+
+        if conn.execute(text("SELECT to_regclass('schema_bootstrap')")).scalar() is not None:
+            conn.execute(text("DELETE FROM schema_bootstrap WHERE step NOT IN ('users_table', 'alembic_revision')"))
+    _partitioned.clear()
+
+    from bootstrap_schema import bootstrap
+    bootstrap(engine)
+    with maintenance_connection(engine, autocommit=True) as conn:
+        for table in todo:
+            conn.execute(text(f"ANALYZE {table}"))
+    return todo
+
+
+# -- archival ----------------------------------------------------------------
+
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+class NdjsonArchive:
+    suffix = ".ndjson.gz"
+
+    def __init__(self, path):
+        self.out = gzip.open(path, "wt", encoding="utf-8")
+
+    def write_page(self, page):
+        self.out.writelines(json.dumps(row, default=_json_default) + "\n" for row in page)
+
+    def close(self):
+        self.out.close()
+
+
+class ParquetArchive:
+    """Needs pyarrow; JSON columns are stored as JSON strings"""
+
+    suffix = ".parquet"
+
+    def __init__(self, path):
+        import pyarrow.parquet as pq
+
+        self._pq = pq
+        self.path = path
+        self.writer = None
+        self.string_columns = set()
+
+    def _prepare(self, page):
+        return [{
+            key: json.dumps(value, default=_json_default) if isinstance(value, (dict, list))
+            else (str(value) if key in self.string_columns and value is not None else value)
+            for key, value in row.items()
+        } for row in page]
+
+    def write_page(self, page):
+        import pyarrow as pa
+
+        if self.writer is None:
+            inferred = pa.Table.from_pylist(self._prepare(page)).schema
+            # Columns that are all NULL in the first page are stored as strings
+            self.string_columns = {f.name for f in inferred if pa.types.is_null(f.type)}
+            schema = pa.schema([pa.field(f.name, pa.string()) if f.name in self.string_columns else f
+                                for f in inferred])
+            self.writer = self._pq.ParquetWriter(self.path, schema, compression="zstd")
+        self.writer.write_table(pa.Table.from_pylist(self._prepare(page), schema=self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+ARCHIVE_FORMATS = {"ndjson": NdjsonArchive, "parquet": ParquetArchive}
+
+
+def _export(conn, sql, path, archive, page_size):
+    writer = archive(path)
+    rows = 0
+    try:
+        result = conn.execute(text(sql).execution_options(yield_per=page_size))
+        for page in result.mappings().partitions():
+            page = [dict(row) for row in page]
+            writer.write_page(page)
+            rows += len(page)
+    finally:
+        writer.close()
+    return rows
+
+
+def archive_partition(engine, table, month, archive_dir=DEFAULT_ARCHIVE_DIR, fmt="ndjson", page_size=5000):
+    """Write one monthly partition to a compressed file, then detach and drop it.
+
+    Returns [(path, rows)]. The answers are partitioned by their own
+    created_at, which can fall in a later month than the registration's
+    submitted_at, so archiving a registrations partition also archives (to
+    <partition>_answers.<suffix>) and deletes the answers of its
+    registrations, wherever they live, instead of orphaning them.
+
+    Everything happens in one transaction: the partition is locked against
+    writes while it is exported, so the files and the dropped rows always match.
+    """
+    name = partition_name(table, month)
+    archive = ARCHIVE_FORMATS[fmt]
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, name + archive.suffix)
+    answers_path = os.path.join(archive_dir, f"{name}_answers{archive.suffix}")
+    archived = []
+
+    with maintenance_connection(engine) as conn, conn.begin():
+        _lock(conn)
+        conn.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        rows = _export(conn, f"SELECT * FROM {name}", path + ".tmp", archive, page_size)
+        archived.append((path, rows))
+
+        if table == "interview_registrations":
+            answers = _export(conn, f"""
+                SELECT qa.* FROM question_answers qa JOIN {name} p ON p.id = qa.registration_id
+                ORDER BY qa.registration_id, qa.question_order
+            """, answers_path + ".tmp", archive, page_size)
+            archived.append((answers_path, answers))
+
+            if conn.execute(text("SELECT to_regclass('registration_stats_delta')")).scalar() is not None:
+                from dashboard_stats import delta_sql
+
+                # Detaching fires no DELETE triggers; take the rows out of the rollup here
+                conn.execute(text(delta_sql(name, -1)))
+            if conn.execute(text("SELECT to_regclass('registration_derivations')")).scalar() is not None:
+                conn.execute(text(
+                    f"DELETE FROM registration_derivations d USING {name} p WHERE d.registration_id = p.id"
+                ))
+        conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+        if table == "interview_registrations":
+            # After the detach, so the search trigger has no registrations left to recompute
+            conn.execute(text(f"DELETE FROM question_answers qa USING {name} p WHERE qa.registration_id = p.id"))
+        conn.execute(text(f"DROP TABLE {name}"))
+        for archived_path, _ in archived:
+            os.replace(archived_path + ".tmp", archived_path)
+    return archived
+
+
+def archive_old(engine, retention_months=RETENTION_MONTHS, archive_dir=DEFAULT_ARCHIVE_DIR, fmt="ndjson",
+                now=None):
+    """Archive every monthly partition older than the retention period"""
+    cutoff = add_months(month_start(now or datetime.now()), -retention_months)
+    archived = []
+    with engine.connect() as conn:
+        candidates = [(table, month) for table in partitioned_tables(conn) if table in PARTITION_KEYS
+                      for _, month in monthly_partitions(conn, table) if month < cutoff]
+    # Registrations first: they take their answers with them, so the answer
+    # partitions archived afterwards only hold what is left
+    candidates.sort(key=lambda c: (c[0] != "interview_registrations", c[1]))
+    for table, month in candidates:
+        for path, rows in archive_partition(engine, table, month, archive_dir, fmt):
+            print(f"  archived {partition_name(table, month)}: {rows} rows -> {path}")
+            archived.append((path, rows))
+    return archived
+
+
+def maintain(engine, months_ahead=MONTHS_AHEAD, retention_months=RETENTION_MONTHS,
+             archive_dir=DEFAULT_ARCHIVE_DIR, fmt="ndjson"):
+    with maintenance_connection(engine) as conn, conn.begin():
+        created = ensure_partitions(conn, months_ahead)
+    archived = archive_old(engine, retention_months, archive_dir, fmt) if retention_months > 0 else []
+    return created, archived
+
+
+def main(argv=None):
+    from db_engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Monthly partitions for registrations and answers")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--convert", action="store_true", help="convert the tables to partitioned tables")
+    group.add_argument("--list", action="store_true", help="list the monthly partitions")
+    parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=RETENTION_MONTHS,
+                        help="archive partitions older than this (0 = never)")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--format", choices=sorted(ARCHIVE_FORMATS), default="ndjson")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.convert:
+        converted = convert(engine)
+        print(f"Converted: {', '.join(converted)}" if converted else "Tables are already partitioned.")
+        return
+    if args.list:
+        with engine.connect() as conn:
+            for table in partitioned_tables(conn):
+                print(f"{table}:")
+                for name, _ in monthly_partitions(conn, table):
+                    print(f"  {name}")
+        return
+
+    created, archived = maintain(engine, args.months_ahead, args.retention_months, args.archive_dir, args.format)
+    print(f"Created {len(created)} partitions, archived {len(archived)}")
+
+
+if __name__ == "__main__":
+    main()
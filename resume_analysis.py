@@ -0,0 +1,110 @@
+"""
+Local, offline resume analysis.
+
+These heuristics produce resume_summary and resume_comparison values in the
+same shape as the AI-generated ones, and are the default summarizer and
+comparer for the derivation cache and the batch pipelines. Any callable
+with the same signature can be plugged in instead:
+
+    summarize(resume_text) -> str
+    compare(resume_text, answers) -> dict   # answers: list of answer dicts
+
+A callable may carry a `version` attribute (default 1). Bump it when its
+output changes, so the derivation cache recomputes what the old version
+produced instead of serving it.
+"""
+import re
+from datetime import datetime
+
+STOPWORDS = frozenset("""
+a about above after again all am an and any are as at be been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most my no nor not of off on once only or other
+our ours out over own same she should so some such than that the their them then there these they this
+those through to too under until up very was we were what when where which while who whom why will with
+would yes you your yours
+""".split())
+
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#\-]*")
+NO_RESUME = "Resume not provided"
+
+
+def tokenize(text):
+    """Lowercase content words of a text"""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def heuristic_summary(resume_text, max_sentences=2, max_chars=400):
+    """First sentences of the resume, trimmed to max_chars"""
+    text = " ".join((resume_text or "").split())
+    if not text or text == NO_RESUME:
+        return "No resume summary available"
+    summary = " ".join(SENTENCE_RE.split(text)[:max_sentences])
+    if len(summary) > max_chars:
+        summary = summary[:max_chars].rsplit(" ", 1)[0] + "..."
+    return summary
+
+
+def _recommendation(score):
+    if score >= 75:
+        return "proceed"
+    if score >= 50:
+        return "hold"
+    return "reject"
+
+
+def build_comparison(score, matching_points, discrepancies, confidence):
+    """Assemble a resume_comparison dict in the stored shape"""
+    score = int(round(score))
+    recommendation = _recommendation(score)
+    assessment = {
+        "proceed": "Strong match - interview responses are consistent with the resume",
+        "hold": "Partial match - some interview responses are not reflected in the resume",
+        "reject": "Weak match - interview responses differ substantially from the resume",
+    }[recommendation]
+    return {
+        "similarity_score": score,
+        "overall_assessment": assessment,
+        "matching_points": matching_points,
+        "discrepancies": discrepancies,
+        "recommendation": recommendation,
+        "confidence": round(confidence, 2),
+        "analyzed_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def heuristic_comparison(resume_text, answers, max_points=5):
+    """Compare resume vocabulary with the candidate's answers.
+
+    The score is the share of distinct answer terms that also appear in the
+    resume; matching points are the most frequent shared terms and
+    discrepancies are answered questions that share no terms with the resume.
+    """
+    resume_terms = set(tokenize(resume_text))
+    answer_texts = [a.get("answer_text") or "" for a in answers if a.get("is_answered", True)]
+    answer_terms = [t for text in answer_texts for t in tokenize(text)]
+    if not resume_terms or not answer_terms:
+        return build_comparison(0, [], ["Not enough resume or interview data to compare"], 0.1)
+
+    distinct = set(answer_terms)
+    shared = distinct & resume_terms
+    score = 100.0 * len(shared) / len(distinct)
+
+    counts = {}
+    for term in answer_terms:
+        if term in shared:
+            counts[term] = counts.get(term, 0) + 1
+    top = sorted(counts, key=lambda t: (-counts[t], t))[:max_points]
+    matching_points = [f"'{term}' mentioned in resume and interview" for term in top]
+    discrepancies = [
+        f"Answer to '{a.get('question_text')}' is not reflected in the resume"
+        for a in answers
+        if a.get("is_answered", True) and a.get("answer_text") and not set(tokenize(a["answer_text"])) & resume_terms
+    ]
+    confidence = min(0.95, 0.3 + 0.05 * len(distinct))
+    return build_comparison(score, matching_points, discrepancies, confidence)
+
+
+# v2: skipped (is_answered = false) answers no longer count as discrepancies
+heuristic_comparison.version = 2
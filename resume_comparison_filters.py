@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+JSONB storage, indexes and query helpers for resume_comparison.
+
+resume_comparison is a dict like
+    {"similarity_score": 92, "recommendation": "proceed", "confidence": 0.95,
+     "discrepancies": [...], "matching_points": [...], ...}
+
+The migration converts the column to JSONB and adds
+  - a GIN (jsonb_path_ops) index for containment queries (@>)
+  - expression indexes on similarity_score (numeric) and recommendation
+The helpers below build filters on exactly those expressions so Postgres
+can use the indexes instead of the rows being filtered in Python.
+
+The expressions are literal SQL on purpose: a bound parameter for the key
+(resume_comparison ->> $1) would not match the expression index.
+
+Usage:
+    python resume_comparison_filters.py --migrate
+    python resume_comparison_filters.py --min-score 80 --recommendation proceed
+"""
+import sys
+import os
+import argparse
+from sqlalchemy import select, text, literal, literal_column, Numeric, func, and_
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+from registration_partitions import prune_recent, registrations_partitioned
+
+TABLE = "interview_registrations"
+
+MIGRATION_STATEMENTS = [
+    f"""
+    DO $$
+    BEGIN
+        IF (SELECT data_type FROM information_schema.columns
+            WHERE table_name = '{TABLE}' AND column_name = 'resume_comparison'
+              AND table_schema = current_schema()) <> 'jsonb' THEN
+            ALTER TABLE {TABLE}
+                ALTER COLUMN resume_comparison TYPE JSONB USING resume_comparison::jsonb;
+        END IF;
+    END $$
+    """,
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_resume_comparison_gin "
+    f"ON {TABLE} USING gin (resume_comparison jsonb_path_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_similarity_score "
+    f"ON {TABLE} (((resume_comparison ->> 'similarity_score')::numeric))",
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLE}_recommendation_score "
+    f"ON {TABLE} ((resume_comparison ->> 'recommendation'), ((resume_comparison ->> 'similarity_score')::numeric))",
+]
+
+DOWNGRADE_STATEMENTS = [
+    f"DROP INDEX IF EXISTS ix_{TABLE}_recommendation_score",
+    f"DROP INDEX IF EXISTS ix_{TABLE}_similarity_score",
+    f"DROP INDEX IF EXISTS ix_{TABLE}_resume_comparison_gin",
+    f"ALTER TABLE {TABLE} ALTER COLUMN resume_comparison TYPE JSON USING resume_comparison::json",
+]
+
+# Same expressions as the indexes above
+SIMILARITY_SCORE = literal_column(f"(({TABLE}.resume_comparison ->> 'similarity_score')::numeric)", Numeric)
+RECOMMENDATION = literal_column(f"({TABLE}.resume_comparison ->> 'recommendation')")
+CONFIDENCE = literal_column(f"(({TABLE}.resume_comparison ->> 'confidence')::numeric)", Numeric)
+
+
+def contains(fragment):
+    """resume_comparison @> fragment, served by the GIN index"""
+    return literal_column(f"{TABLE}.resume_comparison", JSONB).op("@>")(literal(fragment, JSONB))
+
+
+def comparison_filters(min_score=None, max_score=None, recommendations=None,
+                       min_confidence=None, has_discrepancies=None):
+    """Build a list of WHERE clauses over resume_comparison"""
+    clauses = []
+    if min_score is not None:
+        clauses.append(SIMILARITY_SCORE >= min_score)
+    if max_score is not None:
+        clauses.append(SIMILARITY_SCORE <= max_score)
+    if recommendations:
+        if isinstance(recommendations, str):
+            recommendations = [recommendations]
+        clauses.append(RECOMMENDATION.in_(list(recommendations)))
+    if min_confidence is not None:
+        clauses.append(CONFIDENCE >= min_confidence)
+    if has_discrepancies is not None:
+        count = literal_column(f"coalesce(jsonb_array_length({TABLE}.resume_comparison -> 'discrepancies'), 0)")
+        clauses.append(count > 0 if has_discrepancies else count == 0)
+    return clauses
+
+
+def filter_candidates(stmt, **filters):
+    """Apply comparison_filters() to an existing select()/ORM query"""
+    clauses = comparison_filters(**filters)
+    return stmt.where(and_(*clauses)) if clauses else stmt
+
+
+def candidates_query(limit=50, offset=0, recent_months=None, partitioned=False, **filters):
+    """Registrations matching the filters, best similarity score first.
+
+    recent_months limits it to the last N months; by default the recent
+    partitions when `partitioned` (registrations_partitioned(conn)), 0 for
+    all history. See registration_partitions.prune_recent.
+    """
+    reg = InterviewRegistration.__table__
+    stmt = select(
+        reg.c.id, reg.c.name, reg.c.email, reg.c.status, reg.c.position_type,
+        SIMILARITY_SCORE.label("similarity_score"), RECOMMENDATION.label("recommendation"),
+    ).order_by(SIMILARITY_SCORE.desc().nulls_last(), reg.c.id)
+    return filter_candidates(prune_recent(stmt, recent_months, partitioned=partitioned), **filters) \
+        .limit(limit).offset(offset)
+
+
+def recommendation_summary(conn, bucket_width=10, recent_months=None, **filters):
+    """Counts per recommendation and score bucket, computed in Postgres, over the same rows as candidates_query"""
+    bucket = (func.floor(SIMILARITY_SCORE / bucket_width) * bucket_width).label("score_bucket")
+    stmt = select(RECOMMENDATION.label("recommendation"), bucket, func.count().label("count")) \
+        .select_from(InterviewRegistration.__table__) \
+        .group_by(literal_column("1"), literal_column("2")) \
+        .order_by(literal_column("1"), literal_column("2"))
+    stmt = prune_recent(stmt, recent_months, partitioned=registrations_partitioned(conn))
+    return [dict(row) for row in conn.execute(filter_candidates(stmt, **filters)).mappings()]
+
+
+def migrate(engine):
+    from db_engine import maintenance_connection
+
+    # The type change rewrites the table
+    with maintenance_connection(engine) as conn, conn.begin():
+        for sql in MIGRATION_STATEMENTS:
+            conn.execute(text(sql))
+        conn.execute(text(f"ANALYZE {TABLE}"))
+
+
+def main(argv=None):
+    from db_engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Filter candidates by resume comparison")
+    parser.add_argument("--migrate", action="store_true", help="convert to JSONB and create the indexes")
+    parser.add_argument("--min-score", type=float)
+    parser.add_argument("--max-score", type=float)
+    parser.add_argument("--recommendation", action="append", dest="recommendations")
+    parser.add_argument("--min-confidence", type=float)
+    parser.add_argument("--has-discrepancies", action=argparse.BooleanOptionalAction, default=None,
+                        help="only registrations with (or, with --no-has-discrepancies, without) discrepancies")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--recent-months", type=int, default=None,
+                        help="only registrations from the last N months; 0 = all history "
+                             "(default: the recent partitions when partitioned, else all history)")
+    parser.add_argument("--summary", action="store_true", help="show counts per recommendation/score bucket")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.migrate:
+        print("Migrating resume_comparison to JSONB...")
+        migrate(engine)
+        print("Done!")
+        return
+
+    filters = dict(min_score=args.min_score, max_score=args.max_score,
+                   recommendations=args.recommendations, min_confidence=args.min_confidence,
+                   has_discrepancies=args.has_discrepancies)
+    with engine.connect() as conn:
+        if args.summary:
+            for row in recommendation_summary(conn, recent_months=args.recent_months, **filters):
+                print(f"{row['recommendation'] or '-':<12} {row['score_bucket']!s:>6} {row['count']:>8}")
+            return
+        stmt = candidates_query(limit=args.limit, recent_months=args.recent_months,
+                                partitioned=registrations_partitioned(conn), **filters)
+        for row in conn.execute(stmt).mappings():
+            print(f"{row['id']:>8} {row['similarity_score']!s:>5} {row['recommendation'] or '-':<10} "
+                  f"{row['name']} <{row['email']}> [{row['status']}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Content-hash cache for the derived resume fields.
+
+resume_summary depends only on resume_extracted_text, and resume_comparison
+on the resume text plus the candidate's answers. Each derivation is keyed
+by a SHA-256 of exactly those inputs and by the deriver that produced it
+(deriver_id(): the summarizer/comparer's qualified name and `version`):
+
+  resume_derivation_cache   (kind, deriver, input_hash) -> output
+                                                     content-addressed, shared by
+                                                     identical inputs
+  registration_derivations  registration_id -> summary_hash/_deriver, comparison_hash/_deriver
+                                                     what the stored fields were
+                                                     computed from, and by whom
+
+A stored field is recomputed when its inputs changed, or when an older
+version of the same deriver produced it. Output of another deriver (an AI
+summarizer run by ingest_resumes, say) is kept while its inputs are
+unchanged, and fields that predate the cache are adopted on first sight:
+their input hashes are recorded and they are only recomputed once the
+inputs change.
+
+ensure_derived() does this lazily for one registration on read;
+backfill() walks the table page by page. Anything else that writes
+resume_summary or resume_comparison (ingest_resumes, batch_similarity)
+records its input hashes and deriver with record_derivations() in the same
+transaction.
+
+registration_derivations has no foreign key: registration ids are not
+unique on their own once interview_registrations is partitioned (see
+registration_partitions), and archival removes the rows of archived
+registrations itself.
+
+Usage:
+    python resume_derivation_cache.py --backfill [--page-size 500] [--dry-run]
+"""
+import sys
+import os
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from sqlalchemy import Table, Column, Integer, String, DateTime, select, update, bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB, insert
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.db.postgres.database import Base
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+from resume_analysis import heuristic_summary, heuristic_comparison
+
+SUMMARY = "summary"
+COMPARISON = "comparison"
+
+# Fields refresh_registrations() can adopt or recompute: kind -> (registration column, derivation columns)
+FIELDS = {
+    SUMMARY: ("resume_summary", "summary_hash", "summary_deriver"),
+    COMPARISON: ("resume_comparison", "comparison_hash", "comparison_deriver"),
+}
+
+resume_derivation_cache = Table(
+    "resume_derivation_cache",
+    Base.metadata,
+    Column("kind", String(20), primary_key=True),
+    Column("deriver", String(200), primary_key=True),
+    Column("input_hash", String(64), primary_key=True),
+    Column("output", JSONB, nullable=False),
+    Column("created_at", DateTime, nullable=False, default=datetime.now),
+)
+
+registration_derivations = Table(
+    "registration_derivations",
+    Base.metadata,
+    Column("registration_id", Integer, primary_key=True),
+    Column("summary_hash", String(64)),
+    Column("summary_deriver", String(200)),
+    Column("comparison_hash", String(64)),
+    Column("comparison_deriver", String(200)),
+    Column("updated_at", DateTime, nullable=False, default=datetime.now, onupdate=datetime.now),
+)
+
+# Brings tables created before the deriver columns up to date (idempotent).
+# Cache entries from then have no known deriver and are dropped.
+MIGRATION_STATEMENTS = [
+    "ALTER TABLE resume_derivation_cache ADD COLUMN IF NOT EXISTS deriver VARCHAR(200) NOT NULL DEFAULT ''",
+    "DELETE FROM resume_derivation_cache WHERE deriver = ''",
+    "ALTER TABLE resume_derivation_cache ALTER COLUMN deriver DROP DEFAULT",
+    "ALTER TABLE resume_derivation_cache DROP CONSTRAINT IF EXISTS resume_derivation_cache_pkey",
+    "ALTER TABLE resume_derivation_cache ADD PRIMARY KEY (kind, deriver, input_hash)",
+    "ALTER TABLE registration_derivations ADD COLUMN IF NOT EXISTS summary_deriver VARCHAR(200)",
+    "ALTER TABLE registration_derivations ADD COLUMN IF NOT EXISTS comparison_deriver VARCHAR(200)",
+]
+
+
+def _digest(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def _answer_inputs(answers):
+    return [
+        [a.get("question_order"), a.get("question_text") or "", a.get("answer_text") or "", bool(a.get("is_answered"))]
+        for a in sorted(answers, key=lambda a: (a.get("question_order") or 0))
+    ]
+
+
+def summary_hash(resume_text):
+    return _digest({"v": 1, "resume": resume_text or ""})
+
+
+def comparison_hash(resume_text, answers):
+    # "v" versions the input encoding only; deriver changes are tracked by deriver_id()
+    return _digest({"v": 2, "resume": resume_text or "", "answers": _answer_inputs(answers)})
+
+
+def deriver_id(fn):
+    """'module.name@version' of a summarizer/comparer (version: its `version` attribute, default 1)"""
+    name = getattr(fn, "__qualname__", type(fn).__qualname__)
+    return f"{fn.__module__}.{name}@{getattr(fn, 'version', 1)}"
+
+
+def _deriver_name(deriver):
+    return deriver.rsplit("@", 1)[0] if deriver else None
+
+
+ADOPT = "adopt"
+COMPUTE = "compute"
+
+
+def field_action(current_value, stored_hash, stored_deriver, input_hash, deriver, force=False):
+    """What to do with one stored derived field: COMPUTE, ADOPT (record its hash only) or None"""
+    if force:
+        return COMPUTE
+    if stored_hash is None:
+        return COMPUTE if current_value is None else ADOPT
+    if stored_hash != input_hash:
+        return COMPUTE
+    if stored_deriver != deriver and _deriver_name(stored_deriver) == _deriver_name(deriver):
+        return COMPUTE
+    return None
+
+
+class DerivationCache:
+    """Looks up and stores derived outputs by (kind, deriver, input_hash)"""
+
+    def __init__(self, conn, summarize=heuristic_summary, compare=heuristic_comparison):
+        self.conn = conn
+        self.functions = {SUMMARY: summarize, COMPARISON: compare}
+        self.derivers = {kind: deriver_id(fn) for kind, fn in self.functions.items()}
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, kind, hashes):
+        hashes = list(set(hashes))
+        if not hashes:
+            return {}
+        t = resume_derivation_cache
+        rows = self.conn.execute(
+            select(t.c.input_hash, t.c.output)
+            .where(t.c.kind == kind, t.c.deriver == self.derivers[kind], t.c.input_hash.in_(hashes))
+        )
+        return {row.input_hash: row.output for row in rows}
+
+    def store(self, kind, outputs):
+        if not outputs:
+            return
+        stmt = insert(resume_derivation_cache).on_conflict_do_nothing()
+        self.conn.execute(stmt, [
+            {"kind": kind, "deriver": self.derivers[kind], "input_hash": h, "output": output,
+             "created_at": datetime.now()}
+            for h, output in outputs.items()
+        ])
+
+    def resolve(self, kind, inputs):
+        """inputs: {input_hash: args tuple}; returns {input_hash: output}, computing only misses"""
+        found = self.lookup(kind, inputs)
+        self.hits += len(found)
+        fn = self.functions[kind]
+        computed = {h: fn(*args) for h, args in inputs.items() if h not in found}
+        self.misses += len(computed)
+        self.store(kind, computed)
+        return {**found, **computed}
+
+
+def stored_derivations(conn, registration_ids):
+    """{registration_id: row with summary_hash/_deriver and comparison_hash/_deriver}"""
+    t = registration_derivations
+    rows = conn.execute(
+        select(t.c.registration_id, t.c.summary_hash, t.c.summary_deriver,
+               t.c.comparison_hash, t.c.comparison_deriver)
+        .where(t.c.registration_id.in_(list(registration_ids)))
+    )
+    return {row.registration_id: row for row in rows}
+
+
+def record_derivations(conn, rows):
+    """Upsert the input hashes (and derivers) the stored fields were computed from.
+
+    rows: dicts with registration_id plus summary_hash/summary_deriver and/or
+    comparison_hash/comparison_deriver; columns that are left out keep their
+    stored value.
+    """
+    now = datetime.now()
+    for columns, group in _group_by_columns(rows):
+        upsert = insert(registration_derivations)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[registration_derivations.c.registration_id],
+            set_={**{c: upsert.excluded[c] for c in columns}, "updated_at": upsert.excluded.updated_at},
+        )
+        conn.execute(upsert, [{**row, "updated_at": now} for row in group])
+
+
+def _group_by_columns(rows):
+    groups = {}
+    for row in rows:
+        columns = tuple(sorted(c for c in row if c != "registration_id"))
+        groups.setdefault(columns, []).append(row)
+    return groups.items()
+
+
+def refresh_registrations(conn, registrations, cache, force=False, dry_run=False):
+    """Adopt or recompute the derived fields of a batch of registrations.
+
+    registrations: dicts with id, resume_extracted_text, resume_summary,
+    resume_comparison and an "answers" list (as produced by
+    export_registrations.iter_registration_pages). Summary and comparison
+    are decided separately with field_action(). Returns the number of
+    registrations with a recomputed field (updated unless dry_run);
+    adoptions are recorded unless dry_run.
+    """
+    if not registrations:
+        return 0
+    previous = stored_derivations(conn, [r["id"] for r in registrations])
+    recorded = {}
+    to_compute = {SUMMARY: [], COMPARISON: []}
+    inputs = {SUMMARY: {}, COMPARISON: {}}
+    for reg in registrations:
+        text = reg.get("resume_extracted_text") or ""
+        answers = reg.get("answers", [])
+        hashes = {SUMMARY: summary_hash(text), COMPARISON: comparison_hash(text, answers)}
+        args = {SUMMARY: (text,), COMPARISON: (text, answers)}
+        stored = previous.get(reg["id"])
+        for kind, (field, hash_column, deriver_column) in FIELDS.items():
+            action = field_action(
+                reg.get(field),
+                getattr(stored, hash_column, None), getattr(stored, deriver_column, None),
+                hashes[kind], cache.derivers[kind], force,
+            )
+            if action == ADOPT:
+                recorded.setdefault(reg["id"], {"registration_id": reg["id"]}).update(
+                    {hash_column: hashes[kind], deriver_column: None})
+            elif action == COMPUTE:
+                to_compute[kind].append((reg["id"], hashes[kind]))
+                inputs[kind].setdefault(hashes[kind], args[kind])
+    stale = {reg_id for pairs in to_compute.values() for reg_id, _ in pairs}
+    if dry_run:
+        return len(stale)
+
+    reg_table = InterviewRegistration.__table__
+    for kind, pairs in to_compute.items():
+        if not pairs:
+            continue
+        field, hash_column, deriver_column = FIELDS[kind]
+        outputs = cache.resolve(kind, inputs[kind])
+        conn.execute(
+            update(reg_table).where(reg_table.c.id == bindparam("reg_id")).values({field: bindparam("value")}),
+            [{"reg_id": reg_id, "value": outputs[h]} for reg_id, h in pairs],
+        )
+        for reg_id, h in pairs:
+            recorded.setdefault(reg_id, {"registration_id": reg_id}).update(
+                {hash_column: h, deriver_column: cache.derivers[kind]})
+    record_derivations(conn, list(recorded.values()))
+    return len(stale)
+
+
+def ensure_derived(conn, registration_id, summarize=heuristic_summary, compare=heuristic_comparison):
+    """Lazily bring one registration's summary/comparison up to date on read.
+
+    Checks the stored input hashes and recomputes only a stale field (usually
+    a cache lookup). Returns {"resume_summary": ..., "resume_comparison": ...},
+    or None for an unknown registration.
+    """
+    reg_table = InterviewRegistration.__table__
+    qa = QuestionAnswer.__table__
+    columns = ("id", "resume_extracted_text", "resume_summary", "resume_comparison")
+    row = conn.execute(
+        select(*(reg_table.c[c] for c in columns)).where(reg_table.c.id == registration_id)
+    ).mappings().first()
+    if row is None:
+        return None
+    registration = dict(row)
+    registration["answers"] = [dict(a) for a in conn.execute(
+        select(qa.c.question_order, qa.c.question_text, qa.c.answer_text, qa.c.is_answered)
+        .where(qa.c.registration_id == registration_id)
+    ).mappings()]
+    if refresh_registrations(conn, [registration], DerivationCache(conn, summarize, compare)):
+        row = conn.execute(
+            select(reg_table.c.resume_summary, reg_table.c.resume_comparison).where(reg_table.c.id == registration_id)
+        ).mappings().first()
+    return {"resume_summary": row["resume_summary"], "resume_comparison": row["resume_comparison"]}
+
+
+def backfill(engine, page_size=500, summarize=heuristic_summary, compare=heuristic_comparison,
+             dry_run=False, force=False):
+    """Adopt or recompute the derived fields of every registration (see refresh_registrations)"""
+    from export_registrations import iter_registration_pages
+
+    scanned = updated = 0
+    start = time.perf_counter()
+    with engine.connect() as read_conn:
+        for page in iter_registration_pages(read_conn, page_size):
+            with engine.begin() as conn:
+                cache = DerivationCache(conn, summarize, compare)
+                updated += refresh_registrations(conn, page, cache, force=force, dry_run=dry_run)
+            scanned += len(page)
+            print(f"  ... scanned {scanned}, {'stale' if dry_run else 'updated'} {updated} "
+                  f"(page cache hits {cache.hits}, computed {cache.misses})")
+    elapsed = time.perf_counter() - start
+    print(f"Backfill scanned {scanned} registrations, "
+          f"{'found' if dry_run else 'updated'} {updated} stale in {elapsed:.2f}s")
+    return scanned, updated
+
+
+def main(argv=None):
+    from db_engine import get_engine
+
+    parser = argparse.ArgumentParser(description="Derived resume field cache")
+    parser.add_argument("--backfill", action="store_true", help="recompute rows whose inputs changed")
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    parser.add_argument("--force", action="store_true", help="ignore stored input hashes")
+    parser.add_argument("--create-tables", action="store_true")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.create_tables:
+        with engine.begin() as conn:
+            Base.metadata.create_all(conn, tables=[resume_derivation_cache, registration_derivations])
+            for sql in MIGRATION_STATEMENTS:
+                conn.execute(text(sql))
+        print("Derivation cache tables created.")
+    if args.backfill:
+        backfill(engine, args.page_size, dry_run=args.dry_run, force=args.force)
+    if not (args.create_tables or args.backfill):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Process-wide cache of table column identifiers.
+
+Tables created by create_users_table.py have lowercase columns (userid,
+emailid, ...) while ORM-created ones keep the mixed-case names (UserId,
+EmailId, ...). Raw SQL has to use whichever spelling exists, which used to
+mean an information_schema query on every run. Columns are now reflected
+once per process and database (keyed by the URL without its password),
+and the quoted statements built from them are cached the same way.
+
+Nothing is persisted across processes: two databases at the same alembic
+revision can still spell the users columns differently, so only a live
+catalog query can tell which spelling a database uses.
+"""
+import threading
+from sqlalchemy import text, inspect
+
+# Raw SQL against users, written with logical column names in {braces}
+USER_STATEMENTS = {
+    "insert": (
+        "INSERT INTO users ({UserId}, {Name}, {Password}, {EmailId}, {IsAdmin}, {IsLogin}) "
+        "VALUES (:userid, :name, :password, :emailid, :isadmin, :islogin)"
+    ),
+    "by_email": (
+        "SELECT {UserId} AS userid, {Name} AS name, {Password} AS password, "
+        "{EmailId} AS emailid, {IsAdmin} AS isadmin, {IsLogin} AS islogin "
+        "FROM users WHERE {EmailId} = :emailid"
+    ),
+    "update_password": "UPDATE users SET {Password} = :password WHERE {UserId} = :userid",
+    "set_login": "UPDATE users SET {IsLogin} = :islogin WHERE {UserId} = :userid",
+}
+
+_lock = threading.Lock()
+_columns = {}       # (database, table) -> frozenset of column names
+_statements = {}    # (database, statement name) -> text()
+
+
+def _database(conn):
+    return conn.engine.url.render_as_string(hide_password=True)
+
+
+def table_columns(conn, table_name):
+    """Return the set of column names of a table, reflecting it at most once per process and database"""
+    key = (_database(conn), table_name)
+    cols = _columns.get(key)
+    if cols is not None:
+        return cols
+    with _lock:
+        if key not in _columns:
+            if conn.dialect.name == "postgresql":
+                _columns[key] = frozenset(row[0] for row in conn.execute(text("""
+                    SELECT column_name
+                    FROM information_schema.columns
+                    WHERE table_name = :table_name AND table_schema = current_schema()
+                """), {"table_name": table_name}))
+            else:
+                # SQLite stand-in (bench_suite.py --sqlite)
+                _columns[key] = frozenset(c["name"] for c in inspect(conn).get_columns(table_name))
+        return _columns[key]
+
+
+def column_name(conn, table_name, logical_name):
+    """Resolve a logical column name to the spelling that exists in the table"""
+    cols = table_columns(conn, table_name)
+    if logical_name in cols:
+        return logical_name
+    if logical_name.lower() in cols:
+        return logical_name.lower()
+    raise RuntimeError(f"Column {logical_name} not found in {table_name} table. Available: {set(cols)}")
+
+
+def quoted(conn, table_name, logical_name):
+    """Resolved column name, quoted for use in raw SQL"""
+    return '"{}"'.format(column_name(conn, table_name, logical_name))
+
+
+def user_statement(conn, name):
+    """Return a cached, correctly quoted text() statement from USER_STATEMENTS"""
+    key = (_database(conn), name)
+    stmt = _statements.get(key)
+    if stmt is None:
+        template = USER_STATEMENTS[name]
+        logical = ("UserId", "Name", "Password", "EmailId", "IsAdmin", "IsLogin")
+        stmt = text(template.format(**{c: quoted(conn, "users", c) for c in logical}))
+        _statements[key] = stmt
+    return stmt
+
+
+def invalidate(table_name=None):
+    """Drop cached columns (e.g. after a migration ran in this process)"""
+    with _lock:
+        for key in list(_columns):
+            if table_name is None or key[1] == table_name:
+                del _columns[key]
+        _statements.clear()
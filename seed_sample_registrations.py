@@ -1,255 +1,271 @@
 #!/usr/bin/env python3
 """
 Script to seed the database with sample interview registration data
+
+Usage:
+    python seed_sample_registrations.py                      # sample data, per-row path
+    python seed_sample_registrations.py --count 100000       # synthetic data, bulk path
+    python seed_sample_registrations.py --count 5000 --mode per-row
 """
 import sys
 import os
+import io
+import csv
+import time
+import random
+import argparse
+from itertools import islice
 from datetime import datetime, timedelta
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import insert, delete
 
 # Add the app directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.models.interview_registration import InterviewRegistration
 from app.models.question_answer import QuestionAnswer
-from app.core.config import settings
+from db_engine import get_engine, sync_session as SessionLocal
 
-# Create database connection
-DATABASE_URL = (
-    f"postgresql+psycopg2://{settings.database_username}:{settings.database_password}"
-    f"@{settings.database_host}:{settings.database_port}/{settings.database_name}"
-)
+QUESTION_ANSWER_COLUMNS = ("registration_id", "question_text", "answer_text", "is_answered", "question_order")
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
 
-def seed_sample_data():
-    """Seed the database with sample interview registration data"""
-    db = SessionLocal()
-    
-    try:
-        # Clear existing data
-        db.query(QuestionAnswer).delete()
-        db.query(InterviewRegistration).delete()
-        db.commit()
-        
-        # Sample registrations data
-        sample_registrations = [
-            # Complete records with accepted status
-            {
-                "name": "Sarah Johnson",
-                "email": "sarah.johnson@email.com",
-                "registration_id": "REG001",
-                "session_token": "token_001",
-                "resume_extracted_text": "Experienced elementary school teacher with 5+ years in early childhood education...",
-                "resume_summary": "Experienced elementary school teacher with 5+ years in early childhood education. Strong background in curriculum development and classroom management.",
-                "status": "accepted",
-                "current_question_index": 2,
-                "is_completed": True,
-                "upk_eligible": True,
-                "teacher_eligible": True,
-                "substitute_eligible": True,
-                "shift_available": True,
-                "diaper_comfortable": True,
-                "started_at": datetime.now() - timedelta(days=5, hours=2),
-                "completed_at": datetime.now() - timedelta(days=5, hours=1, minutes=45),
-                "submitted_at": datetime.now() - timedelta(days=5, hours=3),
-                "work_experience_summary": "Elementary School Teacher at PS 123 (2019-2024), Assistant Teacher at Little Stars Daycare (2017-2019)",
-                "position_type": "Teacher Assistant",
-                "school_type": "Elementary School",
-                "question_by_user_to_hr": "Could you please provide information about the benefits package and vacation time for teacher assistants?",
-                "resume_comparison": {
-                    "similarity_score": 92,
-                    "overall_assessment": "Excellent match - extensive teaching experience aligns perfectly with interview responses",
-                    "matching_points": ["5+ years teaching experience confirmed", "Early childhood education background verified", "NYC location confirmed"],
-                    "discrepancies": [],
-                    "recommendation": "proceed",
-                    "confidence": 0.95,
-                    "analyzed_at": "2024-01-15T10:45:00"
-                },
-                "questions": [
-                    {
-                        "question_text": "Are you interested in moving forward with School Professionals?",
-                        "answer_text": "Yes, I'm very interested in substitute teaching opportunities.",
-                        "is_answered": True,
-                        "question_order": 1
-                    },
-                    {
-                        "question_text": "How did you hear about us?",
-                        "answer_text": "I found your posting on Indeed and was impressed by your work with charter schools.",
-                        "is_answered": True,
-                        "question_order": 2
-                    },
-                    {
-                        "question_text": "Are you able to commute & work in NYC?",
-                        "answer_text": "Yes, I live in Brooklyn and can easily commute to all five boroughs.",
-                        "is_answered": True,
-                        "question_order": 3
-                    }
-                ]
+def build_sample_registrations():
+    """Return the hand-written sample registrations (with nested questions)"""
+    return [
+        # Complete records with accepted status
+        {
+            "name": "Sarah Johnson",
+            "email": "sarah.johnson@email.com",
+            "registration_id": "REG001",
+            "session_token": "token_001",
+            "resume_extracted_text": "Experienced elementary school teacher with 5+ years in early childhood education...",
+            "resume_summary": "Experienced elementary school teacher with 5+ years in early childhood education. Strong background in curriculum development and classroom management.",
+            "status": "accepted",
+            "current_question_index": 2,
+            "is_completed": True,
+            "upk_eligible": True,
+            "teacher_eligible": True,
+            "substitute_eligible": True,
+            "shift_available": True,
+            "diaper_comfortable": True,
+            "started_at": datetime.now() - timedelta(days=5, hours=2),
+            "completed_at": datetime.now() - timedelta(days=5, hours=1, minutes=45),
+            "submitted_at": datetime.now() - timedelta(days=5, hours=3),
+            "work_experience_summary": "Elementary School Teacher at PS 123 (2019-2024), Assistant Teacher at Little Stars Daycare (2017-2019)",
+            "position_type": "Teacher Assistant",
+            "school_type": "Elementary School",
+            "question_by_user_to_hr": "Could you please provide information about the benefits package and vacation time for teacher assistants?",
+            "resume_comparison": {
+                "similarity_score": 92,
+                "overall_assessment": "Excellent match - extensive teaching experience aligns perfectly with interview responses",
+                "matching_points": ["5+ years teaching experience confirmed", "Early childhood education background verified", "NYC location confirmed"],
+                "discrepancies": [],
+                "recommendation": "proceed",
+                "confidence": 0.95,
+                "analyzed_at": "2024-01-15T10:45:00"
             },
-            {
-                "name": "Michael Chen",
-                "email": "michael.chen@email.com",
-                "registration_id": "REG002",
-                "session_token": "token_002",
-                "resume_extracted_text": "Recent college graduate with Bachelor's in Education...",
-                "resume_summary": "Recent college graduate with Bachelor's in Education. Completed student teaching at middle school level with focus on mathematics and science.",
-                "status": "rejected",
-                "current_question_index": 1,
-                "is_completed": False,
-                "upk_eligible": False,
-                "teacher_eligible": False,
-                "substitute_eligible": True,
-                "shift_available": True,
-                "diaper_comfortable": False,
-                "started_at": datetime.now() - timedelta(days=4, hours=1),
-                "completed_at": None,
-                "submitted_at": datetime.now() - timedelta(days=4, hours=2),
-                "work_experience_summary": "Student Teacher at Roosevelt Middle School (Fall 2023), Tutor at Kumon Learning Center (2022-2023)",
-                "position_type": "Substitute Teacher",
-                "school_type": "Public School",
-                "question_by_user_to_hr": "What is the typical daily schedule for substitute teachers, and are there opportunities for long-term assignments?",
-                "resume_comparison": {
-                    "similarity_score": 78,
-                    "overall_assessment": "Good potential - new graduate with relevant education background",
-                    "matching_points": ["Education degree confirmed", "Student teaching experience verified"],
-                    "discrepancies": ["Limited professional experience"],
-                    "recommendation": "proceed",
-                    "confidence": 0.8,
-                    "analyzed_at": "2024-01-16T14:30:00"
+            "questions": [
+                {
+                    "question_text": "Are you interested in moving forward with School Professionals?",
+                    "answer_text": "Yes, I'm very interested in substitute teaching opportunities.",
+                    "is_answered": True,
+                    "question_order": 1
                 },
-                "questions": [
-                    {
-                        "question_text": "Are you interested in moving forward with School Professionals?",
-                        "answer_text": "Absolutely! This would be a great opportunity to gain more classroom experience.",
-                        "is_answered": True,
-                        "question_order": 1
-                    },
-                    {
-                        "question_text": "How did you hear about us?",
-                        "answer_text": "My professor recommended your organization during our job placement seminar.",
-                        "is_answered": True,
-                        "question_order": 2
-                    }
-                ]
-            },
-            {
-                "name": "Emily Rodriguez",
-                "email": "emily.rodriguez@email.com",
-                "registration_id": "REG003",
-                "session_token": "token_003",
-                "resume_extracted_text": "Bilingual educator with 8+ years experience in UPK and Pre-K programs...",
-                "resume_summary": "Bilingual educator with 8+ years experience in UPK and Pre-K programs. Specializes in ESL instruction and early childhood development.",
-                "status": "accepted",
-                "current_question_index": 2,
-                "is_completed": True,
-                "upk_eligible": True,
-                "teacher_eligible": True,
-                "substitute_eligible": True,
-                "shift_available": True,
-                "diaper_comfortable": True,
-                "started_at": datetime.now() - timedelta(days=3, hours=1),
-                "completed_at": datetime.now() - timedelta(days=3, minutes=50),
-                "submitted_at": datetime.now() - timedelta(days=3, hours=2),
-                "work_experience_summary": "UPK Teacher at Bright Beginnings (2020-2024), Pre-K Teacher at Little Learners Academy (2016-2020)",
-                "position_type": "UPK Teacher",
-                "school_type": "UPK Program",
-                "resume_comparison": {
-                    "similarity_score": 96,
-                    "overall_assessment": "Perfect match - extensive UPK experience exactly matches role requirements",
-                    "matching_points": ["8+ years UPK experience confirmed", "Bilingual skills verified", "Early childhood specialization confirmed"],
-                    "discrepancies": [],
-                    "recommendation": "proceed",
-                    "confidence": 0.98,
-                    "analyzed_at": "2024-01-17T09:30:00"
+                {
+                    "question_text": "How did you hear about us?",
+                    "answer_text": "I found your posting on Indeed and was impressed by your work with charter schools.",
+                    "is_answered": True,
+                    "question_order": 2
                 },
-                "questions": [
-                    {
-                        "question_text": "Are you interested in moving forward with School Professionals?",
-                        "answer_text": "Yes, I'm very excited about UPK opportunities in NYC.",
-                        "is_answered": True,
-                        "question_order": 1
-                    },
-                    {
-                        "question_text": "Experience with students under age 5?",
-                        "answer_text": "Yes, I have 8 years of experience specifically with Pre-K and UPK students ages 3-5.",
-                        "is_answered": True,
-                        "question_order": 2
-                    },
-                    {
-                        "question_text": "Are you comfortable with diaper changes?",
-                        "answer_text": "Yes, absolutely. I've handled all aspects of early childhood care including diaper changes.",
-                        "is_answered": True,
-                        "question_order": 3
-                    }
-                ]
+                {
+                    "question_text": "Are you able to commute & work in NYC?",
+                    "answer_text": "Yes, I live in Brooklyn and can easily commute to all five boroughs.",
+                    "is_answered": True,
+                    "question_order": 3
+                }
+            ]
+        },
+        {
+            "name": "Michael Chen",
+            "email": "michael.chen@email.com",
+            "registration_id": "REG002",
+            "session_token": "token_002",
+            "resume_extracted_text": "Recent college graduate with Bachelor's in Education...",
+            "resume_summary": "Recent college graduate with Bachelor's in Education. Completed student teaching at middle school level with focus on mathematics and science.",
+            "status": "rejected",
+            "current_question_index": 1,
+            "is_completed": False,
+            "upk_eligible": False,
+            "teacher_eligible": False,
+            "substitute_eligible": True,
+            "shift_available": True,
+            "diaper_comfortable": False,
+            "started_at": datetime.now() - timedelta(days=4, hours=1),
+            "completed_at": None,
+            "submitted_at": datetime.now() - timedelta(days=4, hours=2),
+            "work_experience_summary": "Student Teacher at Roosevelt Middle School (Fall 2023), Tutor at Kumon Learning Center (2022-2023)",
+            "position_type": "Substitute Teacher",
+            "school_type": "Public School",
+            "question_by_user_to_hr": "What is the typical daily schedule for substitute teachers, and are there opportunities for long-term assignments?",
+            "resume_comparison": {
+                "similarity_score": 78,
+                "overall_assessment": "Good potential - new graduate with relevant education background",
+                "matching_points": ["Education degree confirmed", "Student teaching experience verified"],
+                "discrepancies": ["Limited professional experience"],
+                "recommendation": "proceed",
+                "confidence": 0.8,
+                "analyzed_at": "2024-01-16T14:30:00"
             },
-            {
-                "name": "David Thompson",
-                "email": "david.thompson@email.com",
-                "registration_id": "REG004",
-                "session_token": "token_004",
-                "resume_extracted_text": "High school mathematics teacher with 3 years experience...",
-                "resume_summary": "High school mathematics teacher with 3 years experience. Strong background in algebra and geometry instruction for grades 9-12.",
-                "status": "rejected",
-                "current_question_index": 1,
-                "is_completed": False,
-                "upk_eligible": False,
-                "teacher_eligible": True,
-                "substitute_eligible": True,
-                "shift_available": False,
-                "diaper_comfortable": False,
-                "started_at": datetime.now() - timedelta(days=2, hours=1),
-                "completed_at": None,
-                "submitted_at": datetime.now() - timedelta(days=2, hours=2),
-                "work_experience_summary": "Mathematics Teacher at Lincoln High School (2021-2024), Math Tutor at Sylvan Learning (2020-2021)",
-                "position_type": "Teacher",
-                "school_type": "Transfer School",
-                "resume_comparison": {
-                    "similarity_score": 65,
-                    "overall_assessment": "Limited match - high school focus may not align with all position requirements",
-                    "matching_points": ["Teaching experience confirmed", "Subject matter expertise verified"],
-                    "discrepancies": ["No early childhood experience", "Limited availability mentioned"],
-                    "recommendation": "hold",
-                    "confidence": 0.7,
-                    "analyzed_at": "2024-01-18T16:55:00"
+            "questions": [
+                {
+                    "question_text": "Are you interested in moving forward with School Professionals?",
+                    "answer_text": "Absolutely! This would be a great opportunity to gain more classroom experience.",
+                    "is_answered": True,
+                    "question_order": 1
                 },
-                "questions": [
-                    {
-                        "question_text": "Are you interested in moving forward with School Professionals?",
-                        "answer_text": "Yes, I'm looking for substitute opportunities while I search for a permanent position.",
-                        "is_answered": True,
-                        "question_order": 1
-                    },
-                    {
-                        "question_text": "Experience with students under age 5?",
-                        "answer_text": "No, my experience is primarily with high school students aged 14-18.",
-                        "is_answered": True,
-                        "question_order": 2
-                    }
-                ]
+                {
+                    "question_text": "How did you hear about us?",
+                    "answer_text": "My professor recommended your organization during our job placement seminar.",
+                    "is_answered": True,
+                    "question_order": 2
+                }
+            ]
+        },
+        {
+            "name": "Emily Rodriguez",
+            "email": "emily.rodriguez@email.com",
+            "registration_id": "REG003",
+            "session_token": "token_003",
+            "resume_extracted_text": "Bilingual educator with 8+ years experience in UPK and Pre-K programs...",
+            "resume_summary": "Bilingual educator with 8+ years experience in UPK and Pre-K programs. Specializes in ESL instruction and early childhood development.",
+            "status": "accepted",
+            "current_question_index": 2,
+            "is_completed": True,
+            "upk_eligible": True,
+            "teacher_eligible": True,
+            "substitute_eligible": True,
+            "shift_available": True,
+            "diaper_comfortable": True,
+            "started_at": datetime.now() - timedelta(days=3, hours=1),
+            "completed_at": datetime.now() - timedelta(days=3, minutes=50),
+            "submitted_at": datetime.now() - timedelta(days=3, hours=2),
+            "work_experience_summary": "UPK Teacher at Bright Beginnings (2020-2024), Pre-K Teacher at Little Learners Academy (2016-2020)",
+            "position_type": "UPK Teacher",
+            "school_type": "UPK Program",
+            "resume_comparison": {
+                "similarity_score": 96,
+                "overall_assessment": "Perfect match - extensive UPK experience exactly matches role requirements",
+                "matching_points": ["8+ years UPK experience confirmed", "Bilingual skills verified", "Early childhood specialization confirmed"],
+                "discrepancies": [],
+                "recommendation": "proceed",
+                "confidence": 0.98,
+                "analyzed_at": "2024-01-17T09:30:00"
             },
-            # Minimal records with only basic information
-            {
-                "name": "John Smith",
-                "email": "john.smith@email.com",
-                "registration_id": "REG006",
-                "resume_extracted_text": "Resume not provided",
-                "resume_summary": "No resume summary available",
-                "status": "not attempted"
+            "questions": [
+                {
+                    "question_text": "Are you interested in moving forward with School Professionals?",
+                    "answer_text": "Yes, I'm very excited about UPK opportunities in NYC.",
+                    "is_answered": True,
+                    "question_order": 1
+                },
+                {
+                    "question_text": "Experience with students under age 5?",
+                    "answer_text": "Yes, I have 8 years of experience specifically with Pre-K and UPK students ages 3-5.",
+                    "is_answered": True,
+                    "question_order": 2
+                },
+                {
+                    "question_text": "Are you comfortable with diaper changes?",
+                    "answer_text": "Yes, absolutely. I've handled all aspects of early childhood care including diaper changes.",
+                    "is_answered": True,
+                    "question_order": 3
+                }
+            ]
+        },
+        {
+            "name": "David Thompson",
+            "email": "david.thompson@email.com",
+            "registration_id": "REG004",
+            "session_token": "token_004",
+            "resume_extracted_text": "High school mathematics teacher with 3 years experience...",
+            "resume_summary": "High school mathematics teacher with 3 years experience. Strong background in algebra and geometry instruction for grades 9-12.",
+            "status": "rejected",
+            "current_question_index": 1,
+            "is_completed": False,
+            "upk_eligible": False,
+            "teacher_eligible": True,
+            "substitute_eligible": True,
+            "shift_available": False,
+            "diaper_comfortable": False,
+            "started_at": datetime.now() - timedelta(days=2, hours=1),
+            "completed_at": None,
+            "submitted_at": datetime.now() - timedelta(days=2, hours=2),
+            "work_experience_summary": "Mathematics Teacher at Lincoln High School (2021-2024), Math Tutor at Sylvan Learning (2020-2021)",
+            "position_type": "Teacher",
+            "school_type": "Transfer School",
+            "resume_comparison": {
+                "similarity_score": 65,
+                "overall_assessment": "Limited match - high school focus may not align with all position requirements",
+                "matching_points": ["Teaching experience confirmed", "Subject matter expertise verified"],
+                "discrepancies": ["No early childhood experience", "Limited availability mentioned"],
+                "recommendation": "hold",
+                "confidence": 0.7,
+                "analyzed_at": "2024-01-18T16:55:00"
             },
-            {
-                "name": "Maria Garcia",
-                "email": "maria.garcia@email.com", 
-                "registration_id": "REG007",
-                "resume_extracted_text": "Resume not provided",
-                "resume_summary": "No resume summary available",
-                "status": "not attempted"
-            }
-        ]
+            "questions": [
+                {
+                    "question_text": "Are you interested in moving forward with School Professionals?",
+                    "answer_text": "Yes, I'm looking for substitute opportunities while I search for a permanent position.",
+                    "is_answered": True,
+                    "question_order": 1
+                },
+                {
+                    "question_text": "Experience with students under age 5?",
+                    "answer_text": "No, my experience is primarily with high school students aged 14-18.",
+                    "is_answered": True,
+                    "question_order": 2
+                }
+            ]
+        },
+        # Minimal records with only basic information
+        {
+            "name": "John Smith",
+            "email": "john.smith@email.com",
+            "registration_id": "REG006",
+            "resume_extracted_text": "Resume not provided",
+            "resume_summary": "No resume summary available",
+            "status": "not attempted"
+        },
+        {
+            "name": "Maria Garcia",
+            "email": "maria.garcia@email.com", 
+            "registration_id": "REG007",
+            "resume_extracted_text": "Resume not provided",
+            "resume_summary": "No resume summary available",
+            "status": "not attempted"
+        }
+    ]
+    
+
+
+def seed_sample_data(sample_registrations=None):
+    """Seed the database with sample interview registration data
+
+    This is the original per-row path (one flush per registration); it is kept
+    for small seeds and as a baseline for `bulk_seed`.
+    """
+    if sample_registrations is None:
+        sample_registrations = build_sample_registrations()
+    db = SessionLocal()
+    
+    try:
+        # Clear existing data
+        db.query(QuestionAnswer).delete()
+        db.query(InterviewRegistration).delete()
+        db.commit()
         
+        start = time.perf_counter()
+        answer_count = 0
+
         # Create registrations and their question answers
         for reg_data in sample_registrations:
             questions_data = reg_data.pop('questions', [])  # Default to empty list if no questions
@@ -266,9 +282,11 @@ def seed_sample_data():
                     **q_data
                 )
                 db.add(question_answer)
+                answer_count += 1
         
         db.commit()
         print(f"Successfully seeded {len(sample_registrations)} interview registrations with their question answers!")
+        _report("Per-row seed", len(sample_registrations), answer_count, time.perf_counter() - start)
         
     except Exception as e:
         db.rollback()
@@ -277,5 +295,169 @@ def seed_sample_data():
     finally:
         db.close()
 
+
+def generate_synthetic_registrations(count, answers_per_candidate=3, seed=42, start_index=1):
+    """Yield `count` synthetic registrations built from the sample templates.
+
+    Every template is used in turn, including the minimal "not attempted"
+    records (no token, timestamps, answers or comparison), so the status mix
+    matches the samples. Every yielded dict has the same keys so batches can
+    be sent as a single executemany; nested "questions" are popped off by
+    the caller.
+    """
+    rng = random.Random(seed)
+    templates = build_sample_registrations()
+    question_pool = [q for t in templates for q in t.get("questions", [])]
+    first_names = [t["name"].split()[0] for t in templates]
+    last_names = [t["name"].split()[-1] for t in templates]
+    now = datetime.now()
+
+    for n in range(start_index, start_index + count):
+        template = templates[n % len(templates)]
+        attempted = bool(template.get("questions"))
+        first, last = rng.choice(first_names), rng.choice(last_names)
+        submitted_at = now - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1440))
+        started_at = submitted_at + timedelta(hours=1) if attempted else None
+        is_completed = template.get("is_completed", False)
+        comparison = template.get("resume_comparison")
+        questions = []
+        for order in range(1, answers_per_candidate + 1 if attempted else 1):
+            q = question_pool[(n + order) % len(question_pool)]
+            questions.append({
+                "question_text": q["question_text"],
+                "answer_text": q["answer_text"],
+                "is_answered": True,
+                "question_order": order,
+            })
+        yield {
+            "name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}.{n}@example.com",
+            "registration_id": f"SYN{n:07d}",
+            "session_token": f"syn_token_{n}" if attempted else None,
+            "resume_extracted_text": template["resume_extracted_text"],
+            "resume_summary": template["resume_summary"],
+            "status": template["status"],
+            "current_question_index": template.get("current_question_index", 0),
+            "is_completed": is_completed,
+            "upk_eligible": template.get("upk_eligible"),
+            "teacher_eligible": template.get("teacher_eligible"),
+            "substitute_eligible": template.get("substitute_eligible"),
+            "shift_available": template.get("shift_available"),
+            "diaper_comfortable": template.get("diaper_comfortable"),
+            "started_at": started_at,
+            "completed_at": started_at + timedelta(minutes=rng.randint(10, 45)) if is_completed else None,
+            "submitted_at": submitted_at,
+            "work_experience_summary": template.get("work_experience_summary"),
+            "position_type": template.get("position_type"),
+            "school_type": template.get("school_type"),
+            "question_by_user_to_hr": template.get("question_by_user_to_hr"),
+            "resume_comparison": dict(comparison, similarity_score=rng.randint(40, 99)) if comparison else None,
+            "questions": questions,
+        }
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _copy_question_answers(conn, rows):
+    """Load question answers with COPY FROM STDIN (psycopg2 only)"""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in rows:
+        writer.writerow([row[c] for c in QUESTION_ANSWER_COLUMNS])
+    buf.seek(0)
+    cursor = conn.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {QuestionAnswer.__tablename__} ({', '.join(QUESTION_ANSWER_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+    finally:
+        cursor.close()
+
+
+def _report(label, registrations, answers, elapsed):
+    elapsed = max(elapsed, 1e-9)
+    print(
+        f"{label}: {registrations} registrations + {answers} answers in {elapsed:.2f}s "
+        f"({registrations / elapsed:,.0f} registrations/sec, {(registrations + answers) / elapsed:,.0f} rows/sec)"
+    )
+
+
+def clear_data():
+    """Remove all question answers and registrations"""
+    with get_engine().begin() as conn:
+        conn.execute(delete(QuestionAnswer.__table__))
+        conn.execute(delete(InterviewRegistration.__table__))
+
+
+def bulk_seed(registrations, batch_size=1000, use_copy=False):
+    """Insert registrations in batches using INSERT ... RETURNING id.
+
+    Each batch is a single executemany for the registrations (ids come back
+    in parameter order) followed by one bulk insert, or COPY, of the answers.
+    Returns (registrations, answers) row counts.
+    """
+    reg_table = InterviewRegistration.__table__
+    qa_table = QuestionAnswer.__table__
+    insert_registrations = insert(reg_table).returning(reg_table.c.id, sort_by_parameter_order=True)
+    engine = get_engine()
+    total_registrations = total_answers = 0
+    start = time.perf_counter()
+
+    for batch in _batched(registrations, batch_size):
+        questions = [reg.pop("questions", []) for reg in batch]
+        with engine.begin() as conn:
+            ids = conn.execute(insert_registrations, batch).scalars().all()
+            answers = [
+                {"registration_id": reg_id, **q}
+                for reg_id, qs in zip(ids, questions)
+                for q in qs
+            ]
+            if answers:
+                if use_copy:
+                    _copy_question_answers(conn, answers)
+                else:
+                    conn.execute(insert(qa_table), answers)
+        total_registrations += len(batch)
+        total_answers += len(answers)
+        elapsed = time.perf_counter() - start
+        print(f"  ... {total_registrations} registrations ({total_registrations / max(elapsed, 1e-9):,.0f}/sec)")
+
+    _report("Bulk seed", total_registrations, total_answers, time.perf_counter() - start)
+    return total_registrations, total_answers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed interview registrations")
+    parser.add_argument("--count", type=int, default=0,
+                        help="number of synthetic registrations (default: seed the hand-written samples)")
+    parser.add_argument("--answers", type=int, default=3, help="question answers per synthetic candidate")
+    parser.add_argument("--mode", choices=("bulk", "per-row"), default="bulk",
+                        help="insert path used for synthetic data")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--copy", action="store_true", help="load question answers with COPY (PostgreSQL)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed for the synthetic generator")
+    args = parser.parse_args(argv)
+
+    if not args.count:
+        seed_sample_data()
+        return
+
+    registrations = generate_synthetic_registrations(args.count, args.answers, seed=args.seed)
+    if args.mode == "per-row":
+        seed_sample_data(list(registrations))
+    else:
+        clear_data()
+        bulk_seed(registrations, batch_size=args.batch_size, use_copy=args.copy)
+
+
 if __name__ == "__main__":
-    seed_sample_data()
+    main()
@@ -2,7 +2,7 @@ import sys
 import os
 from sqlalchemy import text
 from sqlalchemy.orm import Session
-import hashlib
+import argparse
 
 # Ensure project root is on path so app.* imports work
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -11,40 +11,22 @@ if PROJECT_ROOT not in sys.path:
     sys.path.append(PROJECT_ROOT)
 
 from app.models.user import User
-from app.db.postgres.database import sync_session
+from db_engine import sync_session
+from bulk_import_users import import_users, iter_user_rows
 
-def hash_password(password):
-    """Simple password hashing for demo purposes"""
-    return hashlib.sha256(password.encode()).hexdigest()
-
-def main():
+def main(users_file=None, batch_size=5000, method="executemany"):
     try:
         print("Seeding users table...")
         db: Session = sync_session()
         
-        # Inspect actual column names to decide identifiers
-        cols = {row[0] for row in db.execute(text("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'users'
-        """))}
-        
-        def ident(logical_name: str) -> str:
-            # Prefer exact match (quoted if mixed case), else lowercase
-            if logical_name in cols:
-                return f'"{logical_name}"'
-            lower = logical_name.lower()
-            if lower in cols:
-                return lower
-            raise RuntimeError(f"Column {logical_name} not found in users table. Available: {cols}")
-        
-        # Create sample users
+        # Create sample users (plain-text passwords are hashed by import_users)
         users_data = [
             # Admin users
             {
                 "userid": 1,
                 "name": "Admin User",
-                "password": hash_password("admin123"),
+                "password": None,
+                "plain_password": "admin123",
                 "emailid": "admin@company.com",
                 "isadmin": True,
                 "islogin": False
@@ -52,7 +34,8 @@ def main():
             {
                 "userid": 2,
                 "name": "HR Manager",
-                "password": hash_password("hr123"),
+                "password": None,
+                "plain_password": "hr123",
                 "emailid": "hr@company.com",
                 "isadmin": True,
                 "islogin": False
@@ -61,7 +44,8 @@ def main():
             {
                 "userid": 3,
                 "name": "John Doe",
-                "password": hash_password("user123"),
+                "password": None,
+                "plain_password": "user123",
                 "emailid": "john.doe@email.com",
                 "isadmin": False,
                 "islogin": False
@@ -69,7 +53,8 @@ def main():
             {
                 "userid": 4,
                 "name": "Jane Smith",
-                "password": hash_password("user123"),
+                "password": None,
+                "plain_password": "user123",
                 "emailid": "jane.smith@email.com",
                 "isadmin": False,
                 "islogin": False
@@ -77,30 +62,21 @@ def main():
             {
                 "userid": 5,
                 "name": "Mike Johnson",
-                "password": hash_password("user123"),
+                "password": None,
+                "plain_password": "user123",
                 "emailid": "mike.johnson@email.com",
                 "isadmin": False,
                 "islogin": False
             }
         ]
         
-        # Clear existing rows and insert using detected identifiers
-        col_id = ident('UserId')
-        col_name = ident('Name')
-        col_pass = ident('Password')
-        col_email = ident('EmailId')
-        col_isadmin = ident('IsAdmin')
-        col_islogin = ident('IsLogin')
-
-        insert_sql = text(
-            f"INSERT INTO users ({col_id}, {col_name}, {col_pass}, {col_email}, {col_isadmin}, {col_islogin})\n"
-            "VALUES (:userid, :name, :password, :emailid, :isadmin, :islogin)"
-        )
-
+        # Clear existing rows and insert in batches using detected identifiers
         try:
-            db.execute(text("DELETE FROM users"))
-            for u in users_data:
-                db.execute(insert_sql, u)
+            conn = db.connection()
+            conn.execute(text("DELETE FROM users"))
+            import_users(conn, users_data)
+            if users_file:
+                import_users(conn, iter_user_rows(users_file), batch_size=batch_size, method=method)
             db.commit()
         except Exception:
             db.rollback()
@@ -130,4 +106,9 @@ def main():
             pass
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Seed the users table")
+    parser.add_argument("users_file", nargs="?", help="optional CSV/JSONL file of extra users to import")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--method", choices=("executemany", "copy"), default="executemany")
+    args = parser.parse_args()
+    main(args.users_file, args.batch_size, args.method)
@@ -0,0 +1,289 @@
+"""
+Session token -> registration snapshot cache.
+
+Every candidate request and WebSocket turn resolves
+InterviewRegistration.session_token to its registration. SessionTokenCache
+keeps a compact snapshot per token in an LRU with a TTL, so only the first
+lookup (and the first one after a status/completion change) goes to the
+database.
+
+The storage is pluggable:
+  InProcessBackend   per-process LRU dict (default, single worker)
+  RedisBackend       shared across uvicorn workers (needs the redis package);
+                     aget() goes through its redis.asyncio client, so a lookup
+                     never blocks the event loop on a round trip
+
+Invalidation: install_invalidation_hooks() evicts tokens once the ORM
+commits an update of status / is_completed / session_token (bulk updates
+register through invalidate_on_commit()), and on_write_behind_flush can
+be passed to AnswerWriteBehind(on_flush=...) for its Core updates.
+
+    cache = SessionTokenCache()
+    snapshot = await cache.aget(token)      # or cache.get(token) on sync paths
+"""
+import os
+import sys
+import json
+import time
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+from sqlalchemy import select, event, inspect
+from sqlalchemy.orm import Session
+
+# Ensure project root is on path so app.* imports work
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+if CURRENT_DIR not in sys.path:
+    sys.path.append(CURRENT_DIR)
+
+from app.models.interview_registration import InterviewRegistration
+
+INVALIDATING_FIELDS = ("status", "is_completed", "session_token")
+PENDING_KEY = "session_cache_invalidations"
+PENDING_REGISTRATIONS_KEY = "session_cache_registration_invalidations"
+
+
+class RegistrationSnapshot(NamedTuple):
+    id: int
+    registration_id: str
+    name: str
+    email: str
+    status: Optional[str]
+    is_completed: Optional[bool]
+    position_type: Optional[str]
+
+
+SNAPSHOT_COLUMNS = RegistrationSnapshot._fields
+
+
+class InProcessBackend:
+    """Thread-safe LRU dict with per-entry expiry"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    # No I/O: the async variants just call the sync ones
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, value, ttl):
+        self.set(key, value, ttl)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisBackend:
+    """Shared backend for multi-worker deployments; values are stored as JSON"""
+
+    def __init__(self, url=None, prefix="session:"):
+        import redis
+        import redis.asyncio
+
+        url = url or os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        self.client = redis.Redis.from_url(url)
+        self.async_client = redis.asyncio.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+    async def aget(self, key):
+        raw = await self.async_client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def aset(self, key, value, ttl):
+        await self.async_client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+
+class SessionTokenCache:
+    def __init__(self, backend=None, ttl=None):
+        # not `backend or ...`: an empty InProcessBackend is falsy (__len__)
+        self.backend = backend if backend is not None else InProcessBackend()
+        self.ttl = ttl or float(os.getenv("SESSION_CACHE_TTL", 300))
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def _query(token):
+        reg = InterviewRegistration.__table__
+        return select(*(reg.c[name] for name in SNAPSHOT_COLUMNS)).where(reg.c.session_token == token)
+
+    def _snapshot(self, value):
+        if value is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return RegistrationSnapshot(*value)
+
+    def _cached(self, token):
+        return self._snapshot(self.backend.get(f"token:{token}"))
+
+    async def _acached(self, token):
+        return self._snapshot(await self.backend.aget(f"token:{token}"))
+
+    def _entries(self, token, row):
+        """The backend entries for a looked-up row: [(key, value)], empty for unknown tokens"""
+        if row is None:
+            return []
+        snapshot = RegistrationSnapshot(*row)
+        # Lists round-trip through JSON backends; the reverse key lets
+        # invalidate_registrations() find the token from a registration id
+        return [(f"token:{token}", list(snapshot)), (f"registration:{snapshot.id}", token)]
+
+    def _store(self, token, row):
+        for key, value in self._entries(token, row):
+            self.backend.set(key, value, self.ttl)
+        return RegistrationSnapshot(*row) if row is not None else None
+
+    async def _astore(self, token, row):
+        for key, value in self._entries(token, row):
+            await self.backend.aset(key, value, self.ttl)
+        return RegistrationSnapshot(*row) if row is not None else None
+
+    def get(self, token, session_factory=None):
+        """Resolve a token on a sync path; returns None for unknown tokens"""
+        snapshot = self._cached(token)
+        if snapshot is not None:
+            return snapshot
+        if session_factory is None:
+            from db_engine import sync_session as session_factory
+        with session_factory() as session:
+            return self._store(token, session.execute(self._query(token)).first())
+
+    async def aget(self, token, session_factory=None):
+        """Resolve a token on the async request path; uses the backend's aget/aset"""
+        snapshot = await self._acached(token)
+        if snapshot is not None:
+            return snapshot
+        if session_factory is None:
+            from db_engine import async_session as session_factory
+        async with session_factory() as session:
+            row = (await session.execute(self._query(token))).first()
+        return await self._astore(token, row)
+
+    def invalidate(self, token):
+        if token:
+            self.backend.delete(f"token:{token}")
+            self._count("invalidations")
+
+    def invalidate_registrations(self, registration_ids):
+        for registration_id in registration_ids:
+            key = f"registration:{registration_id}"
+            token = self.backend.get(key)
+            if token is not None:
+                self.invalidate(token)
+                self.backend.delete(key)
+
+    def on_write_behind_flush(self, changed_fields):
+        """AnswerWriteBehind on_flush hook: {registration_id: {field: value}}"""
+        self.invalidate_registrations(
+            rid for rid, fields in changed_fields.items() if any(f in fields for f in INVALIDATING_FIELDS)
+        )
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        if isinstance(self.backend, InProcessBackend):
+            stats["entries"] = len(self.backend)
+        return stats
+
+
+def invalidate_on_commit(session, registration_ids, fields=INVALIDATING_FIELDS):
+    """Evict these registrations once `session` commits, for Core/bulk updates the mapper events miss.
+
+    Only acts when `fields` includes a cached field; needs install_invalidation_hooks().
+    """
+    if any(field in INVALIDATING_FIELDS for field in fields):
+        session.info.setdefault(PENDING_REGISTRATIONS_KEY, set()).update(registration_ids)
+
+
+def install_invalidation_hooks(cache):
+    """Invalidate cached snapshots when the ORM commits a status/completion/token change.
+
+    The mapper events fire at flush, inside the transaction: invalidating
+    there would let a concurrent lookup re-cache the old row before the
+    commit (or evict for a change that is rolled back). They only collect
+    the tokens on session.info; after_commit invalidates them and a
+    rollback of the outermost transaction discards them.
+    """
+
+    def _pending(target):
+        session = inspect(target).session
+        return session.info.setdefault(PENDING_KEY, set()) if session is not None else None
+
+    @event.listens_for(InterviewRegistration, "after_update")
+    def _after_update(mapper, connection, target):
+        state = inspect(target)
+        changed = [name for name in INVALIDATING_FIELDS if state.attrs[name].history.has_changes()]
+        pending = _pending(target)
+        if not changed or pending is None:
+            return
+        pending.add(target.session_token)
+        pending.update(state.attrs["session_token"].history.deleted)
+
+    @event.listens_for(InterviewRegistration, "after_delete")
+    def _after_delete(mapper, connection, target):
+        pending = _pending(target)
+        if pending is not None:
+            pending.add(target.session_token)
+
+    @event.listens_for(Session, "after_commit")
+    def _after_commit(session):
+        for token in session.info.pop(PENDING_KEY, ()):
+            cache.invalidate(token)
+        cache.invalidate_registrations(session.info.pop(PENDING_REGISTRATIONS_KEY, ()))
+
+    @event.listens_for(Session, "after_soft_rollback")
+    def _after_rollback(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(PENDING_KEY, None)
+            session.info.pop(PENDING_REGISTRATIONS_KEY, None)
+
+    return _after_update, _after_delete, _after_commit, _after_rollback
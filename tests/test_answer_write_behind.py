@@ -0,0 +1,140 @@
+import os
+import glob
+import json
+import asyncio
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("app.models.interview_registration")
+
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+import answer_write_behind
+from answer_write_behind import AnswerWriteBehind, LOCK_FILE, _try_lock
+from app.models.interview_registration import InterviewRegistration
+from app.models.question_answer import QuestionAnswer
+
+
+@pytest.fixture
+def database(tmp_path):
+    """An async SQLite database with registrations 1 and 2; yields a session factory"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(InterviewRegistration.metadata.create_all,
+                                tables=[InterviewRegistration.__table__, QuestionAnswer.__table__])
+            await conn.execute(insert(InterviewRegistration.__table__),
+                               [{"id": 1, "registration_id": "r1", "name": "A", "email": "a@example.com"},
+                                {"id": 2, "registration_id": "r2", "name": "B", "email": "b@example.com"}])
+
+    asyncio.run(setup())
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+def fetch(session_factory):
+    async def query():
+        async with session_factory() as session:
+            qa, reg = QuestionAnswer.__table__, InterviewRegistration.__table__
+            answers = (await session.execute(
+                select(qa.c.registration_id, qa.c.question_order, qa.c.answer_text).order_by(qa.c.id)
+            )).all()
+            progress = dict((await session.execute(select(reg.c.id, reg.c.current_question_index))).all())
+            return answers, progress
+
+    return asyncio.run(query())
+
+
+def write_orphan(journal_dir, name, lines):
+    directory = os.path.join(journal_dir, name)
+    os.makedirs(directory)
+    open(os.path.join(directory, LOCK_FILE), "w").close()
+    with open(os.path.join(directory, "segment-000000000001.jsonl"), "w", encoding="utf-8") as f:
+        f.write("".join(lines))
+    return directory
+
+
+def test_orphaned_journal_is_replayed_and_removed(tmp_path, database):
+    journal_dir = str(tmp_path / "journal")
+    orphan = write_orphan(journal_dir, "123-dead", [
+        json.dumps({"registration_id": 1, "question_order": 1, "answer_text": "yes",
+                    "fields": {"current_question_index": 1}}) + "\n",
+        # a later value for the same answer replaces the earlier one
+        json.dumps({"registration_id": 1, "question_order": 1, "answer_text": "no",
+                    "fields": {"current_question_index": 2}}) + "\n",
+        json.dumps({"registration_id": 2, "question_order": 1, "answer_text": "sure",
+                    "fields": {"current_question_index": 1}}) + "\n",
+        '{"registration_id": 2, "question_or',  # torn write from the crash
+    ])
+
+    async def run():
+        buffer = AnswerWriteBehind(session_factory=database, journal_dir=journal_dir, fsync=False)
+        await buffer.start()
+        await buffer.stop()
+        return buffer.stats
+
+    stats = asyncio.run(run())
+    answers, progress = fetch(database)
+    assert sorted(answers) == [(1, 1, "no"), (2, 1, "sure")]
+    assert progress == {1: 2, 2: 1}
+    assert stats["flushes"] == 1
+    assert not os.path.exists(orphan)
+
+
+def test_running_process_journal_is_left_alone_until_it_is_gone(tmp_path, database):
+    journal_dir = str(tmp_path / "journal")
+
+    async def run():
+        running = AnswerWriteBehind(session_factory=database, journal_dir=journal_dir, fsync=False,
+                                    flush_interval=3600)
+        await running.start()
+        await running.record_answer(1, 1, "yes", current_question_index=1)
+
+        other = AnswerWriteBehind(session_factory=database, journal_dir=journal_dir, fsync=False)
+        await other.start()
+        adopted_while_running = other.metrics()["rows_written"]
+        await other.stop()
+
+        # "crash": drop the process's files and lock without flushing
+        running._task.cancel()
+        running._journal.close()
+        running._owner_lock.close()
+
+        survivor = AnswerWriteBehind(session_factory=database, journal_dir=journal_dir, fsync=False)
+        await survivor.start()
+        await survivor.stop()
+        return adopted_while_running
+
+    assert asyncio.run(run()) == 0
+    answers, progress = fetch(database)
+    assert answers == [(1, 1, "yes")]
+    assert progress[1] == 1
+    assert glob.glob(os.path.join(journal_dir, "*", "")) == []
+
+
+def test_journal_directory_is_locked_once_visible(tmp_path, database):
+    journal_dir = str(tmp_path / "journal")
+
+    async def run():
+        buffer = AnswerWriteBehind(session_factory=database, journal_dir=journal_dir, fsync=False)
+        await buffer.start()
+        try:
+            visible = glob.glob(os.path.join(journal_dir, "*", LOCK_FILE))
+            assert visible == [os.path.join(buffer._directory, LOCK_FILE)]
+            assert _try_lock(visible[0]) is None
+            assert [name for name in os.listdir(journal_dir) if name.startswith(".")] == []
+        finally:
+            await buffer.stop()
+
+    asyncio.run(run())
+
+
+def test_start_fails_when_the_journal_cannot_be_locked(tmp_path, database, monkeypatch):
+    monkeypatch.setattr(answer_write_behind, "_try_lock", lambda path: None)
+    buffer = AnswerWriteBehind(session_factory=database, journal_dir=str(tmp_path / "journal"), fsync=False)
+    with pytest.raises(RuntimeError, match="Could not lock"):
+        asyncio.run(buffer.start())
+    assert glob.glob(os.path.join(tmp_path, "journal", ".*", "")) == []
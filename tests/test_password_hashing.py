@@ -0,0 +1,57 @@
+import hashlib
+
+import pytest
+from passlib.context import CryptContext
+
+import password_hashing
+
+
+@pytest.fixture(autouse=True)
+def configured(monkeypatch):
+    """pbkdf2_sha256 at a low cost, with a fresh context cache"""
+    monkeypatch.setattr(password_hashing, "DEFAULT_SCHEME", "pbkdf2_sha256")
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "2000")
+    monkeypatch.setattr(password_hashing, "_contexts", {})
+
+
+def test_current_hash_verifies_without_update():
+    hashed = password_hashing.hash_password("secret")
+    assert password_hashing.verify_and_update("secret", hashed) == (True, None)
+    assert password_hashing.verify_and_update("wrong", hashed) == (False, None)
+
+
+def test_legacy_sha256_is_upgraded():
+    legacy = hashlib.sha256(b"secret").hexdigest()
+    ok, new_hash = password_hashing.verify_and_update("secret", legacy)
+    assert ok and new_hash.startswith("$pbkdf2-sha256$2000$")
+    assert password_hashing.verify_and_update("wrong", legacy) == (False, None)
+
+
+def test_lower_cost_is_rehashed():
+    cheap = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=1000).hash("secret")
+    ok, new_hash = password_hashing.verify_and_update("secret", cheap)
+    assert ok and new_hash.startswith("$pbkdf2-sha256$2000$")
+
+
+def test_other_accepted_scheme_verifies_and_is_rehashed():
+    pytest.importorskip("bcrypt")
+    bcrypt_hash = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=4).hash("secret")
+    ok, new_hash = password_hashing.verify_and_update("secret", bcrypt_hash)
+    assert ok and new_hash.startswith("$pbkdf2-sha256$")
+    assert password_hashing.verify_and_update("wrong", bcrypt_hash) == (False, None)
+
+
+def test_switching_scheme_keeps_old_hashes_valid(monkeypatch):
+    pytest.importorskip("bcrypt")
+    old = password_hashing.hash_password("secret")
+    monkeypatch.setattr(password_hashing, "DEFAULT_SCHEME", "bcrypt")
+    monkeypatch.setenv("PASSWORD_HASH_ROUNDS", "4")
+    ok, new_hash = password_hashing.verify_and_update("secret", old)
+    assert ok and new_hash.startswith("$2b$04$")
+
+
+@pytest.mark.parametrize("stored", [None, "", "not-a-hash"])
+def test_missing_or_unknown_hash_is_rejected(stored):
+    assert not password_hashing.is_legacy_hash(stored)
+    assert password_hashing.verify_and_update("secret", stored) == (False, None)
+    assert password_hashing.verify_password("secret", stored) is False
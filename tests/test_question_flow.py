@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from question_flow import DEFAULT_FLOW, END, NO, OTHER, YES, CompiledFlow, classify_answer, load_flow
+
+
+def walk(flow, answers):
+    """Answer the flow from the start; returns the steps taken"""
+    steps, index = [], 0
+    for answer in answers:
+        step = flow.advance(index, answer)
+        steps.append(step)
+        index = step.next_index
+    return steps
+
+
+@pytest.mark.parametrize("text, outcome", [
+    ("Yes, absolutely", YES),
+    ("yeah I think so", YES),
+    ("No", NO),
+    ("I don't have that", NO),
+    ("Well, not really", NO),
+    ("Through a friend", OTHER),
+    ("", OTHER),
+    (None, OTHER),
+    # only the first words count
+    ("I have been teaching for many years yes", OTHER),
+])
+def test_classify_answer(text, outcome):
+    assert classify_answer(text) == outcome
+
+
+def test_yes_branch_sets_flags_and_moves_on():
+    step = DEFAULT_FLOW.advance(DEFAULT_FLOW.index["under_5"], "Yes, for two years")
+    assert step.next_index == DEFAULT_FLOW.index["diapers"]
+    assert step.updates == (("upk_eligible", True),)
+    assert not step.completed
+    assert step.next_question == DEFAULT_FLOW.question(step.next_index)
+
+
+def test_no_branch_skips_questions():
+    step = DEFAULT_FLOW.advance(DEFAULT_FLOW.index["under_5"], "No")
+    assert step.next_index == DEFAULT_FLOW.index["shifts"]
+    assert dict(step.updates) == {"upk_eligible": False, "diaper_comfortable": False}
+
+
+def test_open_question_takes_any_answer():
+    step = DEFAULT_FLOW.advance(DEFAULT_FLOW.index["heard_about"], "No idea, a flyer maybe")
+    assert step.next_index == DEFAULT_FLOW.index["commute"]
+    assert step.updates == ()
+
+
+def test_unclear_yes_no_answer_repeats_the_question():
+    index = DEFAULT_FLOW.index["commute"]
+    step = DEFAULT_FLOW.advance(index, "It depends on the borough")
+    assert (step.next_index, step.updates, step.completed) == (index, (), False)
+
+
+def test_declining_ends_the_interview():
+    step = DEFAULT_FLOW.advance(0, "No thanks")
+    assert step.completed and step.next_index == len(DEFAULT_FLOW)
+    assert step.next_question is None
+
+
+def test_full_interview_collects_every_flag():
+    steps = walk(DEFAULT_FLOW, ["yes", "online", "yes", "yes", "no", "yes", "no", "yes"])
+    assert [s.completed for s in steps] == [False] * 7 + [True]
+    updates = dict(u for s in steps for u in s.updates)
+    assert updates == {"upk_eligible": True, "diaper_comfortable": False, "shift_available": True,
+                       "teacher_eligible": False, "substitute_eligible": True}
+
+
+def test_index_outside_the_flow_is_rejected():
+    with pytest.raises(IndexError):
+        DEFAULT_FLOW.advance(len(DEFAULT_FLOW), "yes")
+    with pytest.raises(IndexError):
+        DEFAULT_FLOW.advance(-1, "yes")
+
+
+@pytest.mark.parametrize("spec, message", [
+    ([{"id": "a", "text": "A", "kind": "open", "any": {"next": END}},
+      {"id": "a", "text": "A again", "kind": "open", "any": {"next": END}}], "Duplicate"),
+    ([{"id": "a", "text": "A", "kind": "open", "any": {"next": "b"}}], "unknown question"),
+    ([{"id": "a", "text": "A", "kind": "yes_no", "yes": {"next": END}}], "no 'no' or 'any' branch"),
+])
+def test_invalid_spec_is_rejected(spec, message):
+    with pytest.raises(ValueError, match=message):
+        CompiledFlow(spec)
+
+
+def test_load_flow_from_json(tmp_path):
+    path = tmp_path / "flow.json"
+    path.write_text(json.dumps([
+        {"id": "ready", "text": "Ready?", "kind": "yes_no",
+         "yes": {"next": END, "set": {"ready": True}}, "any": {"next": "ready"}},
+    ]), encoding="utf-8")
+    flow = load_flow(str(path))
+    assert flow.advance(0, "sure").updates == (("ready", True),)
+    # "any" replaces both the missing "no" branch and the re-ask fallback
+    assert flow.advance(0, "maybe later").next_index == 0
+    assert flow.advance(0, "no").next_index == 0
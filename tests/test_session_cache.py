@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("app.models.interview_registration")
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from session_cache import SessionTokenCache, InProcessBackend, install_invalidation_hooks, invalidate_on_commit
+from app.models.interview_registration import InterviewRegistration
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    InterviewRegistration.__table__.create(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as session:
+        session.add(InterviewRegistration(id=1, registration_id="r1", name="A", email="a@example.com",
+                                          session_token="t1", status="scheduled"))
+        session.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def cache():
+    """A cache with the invalidation hooks installed for the duration of the test"""
+    cache = SessionTokenCache(InProcessBackend(), ttl=60)
+    after_update, after_delete, after_commit, after_rollback = install_invalidation_hooks(cache)
+    yield cache
+    event.remove(InterviewRegistration, "after_update", after_update)
+    event.remove(InterviewRegistration, "after_delete", after_delete)
+    event.remove(Session, "after_commit", after_commit)
+    event.remove(Session, "after_soft_rollback", after_rollback)
+
+
+def test_lookup_is_cached(session_factory, cache):
+    assert cache.get("t1", session_factory).status == "scheduled"
+    assert cache.get("t1", session_factory).status == "scheduled"
+    assert cache.get("unknown", session_factory) is None
+    assert (cache.stats["hits"], cache.stats["misses"]) == (1, 2)
+
+
+def test_commit_of_a_cached_field_evicts(session_factory, cache):
+    cache.get("t1", session_factory)
+    with session_factory() as session:
+        session.get(InterviewRegistration, 1).status = "completed"
+        session.flush()
+        # not before the commit: a concurrent lookup would re-cache the old row
+        assert cache._cached("t1") is not None
+        session.commit()
+    assert cache._cached("t1") is None
+    assert cache.get("t1", session_factory).status == "completed"
+
+
+def test_rollback_keeps_the_entry(session_factory, cache):
+    cache.get("t1", session_factory)
+    with session_factory() as session:
+        session.get(InterviewRegistration, 1).status = "completed"
+        session.flush()
+        session.rollback()
+    assert cache._cached("t1").status == "scheduled"
+    assert cache.stats["invalidations"] == 0
+
+
+def test_savepoint_rollback_does_not_drop_pending_invalidations(session_factory, cache):
+    cache.get("t1", session_factory)
+    with session_factory() as session:
+        session.get(InterviewRegistration, 1).status = "completed"
+        session.flush()
+        session.begin_nested().rollback()
+        session.get(InterviewRegistration, 1).status = "completed"
+        session.commit()
+    assert cache._cached("t1") is None
+
+
+def test_token_change_evicts_the_old_token(session_factory, cache):
+    cache.get("t1", session_factory)
+    with session_factory() as session:
+        session.get(InterviewRegistration, 1).session_token = "t2"
+        session.commit()
+    assert cache._cached("t1") is None
+    assert cache.get("t1", session_factory) is None
+    assert cache.get("t2", session_factory).id == 1
+
+
+def test_other_fields_do_not_evict(session_factory, cache):
+    cache.get("t1", session_factory)
+    with session_factory() as session:
+        session.get(InterviewRegistration, 1).position_type = "teacher"
+        session.commit()
+    assert cache._cached("t1") is not None
+
+
+def test_bulk_update_evicts_through_invalidate_on_commit(session_factory, cache):
+    cache.get("t1", session_factory)
+    with session_factory() as session:
+        session.execute(update(InterviewRegistration).where(InterviewRegistration.id == 1)
+                        .values(status="completed"))
+        invalidate_on_commit(session, [1], ("status",))
+        assert cache._cached("t1") is not None
+        session.commit()
+    assert cache._cached("t1") is None
+
+
+def test_write_behind_flush_evicts_changed_registrations(session_factory, cache):
+    cache.get("t1", session_factory)
+    cache.on_write_behind_flush({1: {"current_question_index": 3}})
+    assert cache._cached("t1") is not None
+    cache.on_write_behind_flush({1: {"is_completed": True}})
+    assert cache._cached("t1") is None
+
+
+def test_aget_uses_the_async_backend_methods(session_factory):
+    calls = []
+
+    class RecordingBackend(InProcessBackend):
+        def get(self, key):
+            raise AssertionError("aget must not call the blocking get()")
+
+        async def aget(self, key):
+            calls.append(("aget", key))
+            return InProcessBackend.get(self, key)
+
+        async def aset(self, key, value, ttl):
+            calls.append(("aset", key))
+            InProcessBackend.set(self, key, value, ttl)
+
+    class AsyncSessionAdapter:
+        """Runs the sync session's execute() behind the AsyncSession interface aget() uses"""
+
+        def __init__(self):
+            self.session = session_factory()
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            self.session.close()
+
+        async def execute(self, statement):
+            return self.session.execute(statement)
+
+    cache = SessionTokenCache(RecordingBackend(), ttl=60)
+
+    async def lookups():
+        return [await cache.aget("t1", AsyncSessionAdapter) for _ in range(2)]
+
+    first, second = asyncio.run(lookups())
+    assert first == second and first.registration_id == "r1"
+    assert [name for name, _ in calls] == ["aget", "aset", "aset", "aget"]